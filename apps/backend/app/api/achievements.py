@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from starlette.concurrency import run_in_threadpool
+from app.api.users import get_current_user
+from app.models.user import User
+from app.services.achievement_service import achievement_service
+
+router = APIRouter()
+
+
+@router.get("/rules")
+async def get_badge_rules():
+    """All badges and what earns them"""
+    return {"badges": [rule.model_dump() for rule in achievement_service.engine.badge_rules.values()]}
+
+
+@router.get("/me")
+async def get_my_achievements(user: User = Depends(get_current_user)):
+    """Badges the signed-in user has earned and their achievement counters"""
+    return await run_in_threadpool(achievement_service.summary, str(user.id))
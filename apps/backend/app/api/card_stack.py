@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from app.api.users import get_optional_user
+from app.models.user import User
 from app.models.schemas import (
     CardStack, CardStackPreview, UserProgress, ActionQuestResponse
 )
@@ -6,8 +8,10 @@ from app.services.card_stack_service import (
     get_card_stack, get_all_card_stack_previews, 
     get_card_stack_preview, save_user_progress, get_user_progress
 )
+from app.services.achievement_service import AchievementEvent, achievement_service
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -56,8 +60,13 @@ async def get_card_by_index(stack_id: str, card_index: int):
 
 
 @router.post("/{stack_id}/progress")
-async def update_progress(stack_id: str, user_id: str, completed_card_id: str):
-    """Update user progress for a card stack"""
+async def update_progress(
+    stack_id: str,
+    user_id: str,
+    completed_card_id: str,
+    user: Optional[User] = Depends(get_optional_user)
+):
+    """Update user progress for a card stack; badges go to the signed-in user only"""
     # Get current progress or create new
     progress = await get_user_progress(stack_id, user_id)
     if not progress:
@@ -86,10 +95,23 @@ async def update_progress(stack_id: str, user_id: str, completed_card_id: str):
     
     # Save progress
     await save_user_progress(progress)
-    
+
+    # The query's user_id only keys progress; achievements are never recorded for a name the caller typed
+    badges_earned = []
+    if user is not None:
+        badges_earned = await run_in_threadpool(
+            achievement_service.record, str(user.id),
+            AchievementEvent(kind="card_completed", stack_id=stack_id, card_id=completed_card_id)
+        )
+        if progress.is_completed:
+            badges_earned += await run_in_threadpool(
+                achievement_service.record, str(user.id), AchievementEvent(kind="stack_completed", stack_id=stack_id)
+            )
+
     return {
         "success": True,
-        "progress": progress
+        "progress": progress,
+        "badges_earned": badges_earned
     }
 
 
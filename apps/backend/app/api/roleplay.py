@@ -1,29 +1,129 @@
 """Roleplay API endpoints"""
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
-from app.roleplay.services.game_engine import RoleplayGameEngine
-from app.roleplay.models.evaluation import EvaluateRequest, GameResponseRequest
+import asyncio
+import hmac
+import json
+import uuid
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+from pydantic import ValidationError
+from app.api.users import get_current_user, get_optional_user, user_from_token
+from app.models.user import User
+from app.roleplay.agents.http_clients import http_client_pool
+from app.roleplay.config import GameConfig
+from app.roleplay.services.game_engine import RoleplayGameEngine, TurnListener
+from app.roleplay.services.batch_evaluation import BatchEvaluator
+from app.roleplay.services.cascade import cascade_stats
+from app.roleplay.services.input_filter import input_filter_stats
+from app.roleplay.services.live_sessions import frame_log
+from app.roleplay.services.metrics import agent_metrics
+from app.roleplay.services.quota import QuotaExceeded, charged_to, held_charges, quota_ledger
+from app.roleplay.services.persistent_sessions import DatabaseSessionStore, SessionConflict
+from app.roleplay.services.session_store import SessionStore
+from app.roleplay.services.state_tokens import InvalidStateToken, decode_state, encode_state
+from app.roleplay.services.analytics import RollupStore
+from app.roleplay.services.transcripts import TranscriptStore
+from app.roleplay.models.game_state import GameState
+from app.services.achievement_service import achievement_service
+from app.roleplay.models.evaluation import BatchEvaluationRequest, EvaluateRequest, GameResponseRequest
 
 router = APIRouter()
 game_engine = RoleplayGameEngine()
+batch_evaluator = BatchEvaluator(game_engine.evaluator, game_engine.scenario_loader, game_engine.compiler)
+
+# In-memory game state storage, kept compact (in production, use proper session management)
+game_sessions = SessionStore()
+
+# Signed-in players' sessions, resumable from any device or container
+persistent_sessions = DatabaseSessionStore()
+
+# Append-only record of every turn, kept after sessions end
+transcripts = TranscriptStore()
+rollups = RollupStore()
+
+
+async def _load_session(
+    session_id: str,
+    state_token: Optional[str],
+    user: Optional[User] = None
+) -> Tuple[GameState, Optional[int]]:
+    """Game state and, for a signed-in player's database session, its version.
+    Other sessions come from the signed token (stateless mode) or this process"""
+    if user is not None and GameConfig.PERSISTENT_SESSIONS:
+        stored = await run_in_threadpool(persistent_sessions.load, session_id, str(user.id))
+        if stored is not None:
+            return stored
+
+    if GameConfig.STATELESS_SESSIONS:
+        if not state_token:
+            raise HTTPException(status_code=400, detail="Game state token required")
+        try:
+            return decode_state(state_token, session_id), None
+        except InvalidStateToken as e:
+            raise HTTPException(status_code=401, detail=str(e))
+
+    game_state = game_sessions.get(session_id)
+    if game_state is None:
+        raise HTTPException(status_code=404, detail="Game session not found")
+    return game_state, None
+
+
+async def _save_session(
+    session_id: str,
+    game_state: GameState,
+    response: dict,
+    user: Optional[User] = None,
+    version: Optional[int] = None
+) -> dict:
+    """Write a database session over the version it was loaded at (409 if another request got there
+    first); otherwise keep the state in memory, or hand it back to the client as a token"""
+    if version is not None:
+        try:
+            response["version"] = await run_in_threadpool(
+                persistent_sessions.save, session_id, str(user.id), game_state, version
+            )
+        except SessionConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return response
 
-# In-memory game state storage (in production, use proper session management)
-game_sessions: Dict[str, Any] = {}
+    if GameConfig.STATELESS_SESSIONS:
+        response["state_token"] = encode_state(game_state, session_id)
+    else:
+        game_sessions.save(session_id, game_state)
+    return response
 
 
 @router.post("/game/start")
-async def start_game(scenario_name: str = None, language: str = "zh-HK"):
-    """Start a new game session"""
+async def start_game(
+    scenario_name: str = None,
+    language: str = "zh-HK",
+    user_id: Optional[str] = None,
+    user: Optional[User] = Depends(get_optional_user)
+):
+    """Start a new game session. Signed-in players' sessions count towards their badges and can be
+    resumed on any device; the player comes from the token only, so user_id, if given, must match it.
+    Without a scenario_name, the scenario recommended for the player is started"""
+    if user is None:
+        if user_id:
+            raise HTTPException(status_code=401, detail="Sign in to play as a user")
+    elif user_id and user_id != str(user.id):
+        raise HTTPException(status_code=403, detail="user_id does not match the signed-in user")
+    else:
+        user_id = str(user.id)
     try:
-        game_state = game_engine.create_game_state(scenario_name, language)
+        if not scenario_name and user_id:
+            picks = await run_in_threadpool(game_engine.recommender.recommend, user_id, language, 1)
+            scenario_name = picks[0].scenario if picks else None
+        game_state = game_engine.create_game_state(scenario_name, language, user_id)
 
         if not game_state:
             raise HTTPException(status_code=404, detail="Scenario not found")
 
-        # Generate session ID (simple implementation)
-        session_id = f"session_{len(game_sessions)}"
-        game_sessions[session_id] = game_state
+        # Unique even when sessions end concurrently (len()-based ids collided)
+        session_id = f"session_{uuid.uuid4().hex}"
 
         response = {
             "session_id": session_id,
@@ -44,47 +144,232 @@ async def start_game(scenario_name: str = None, language: str = "zh-HK"):
         else:
             response["attempts_remaining"] = game_state.max_attempts - game_state.attempts
 
-        return response
+        if user is not None and GameConfig.PERSISTENT_SESSIONS:
+            response["version"] = await run_in_threadpool(
+                persistent_sessions.create, session_id, user_id, game_state
+            )
+            return response
+        return await _save_session(session_id, game_state, response)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/game/respond/{session_id}")
-async def submit_response(session_id: str, request: GameResponseRequest):
+async def submit_response(
+    session_id: str,
+    request: GameResponseRequest,
+    http_request: Request,
+    x_game_state: Optional[str] = Header(None),
+    user: Optional[User] = Depends(get_optional_user)
+):
     """Submit parent response for evaluation"""
+    game_state, version = await _load_session(session_id, request.state_token or x_game_state, user)
+    client = http_request.client.host if http_request.client else None
+    response, _ = await _play_turn(session_id, game_state, version, request, user, client=client)
+    return response
 
-    if session_id not in game_sessions:
-        raise HTTPException(status_code=404, detail="Game session not found")
-
-    game_state = game_sessions[session_id]
 
+def _quota_subject(user: Optional[User], client: Optional[str]) -> Optional[str]:
+    """Whose daily budget a turn is charged to: the signed-in user, otherwise the caller's address"""
+    if user is not None:
+        return str(user.id)
+    return f"ip:{client}" if client else None
+
+
+async def _play_turn(
+    session_id: str,
+    game_state: GameState,
+    version: Optional[int],
+    request: GameResponseRequest,
+    user: Optional[User] = None,
+    on_event: Optional[TurnListener] = None,
+    client: Optional[str] = None
+) -> Tuple[dict, GameState]:
+    """Check, play and save one parent response; shared by the HTTP and WebSocket endpoints.
+    Returns the respond body and the updated state"""
     if game_state.game_completed:
         raise HTTPException(status_code=400, detail="Game already completed")
+    if version is not None and request.version is not None and request.version != version:
+        # Answered on another device since this client last saw the session
+        raise HTTPException(status_code=409, detail=f"Session is at version {version}, not {request.version}")
+    if GameConfig.INPUT_FILTER_ENABLED:
+        # Rejected before any model call, and without using up an attempt
+        verdict = game_engine.input_filter.check(request.parent_response, game_state.language)
+        if not verdict.allowed:
+            raise HTTPException(status_code=422, detail={"reason": verdict.reason, "message": verdict.message})
+
+    payer = _quota_subject(user, client)
+    if payer:
+        try:
+            await run_in_threadpool(quota_ledger.check, payer, request.estimated_tokens)
+        except QuotaExceeded as e:
+            raise HTTPException(status_code=429, detail=str(e))
 
     try:
-        # Process the response
-        updated_state = await game_engine.process_parent_response(
-            game_state,
-            request.parent_response
-        )
-
-        # Update session
-        game_sessions[session_id] = updated_state
+        # Process the response; model calls are charged to the player's daily budget once the turn is saved.
+        # The budget was checked above: a check between the evaluator and the teen reply would end in
+        # their fallbacks, returning a made-up result that costs an attempt
+        with charged_to(payer, check_each_call=False), held_charges() as charges:
+            updated_state = await game_engine.process_parent_response(
+                game_state,
+                request.parent_response,
+                on_event
+            )
 
         # Build response based on scenario type
         if updated_state.is_multi_round:
-            return _build_multi_round_response(updated_state)
+            response = _build_multi_round_response(updated_state)
         else:
-            return _build_single_round_response(updated_state)
-
+            response = _build_single_round_response(updated_state)
+
+        # Save before any side effect: a turn that loses the versioned save (409) leaves no trace
+        response = await _save_session(session_id, updated_state, response, user, version)
+
+        if payer:
+            quota_ledger.settle(payer, charges)
+        await run_in_threadpool(transcripts.record, session_id, updated_state)
+        if updated_state.user_id:
+            await run_in_threadpool(game_engine.recommender.observe, updated_state.user_id, updated_state)
+
+        event = game_engine.completion_event(updated_state)
+        if event and updated_state.user_id:
+            # The saved state keeps the engine's badge preview; the response has what was awarded
+            badges_earned = await run_in_threadpool(achievement_service.record, updated_state.user_id, event)
+            if updated_state.scenario_completion:
+                updated_state.scenario_completion.badges_earned = badges_earned
+            if "scenario_completion" in response:
+                response["scenario_completion"]["badges_earned"] = badges_earned
+            else:
+                response["badges_earned"] = badges_earned
+
+        if quota_ledger.flush_due():
+            await run_in_threadpool(quota_ledger.flush)
+        return response, updated_state
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _websocket_token(websocket: WebSocket) -> Optional[str]:
+    """Bearer token from ?token= (browsers cannot set WebSocket headers) or the Authorization header"""
+    token = websocket.query_params.get("token")
+    if token:
+        return token
+    scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+    return credentials if scheme.lower() == "bearer" else None
+
+
+@router.websocket("/ws/{session_id}")
+async def play_over_websocket(websocket: WebSocket, session_id: str):
+    """Play a started session over one connection (uvicorn deployments; Lambda has no WebSockets)
+
+    The player and the session are resolved once and the state stays in memory
+    between turns. Client frames are {"type": "respond", "parent_response": ...}
+    and {"type": "ping"}. Each turn streams "provisional", "evaluation" and
+    "teen_response" frames, then "turn_complete" with the HTTP respond body;
+    failures come back as "error" frames with an HTTP status. After a 409 (the
+    session was played on another device) a fresh "ready" frame follows, or the
+    connection closes with 4409 if the session is gone. Every frame has a
+    seq: reconnect with ?last_seq=N to receive the frames missed after N.
+    Sign in with ?token=... or an Authorization header; stateless deployments
+    pass ?state_token=...
+    """
+    await websocket.accept()
+    try:
+        user = await run_in_threadpool(user_from_token, _websocket_token(websocket))
+        game_state, version = await _load_session(session_id, websocket.query_params.get("state_token"), user)
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "status": e.status_code, "detail": e.detail})
+        await websocket.close(code=4000 + e.status_code)
+        return
+
+    async def send(frame_type: str, data=None) -> None:
+        frame = frame_log.append(session_id, {"type": frame_type, "data": data})
+        try:
+            await websocket.send_json(frame)
+        except (WebSocketDisconnect, RuntimeError):
+            pass  # Gone mid-turn: the turn still completes and the frame waits in the log
+
+    last_seq = websocket.query_params.get("last_seq")
+    if last_seq is not None and last_seq.isdigit():
+        for frame in frame_log.since(session_id, int(last_seq)):
+            await websocket.send_json(frame)
+    await send("ready", _build_status(session_id, game_state, version))
+
+    missed_heartbeats = 0
+    while True:
+        try:
+            text = await asyncio.wait_for(websocket.receive_text(), timeout=GameConfig.WS_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            missed_heartbeats += 1
+            if missed_heartbeats > GameConfig.WS_MISSED_HEARTBEATS:
+                await websocket.close(code=1001, reason="Heartbeat timeout")
+                return
+            await websocket.send_json({"type": "ping"})
+            continue
+        except WebSocketDisconnect:
+            return
+        missed_heartbeats = 0
+
+        try:
+            message = json.loads(text)
+            kind = message.get("type")
+        except (ValueError, AttributeError):
+            await send("error", {"status": 400, "detail": "Frames must be JSON objects"})
+            continue
+        if kind == "ping":
+            await websocket.send_json({"type": "pong"})
+            continue
+        if kind == "pong":
+            continue
+        if kind != "respond":
+            await send("error", {"status": 400, "detail": f"Unknown frame type: {kind}"})
+            continue
+
+        try:
+            request = GameResponseRequest(parent_response=message.get("parent_response"))
+        except ValidationError as e:
+            await send("error", {"status": 422, "detail": e.errors(include_url=False, include_context=False)})
+            continue
+
+        try:
+            # A failed turn must not leave a half-updated state behind
+            response, game_state = await _play_turn(
+                session_id, game_state.model_copy(deep=True), version, request, user, send,
+                websocket.client.host if websocket.client else None
+            )
+            version = response.get("version", version)
+        except HTTPException as e:
+            await send("error", {"status": e.status_code, "detail": e.detail})
+            if e.status_code == 409:
+                # Played on another device meanwhile: continue from the stored state, if it is still there
+                try:
+                    game_state, version = await _load_session(session_id, None, user)
+                except HTTPException as reload_error:
+                    await send("error", {"status": reload_error.status_code, "detail": reload_error.detail})
+                    await websocket.close(code=4409, reason="Session changed elsewhere and could not be reloaded")
+                    return
+                await send("ready", _build_status(session_id, game_state, version))
+            continue
+        await send("turn_complete", response)
+
+
+def _build_provisional(game_state):
+    """Serialize the local pre-score shown before (or instead of) the model evaluation"""
+    if not game_state.provisional_evaluation:
+        return None
+    return game_state.provisional_evaluation.model_dump()
+
+
 def _build_single_round_response(game_state):
     """Build response for single-round scenarios"""
     return {
+        "provisional_evaluation": _build_provisional(game_state),
         "evaluation": {
             "tone_score": game_state.evaluation.tone_score,
             "approach_score": game_state.evaluation.approach_score,
@@ -107,6 +392,7 @@ def _build_multi_round_response(game_state):
         "is_multi_round": True,
         "current_round": game_state.current_round,
         "max_rounds": game_state.max_rounds,
+        "provisional_evaluation": _build_provisional(game_state),
         "teen_response": game_state.teen_response,
         "round_attempts_used": game_state.round_attempts,
         "round_attempts_remaining": game_state.max_round_attempts - game_state.round_attempts,
@@ -153,17 +439,129 @@ def _build_multi_round_response(game_state):
     return response
 
 
+@router.post("/evaluate/prescore")
+async def prescore_response(request: EvaluateRequest):
+    """Instant provisional score from the local rule-based scorer (no model call)"""
+    return game_engine.prescorer.score(request.parent_response).model_dump()
+
+
+@router.post("/evaluate/batch")
+async def evaluate_batch(request: BatchEvaluationRequest, user: User = Depends(get_current_user)):
+    """Evaluate many sample responses, streaming one NDJSON line per item as results complete.
+    Model calls are charged to the signed-in user; items past the daily budget come back as errors"""
+    if len(request.items) > GameConfig.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {GameConfig.BATCH_MAX_ITEMS} items per batch")
+    user_id = str(user.id)
+    try:
+        await run_in_threadpool(quota_ledger.check, user_id)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    async def lines():
+        async for result in batch_evaluator.run(request.items, user_id):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        if quota_ledger.flush_due():
+            await run_in_threadpool(quota_ledger.flush)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _require_export_token(x_export_token: Optional[str]) -> None:
+    """Operator-only endpoints (transcripts, analytics, usage reports) need TRANSCRIPT_EXPORT_TOKEN"""
+    expected = GameConfig.TRANSCRIPT_EXPORT_TOKEN
+    if not expected:
+        raise HTTPException(status_code=403, detail="Transcript export is disabled")
+    if not x_export_token or not hmac.compare_digest(x_export_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid export token")
+
+
+@router.get("/transcripts/export")
+async def export_transcripts(
+    scenario: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    x_export_token: Optional[str] = Header(None)
+):
+    """Stream recorded turns as NDJSON, oldest first, filtered by scenario and [since, until)"""
+    _require_export_token(x_export_token)
+
+    def lines():
+        for row in transcripts.export(scenario, since, until):
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/analytics/{scenario_name}")
+async def get_scenario_analytics(
+    scenario_name: str,
+    language: Optional[str] = None,
+    day: Optional[date] = None,
+    x_export_token: Optional[str] = Header(None)
+):
+    """Per-round pass rates, score and criterion statistics and attempt distribution, all time or for one UTC day"""
+    _require_export_token(x_export_token)
+    return await run_in_threadpool(rollups.summary, scenario_name, language, day)
+
+
+@router.get("/quota")
+async def get_quota(user: User = Depends(get_current_user)):
+    """The signed-in player's model usage today and the daily limits"""
+    usage = await run_in_threadpool(quota_ledger.usage, str(user.id))
+    return {
+        "usage": usage.to_dict(),
+        "limits": {"calls": quota_ledger.daily_calls, "tokens": quota_ledger.daily_tokens},
+    }
+
+
+@router.get("/quota/top")
+async def get_top_consumers(
+    day: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=200),
+    x_export_token: Optional[str] = Header(None)
+):
+    """Users with the most model tokens on a UTC day (today by default)"""
+    _require_export_token(x_export_token)
+    return {"consumers": await run_in_threadpool(quota_ledger.top, day, limit)}
+
+
+@router.get("/recommendation")
+async def get_recommendation(
+    language: Optional[str] = None,
+    limit: int = Query(3, ge=1, le=20),
+    user: Optional[User] = Depends(get_optional_user)
+):
+    """Scenarios that best practise the signed-in player's weakest criteria, best first (cold-start picks when signed out)"""
+    user_id = str(user.id) if user is not None else None
+    picks = await run_in_threadpool(game_engine.recommender.recommend, user_id, language, limit)
+    return {"user_id": user_id, "recommendations": [pick.model_dump() for pick in picks]}
+
+
+@router.get("/sessions/active")
+async def list_active_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user)
+):
+    """The signed-in player's unfinished sessions, most recently played first, to resume on this device"""
+    sessions = await run_in_threadpool(persistent_sessions.active, str(user.id), limit)
+    return {"sessions": [session.model_dump() for session in sessions]}
+
+
 @router.get("/game/status/{session_id}")
-async def get_game_status(session_id: str):
+async def get_game_status(
+    session_id: str,
+    x_game_state: Optional[str] = Header(None),
+    user: Optional[User] = Depends(get_optional_user)
+):
     """Get current game status"""
+    game_state, version = await _load_session(session_id, x_game_state, user)
+    return _build_status(session_id, game_state, version)
 
-    if session_id not in game_sessions:
-        raise HTTPException(status_code=404, detail="Game session not found")
-
-    game_state = game_sessions[session_id]
 
+def _build_status(session_id: str, game_state: GameState, version: Optional[int] = None) -> dict:
+    """Status body, also sent when a WebSocket connects"""
     if game_state.is_multi_round:
-        return {
+        status = {
             "session_id": session_id,
             "scenario_title": game_state.scenario_title,
             "is_multi_round": True,
@@ -177,7 +575,7 @@ async def get_game_status(session_id: str):
             "scenario_completion": game_state.scenario_completion.__dict__ if game_state.scenario_completion else None
         }
     else:
-        return {
+        status = {
             "session_id": session_id,
             "scenario_title": game_state.scenario_title,
             "is_multi_round": False,
@@ -187,15 +585,22 @@ async def get_game_status(session_id: str):
             "final_score": game_state.final_score
         }
 
+    # Enough to redraw the conversation when resuming on another device
+    status["teen_opening"] = game_state.teen_opening
+    status["conversation"] = [turn.model_dump() for turn in game_state.conversation]
+    if version is not None:
+        status["version"] = version
+    return status
+
 
 @router.get("/game/round-status/{session_id}")
-async def get_round_status(session_id: str):
+async def get_round_status(
+    session_id: str,
+    x_game_state: Optional[str] = Header(None),
+    user: Optional[User] = Depends(get_optional_user)
+):
     """Get detailed round status for multi-round games"""
-
-    if session_id not in game_sessions:
-        raise HTTPException(status_code=404, detail="Game session not found")
-
-    game_state = game_sessions[session_id]
+    game_state, _ = await _load_session(session_id, x_game_state, user)
 
     if not game_state.is_multi_round:
         raise HTTPException(status_code=400, detail="Not a multi-round game")
@@ -230,27 +635,74 @@ async def get_round_status(session_id: str):
 
 
 @router.delete("/game/end/{session_id}")
-async def end_game(session_id: str):
+async def end_game(session_id: str, user: Optional[User] = Depends(get_optional_user)):
     """End a game session"""
+    frame_log.discard(session_id)
 
-    if session_id not in game_sessions:
-        raise HTTPException(status_code=404, detail="Game session not found")
+    if user is not None and GameConfig.PERSISTENT_SESSIONS:
+        if await run_in_threadpool(persistent_sessions.delete, session_id, str(user.id)):
+            return {"message": "Game session ended"}
+
+    if GameConfig.STATELESS_SESSIONS:
+        # Nothing is held server-side; the client simply drops its token
+        return {"message": "Game session ended"}
 
-    del game_sessions[session_id]
+    if not game_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Game session not found")
 
     return {"message": "Game session ended"}
 
 
+@router.get("/metrics")
+async def get_agent_metrics(x_export_token: Optional[str] = Header(None)):
+    """Token, latency and cost aggregates for agent runs in this process"""
+    _require_export_token(x_export_token)
+    return {
+        **agent_metrics.snapshot(),
+        "cascade": cascade_stats.snapshot(),
+        "input_filter": input_filter_stats.snapshot(),
+        "http_clients": http_client_pool.snapshot(),
+        "sessions": game_sessions.snapshot(),
+        "persistent_sessions": persistent_sessions.snapshot(),
+    }
+
+
 @router.get("/scenarios/")
 async def list_scenarios():
     """List available scenarios"""
     try:
-        scenarios = game_engine.get_available_scenarios()
+        # May (re)build the catalog, which reads the scenario files
+        scenarios = await run_in_threadpool(game_engine.get_available_scenarios)
         return {"scenarios": scenarios}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/catalog")
+async def get_catalog(
+    tag: Optional[List[str]] = Query(None),
+    age: Optional[int] = None,
+    difficulty: Optional[str] = None,
+    technique: Optional[str] = None,
+    language: Optional[str] = None,
+    q: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(GameConfig.CATALOG_PAGE_SIZE, ge=1, le=GameConfig.CATALOG_MAX_PAGE_SIZE),
+):
+    """Scenario summaries filtered by tag, child age, difficulty, technique, language or title words"""
+    total, scenarios = await run_in_threadpool(
+        game_engine.catalog.search,
+        tags=tag, age=age, difficulty=difficulty, technique=technique, language=language, query=q,
+        offset=offset, limit=limit,
+    )
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "scenarios": [summary.model_dump() for summary in scenarios],
+    }
+
+
 @router.get("/scenarios/{scenario_name}")
 async def get_scenario(scenario_name: str, language: str = "zh-HK"):
     """Get a specific scenario"""
@@ -2,14 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import Optional
 
-from app.db.database import get_db
+from app.db.database import SessionLocal, get_db
 from app.models.user import User
 from app.models.user_schemas import UserCreate, UserLogin, UserResponse, Token, UserUpdate
 from app.services.auth_service import get_password_hash, verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -86,6 +88,27 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     return user
 
 
+def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> Optional[User]:
+    """Get current user when a bearer token is sent, None for anonymous requests."""
+    if credentials is None:
+        return None
+    return get_current_user(credentials, db)
+
+
+def user_from_token(token: Optional[str]) -> Optional[User]:
+    """Resolve a bearer token outside request dependencies (WebSockets); None without a token."""
+    if not token:
+        return None
+    db = SessionLocal()
+    try:
+        return get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+    finally:
+        db.close()
+
+
 @router.get("/profile", response_model=UserResponse)
 def get_user_profile(current_user: User = Depends(get_current_user)):
     """Get current user profile."""
@@ -1,8 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import feed, calculator, survey, card_stack, users, roleplay
+from app.api import feed, calculator, survey, card_stack, users, roleplay, achievements
 from app.db.database import engine, Base
 from app.models.user import User  
+from app.models.roleplay_transcript import RoleplayTranscript
+from app.models.roleplay_rollup import RoleplayRollup
+from app.models.achievement import UserBadge, UserCounter, UserCounterMember
+from app.models.user_skill import UserCriterionStat
+from app.models.roleplay_session import RoleplaySession, RoleplaySessionDelta
+from app.models.llm_usage import UserLLMUsage
+from app.roleplay.agents.http_clients import check_configuration as check_http_clients, http_client_pool
+from app.roleplay.agents.local_model import close_local_models
+from app.roleplay.config import GameConfig
+from app.roleplay.services.quota import quota_ledger
+from app.roleplay.services.request_limits import RequestSizeLimitMiddleware
+from app.roleplay.services.state_tokens import check_configuration as check_state_tokens
+from app.services.logging_service import configure_logging, shutdown_logging
+
+configure_logging()
+# At import rather than in a startup event: Lambda runs the app without lifespan events
+check_state_tokens()
+check_http_clients()
 
 
 app = FastAPI(
@@ -16,6 +34,14 @@ app = FastAPI(
 async def startup_event():
     Base.metadata.create_all(bind=engine)
 
+# Close pooled model-provider connections and local model pools, and write out unflushed usage and logs on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    await http_client_pool.aclose()
+    close_local_models()
+    quota_ledger.flush()
+    shutdown_logging()
+
 # CORS middleware for Flutter frontend
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +57,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cap roleplay request bodies while they are read, before any prompt text is parsed
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    prefix="/api/roleplay",
+    max_bytes=GameConfig.MAX_BODY_BYTES,
+    overrides={"/api/roleplay/evaluate/batch": GameConfig.BATCH_MAX_BODY_BYTES},
+)
+
 # Include routers
 app.include_router(users.router)
 app.include_router(feed.router, prefix="/api/feed", tags=["feed"])
@@ -38,6 +72,7 @@ app.include_router(card_stack.router, prefix="/api/card-stacks", tags=["card-sta
 app.include_router(calculator.router, prefix="/api/calculator", tags=["calculator"])
 app.include_router(survey.router, prefix="/api/survey", tags=["survey"])
 app.include_router(roleplay.router, prefix="/api/roleplay", tags=["roleplay"])
+app.include_router(achievements.router, prefix="/api/achievements", tags=["achievements"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class UserCounter(Base):
+    """Running value of one achievement counter for a user"""
+
+    __tablename__ = "user_counters"
+
+    user_id = Column(String(64), primary_key=True)
+    counter = Column(String(64), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class UserCounterMember(Base):
+    """Item already counted by a distinct counter (a mastered scenario, a read card)"""
+
+    __tablename__ = "user_counter_members"
+
+    user_id = Column(String(64), primary_key=True)
+    counter = Column(String(64), primary_key=True)
+    member = Column(String(200), primary_key=True)
+
+
+class UserBadge(Base):
+    """Badge a user has earned"""
+
+    __tablename__ = "user_badges"
+
+    user_id = Column(String(64), primary_key=True)
+    badge_id = Column(String(64), primary_key=True)
+
+    earned_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class UserLLMUsage(Base):
+    """Model calls and tokens a user's games used on one UTC day"""
+
+    __tablename__ = "user_llm_usage"
+
+    user_id = Column(String(64), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    calls = Column(Integer, nullable=False, default=0)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_user_llm_usage_day", "day"),
+    )
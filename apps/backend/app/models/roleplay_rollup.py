@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class RoleplayRollup(Base):
+    """Running count, sum and sum of squares of one round metric
+
+    period is "all" or a UTC day (YYYY-MM-DD); metric is passed, total_score,
+    attempts, attempts=<n> or criterion:<name>.
+    """
+
+    __tablename__ = "roleplay_rollups"
+
+    period = Column(String(10), primary_key=True)
+    scenario = Column(String(100), primary_key=True)
+    round_number = Column(Integer, primary_key=True)
+    language = Column(String(10), primary_key=True)
+    metric = Column(String(80), primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Float, nullable=False, default=0.0)
+    value_sq_sum = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
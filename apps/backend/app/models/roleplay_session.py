@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class RoleplaySession(Base):
+    """A signed-in player's roleplay game, resumable from any device"""
+
+    __tablename__ = "roleplay_sessions"
+
+    id = Column(String(64), primary_key=True)
+    user_id = Column(String(64), nullable=False)
+    version = Column(Integer, nullable=False, default=1)  # Bumped by every save; stale writers are rejected
+
+    # Copied out of the state so listings never decode it
+    scenario = Column(String(100), nullable=False)
+    scenario_title = Column(String(255), nullable=False)
+    language = Column(String(10), nullable=False)
+    is_multi_round = Column(Boolean, default=False)
+    current_round = Column(Integer, nullable=False, default=1)
+    max_rounds = Column(Integer, nullable=False, default=1)
+    completed = Column(Boolean, nullable=False, default=False)
+
+    state = Column(Text, nullable=False)  # Compact game state as JSON, as of snapshot_version
+    snapshot_version = Column(Integer, nullable=False, default=1)  # Later versions are in roleplay_session_deltas
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_roleplay_sessions_user_active", "user_id", "completed", "updated_at"),
+    )
+
+
+class RoleplaySessionDelta(Base):
+    """What one save changed in a session since the version before it; replayed over the snapshot"""
+
+    __tablename__ = "roleplay_session_deltas"
+
+    session_id = Column(String(64), primary_key=True)
+    version = Column(Integer, primary_key=True)
+    delta = Column(Text, nullable=False)
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class RoleplayTranscript(Base):
+    """One parent turn of a roleplay game; rows are only ever appended"""
+
+    __tablename__ = "roleplay_transcripts"
+
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String(64), index=True, nullable=False)
+    scenario = Column(String(100), nullable=False)
+    language = Column(String(10), nullable=False)
+    round_number = Column(Integer, nullable=False)
+    attempt = Column(Integer, nullable=False)
+
+    parent_response = Column(Text, nullable=False)
+    teen_response = Column(Text, nullable=True)
+    emotion = Column(String(20), nullable=True)
+
+    total_score = Column(Integer, nullable=True)
+    max_score = Column(Integer, nullable=True)
+    passed = Column(Boolean, nullable=True)
+    criteria_scores = Column(JSON, nullable=True)
+    provisional_score = Column(Integer, nullable=True)
+    round_completed = Column(Boolean, default=False)
+    game_completed = Column(Boolean, default=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_roleplay_transcripts_scenario_created_at", "scenario", "created_at"),
+        Index("ix_roleplay_transcripts_created_at", "created_at"),
+    )
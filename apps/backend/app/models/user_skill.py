@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class UserCriterionStat(Base):
+    """How a user has scored on one evaluation criterion, as running totals"""
+
+    __tablename__ = "user_criterion_stats"
+
+    user_id = Column(String(64), primary_key=True)
+    criterion = Column(String(80), primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+    ratio_sum = Column(Float, nullable=False, default=0.0)  # Sum of score / max_score
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -2,10 +2,17 @@
 
 import json
 import logging
-from typing import Optional, List
+from typing import Optional
 from pydantic_ai import Agent
 from ..config import ModelConfig
+from .model_factory import build_model, EVALUATION_ROLE, MULTI_ROUND_EVALUATION_ROLE
+from .prompts import (
+    EVALUATION_SYSTEM_PROMPT, MULTI_ROUND_SYSTEM_PROMPT,
+    build_evaluation_prompt, cache_settings, to_user_prompt,
+)
+from ..services.quota import metered
 from ..models.evaluation import EvaluationResult, MultiRoundEvaluationResult
+from ..scenarios.compiler import CompiledRound
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +20,10 @@ logger = logging.getLogger(__name__)
 class EvaluationAgent:
     """Agent responsible for evaluating parent responses"""
 
-    def __init__(self):
-        self._agent = Agent(ModelConfig.get_evaluation_model())
-        self._multi_round_agent = Agent(ModelConfig.get_evaluation_model())
+    def __init__(self, model_name: Optional[str] = None):
+        self._model_name = model_name or ModelConfig.get_evaluation_model()
+        self._agent = Agent(build_model(self._model_name, EVALUATION_ROLE))
+        self._multi_round_agent = Agent(build_model(self._model_name, MULTI_ROUND_EVALUATION_ROLE))
         self._setup_system_prompt()
         self._setup_multi_round_prompt()
 
@@ -23,100 +31,68 @@ class EvaluationAgent:
         """Configure the evaluation system prompt"""
         @self._agent.system_prompt
         def evaluation_prompt() -> str:
-            return """You are evaluating parent-teen communication quality on a 0-10 scale.
-
-IMPORTANT: You MUST provide feedback in the language requested by the user.
-- If language is "en", provide ALL feedback in English only
-- If language is "zh-HK", provide ALL feedback in Cantonese only
-
-RUBRIC:
-- Tone (0-4): 4=Very calm/patient, 3=Mostly calm, 2=Neutral, 1=Slightly frustrated, 0=Angry/harsh
-- Approach (0-3): 3=Solution-focused/collaborative, 2=Clear expectations with reasoning, 1=Direct instruction, 0=Dismissive/demanding
-- Respect (0-3): 3=Acknowledges teen feelings, 2=Shows understanding, 1=Neutral, 0=Ignores/dismisses feelings
-
-Return your evaluation as a JSON object with:
-- tone_score: int (0-4)
-- approach_score: int (0-3)
-- respect_score: int (0-3)
-- total_score: int (sum of above, 0-10)
-- feedback: str (in the requested language)
-- passed: bool (true if total_score >= 7)
-
-Be strict but fair in scoring. Provide specific feedback in the requested language exactly."""
+            return EVALUATION_SYSTEM_PROMPT
 
     def _setup_multi_round_prompt(self):
         """Configure the multi-round evaluation system prompt"""
         @self._multi_round_agent.system_prompt
         def multi_round_evaluation_prompt() -> str:
-            return """You are evaluating parent communication in a multi-round scenario with dynamic criteria.
-
-IMPORTANT: You MUST provide feedback in the language requested by the user.
-- If language is "en", provide ALL feedback in English only
-- If language is "zh-HK", provide ALL feedback in Cantonese only
-
-EVALUATION CRITERIA (varies by round):
-
-ROUND 1 - Initial Resistance:
-- emotion_acknowledgment (0-3): Recognizes and validates child's emotions
-- tone_empathy (0-2): Uses calm, empathetic tone
-- solution_approach (0-3): Offers helpful, collaborative solutions
+            return MULTI_ROUND_SYSTEM_PROMPT
 
-ROUND 2 - Deeper Fear Expression:
-- fear_validation (0-4): Acknowledges and validates specific fears
-- concrete_reassurance (0-3): Provides specific, tangible reassurance
-- collaborative_approach (0-3): Involves child in problem-solving
+    @property
+    def model_name(self) -> str:
+        return self._model_name
 
-ROUND 3 - Transition Challenge:
-- transition_strategy (0-4): Uses effective transition techniques
-- child_agency (0-3): Empowers child with choices/control
-- follow_through_clarity (0-3): Provides clear, consistent expectations
-
-Return evaluation as JSON:
-- criteria_scores: dict with each criterion and score
-- total_score: int (sum of all criteria scores)
-- max_possible_score: int (maximum possible for this round)
-- feedback: str (overall feedback in the requested language)
-- detailed_feedback: dict with feedback for each criterion in the requested language
-- passed: bool (true if total_score >= threshold)
-
-Be specific in feedback. Focus on what worked and what could improve. Remember to match the requested language exactly."""
-
-    async def evaluate(self, parent_response: str, teen_opening: str, language: str = "zh-HK") -> EvaluationResult:
+    async def evaluate(
+        self,
+        parent_response: str,
+        teen_opening: str,
+        language: str = "zh-HK",
+        scenario: str = ""
+    ) -> EvaluationResult:
         """Evaluate a parent's response"""
-
-        if language == "en":
-            prompt = f"""Evaluate this parent's response to a teenager: '{parent_response}'
-
-Situation: The teenager said: "{teen_opening}"
-LANGUAGE: English - ALL feedback must be in English only!
-
-Please rate according to tone, approach, and respect criteria. Return pure JSON format only, no other text."""
-        else:
-            prompt = f"""評估呢個父母對青少年嘅回應：'{parent_response}'
-
-情境：青少年話「{teen_opening}」
-語言：廣東話 - 所有反饋必須只用廣東話！
-
-請根據語調、方法、尊重三個標準評分。返回純JSON格式，唔好其他文字。"""
-
         try:
-            logger.info(f"Starting evaluation with model: {ModelConfig.get_evaluation_model()}, language: {language}")
-            result = await self._agent.run(prompt)
-            logger.info(f"Raw AI response: {result.output}")
+            return await self.score(parent_response, teen_opening, language, scenario)
+        except Exception as e:
+            logger.error(f"Evaluation failed: {str(e)}")
+            # Fallback evaluation on error
+            return self._create_fallback_evaluation(str(e), language)
+
+    async def score(
+        self,
+        parent_response: str,
+        teen_opening: str,
+        language: str = "zh-HK",
+        scenario: str = ""
+    ) -> EvaluationResult:
+        """Evaluate a parent's response, raising on model or parsing errors"""
+
+        prompt = build_evaluation_prompt(parent_response, teen_opening, language)
+        cache_key = f"{EVALUATION_ROLE}:{scenario}:{language}"
+
+        with metered(EVALUATION_ROLE, self._model_name, scenario, language) as call:
+            result = await self._agent.run(
+                to_user_prompt(prompt, self._model_name),
+                model_settings=cache_settings(self._model_name, cache_key)
+            )
+            call.set_usage(result.usage)
 
             # Clean up response (remove markdown formatting)
             output = self._clean_json_output(result.output)
-            logger.info(f"Cleaned JSON output: {output}")
+            self._log_output(output, scenario, language)
 
             # Parse JSON
             eval_data = json.loads(output)
 
             return EvaluationResult.from_dict(eval_data)
 
-        except Exception as e:
-            logger.error(f"Evaluation failed: {str(e)}")
-            # Fallback evaluation on error
-            return self._create_fallback_evaluation(str(e), language)
+    def _log_output(self, output: str, scenario: str, language: str, round_number: Optional[int] = None) -> None:
+        """Model output at DEBUG, sampled as the evaluation.output event"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Evaluation output", extra={
+                "event": "evaluation.output", "model": self._model_name, "scenario": scenario,
+                "language": language, "round": round_number, "output": output,
+            })
 
     def _clean_json_output(self, output: str) -> str:
         """Clean up JSON output from AI response"""
@@ -143,87 +119,61 @@ Please rate according to tone, approach, and respect criteria. Return pure JSON
             passed=False
         )
 
-    async def evaluate_multi_round(
-        self,
-        parent_response: str,
-        child_prompt: str,
-        criteria: List[str],
-        threshold: int,
-        round_number: int,
-        language: str = "zh-HK"
-    ) -> MultiRoundEvaluationResult:
+    async def evaluate_multi_round(self, parent_response: str, compiled: CompiledRound) -> MultiRoundEvaluationResult:
         """Evaluate a parent's response for multi-round scenarios"""
+        try:
+            return await self.score_multi_round(parent_response, compiled)
+        except Exception as e:
+            logger.error(f"Multi-round evaluation failed: {str(e)}")
+            # Fallback evaluation
+            return self._create_fallback_multi_round_evaluation(str(e), compiled)
 
-        # Build criteria description
-        criteria_desc = ", ".join(criteria)
-
-        if language == "en":
-            prompt = f"""Evaluate Round {round_number} parent's response to child: '{parent_response}'
-
-Child said: '{child_prompt}'
-
-Evaluation criteria: {criteria_desc}
-Passing score: {threshold}
-LANGUAGE: English - ALL feedback must be in English only!
-
-Please rate according to Round {round_number} criteria. Return pure JSON format only, no other text."""
-        else:
-            prompt = f"""評估第{round_number}輪父母對子女嘅回應：'{parent_response}'
-
-子女話：'{child_prompt}'
-
-評估標準：{criteria_desc}
-合格分數：{threshold}
-語言：廣東話 - 所有反饋必須只用廣東話！
+    async def score_multi_round(self, parent_response: str, compiled: CompiledRound) -> MultiRoundEvaluationResult:
+        """Evaluate a multi-round response, raising on model or parsing errors"""
 
-請根據第{round_number}輪嘅標準評分。返回純JSON格式，唔好其他文字。"""
+        round_number, language, scenario = compiled.round_number, compiled.language, compiled.scenario_name
+        prompt = compiled.render(parent_response)
+        cache_key = f"{MULTI_ROUND_EVALUATION_ROLE}:{scenario}:{round_number}:{language}"
 
-        try:
-            logger.info(f"Starting multi-round evaluation for round {round_number}")
-            result = await self._multi_round_agent.run(prompt)
-            logger.info(f"Raw AI response: {result.output}")
+        with metered(
+            MULTI_ROUND_EVALUATION_ROLE, self._model_name, scenario, language, round_number
+        ) as call:
+            result = await self._multi_round_agent.run(
+                to_user_prompt(prompt, self._model_name),
+                model_settings=cache_settings(self._model_name, cache_key)
+            )
+            call.set_usage(result.usage)
 
             # Clean up response
             output = self._clean_json_output(result.output)
-            logger.info(f"Cleaned JSON output: {output}")
+            self._log_output(output, scenario, language, round_number)
 
             # Parse JSON
             eval_data = json.loads(output)
 
-            # Calculate max possible score based on criteria
-            max_scores = {
-                "emotion_acknowledgment": 3, "tone_empathy": 2, "solution_approach": 3,
-                "fear_validation": 4, "concrete_reassurance": 3, "collaborative_approach": 3,
-                "transition_strategy": 4, "child_agency": 3, "follow_through_clarity": 3
-            }
+            # Only the round's own criteria are kept; keys a model invents would end up in analytics
+            for field in ("criteria_scores", "detailed_feedback"):
+                values = eval_data.get(field) or {}
+                eval_data[field] = {name: values[name] for name in compiled.criteria if name in values}
 
-            max_possible = sum(max_scores.get(criterion, 3) for criterion in criteria)
-            eval_data["max_possible_score"] = max_possible
+            # Max possible score comes from the scenario's criteria table
+            eval_data["max_possible_score"] = compiled.max_possible_score
 
             # Ensure passed is calculated correctly
-            eval_data["passed"] = eval_data.get("total_score", 0) >= threshold
+            eval_data["passed"] = eval_data.get("total_score", 0) >= compiled.pass_threshold
 
             return MultiRoundEvaluationResult.from_dict(eval_data, round_number)
 
-        except Exception as e:
-            logger.error(f"Multi-round evaluation failed: {str(e)}")
-            # Fallback evaluation
-            return self._create_fallback_multi_round_evaluation(str(e), criteria, round_number, language)
-
-    def _create_fallback_multi_round_evaluation(
-        self,
-        error: str,
-        criteria: List[str],
-        round_number: int,
-        language: str = "zh-HK"
-    ) -> MultiRoundEvaluationResult:
+    def _create_fallback_multi_round_evaluation(self, error: str, compiled: CompiledRound) -> MultiRoundEvaluationResult:
         """Create fallback multi-round evaluation when AI fails"""
 
+        criteria = compiled.criteria
+
         # Create default scores for criteria
-        criteria_scores = {criterion: 2 for criterion in criteria}
+        criteria_scores = {criterion: min(2, compiled.max_scores[criterion]) for criterion in criteria}
         total_score = sum(criteria_scores.values())
 
-        if language == "en":
+        if compiled.language == "en":
             feedback = f"Evaluation system error, please retry. Error: {error}"
             detailed_feedback = {criterion: "System error" for criterion in criteria}
         else:
@@ -233,9 +183,9 @@ Please rate according to Round {round_number} criteria. Return pure JSON format
         return MultiRoundEvaluationResult(
             criteria_scores=criteria_scores,
             total_score=total_score,
-            max_possible_score=len(criteria) * 3,  # Conservative estimate
+            max_possible_score=compiled.max_possible_score,
             feedback=feedback,
             detailed_feedback=detailed_feedback,
             passed=False,
-            round_number=round_number
-        )
\ No newline at end of file
+            round_number=compiled.round_number
+        )
@@ -0,0 +1,190 @@
+"""Deterministic offline model stand-in for load tests and local development
+
+Select it with EVALUATION_MODEL / TEEN_RESPONSE_MODEL, optionally overriding
+the FAKE_MODEL_* defaults inline:
+
+    EVALUATION_MODEL=fake
+    TEEN_RESPONSE_MODEL=fake:latency=lognormal,latency_ms=400,error_rate=0.02
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import Dict, List
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.usage import RequestUsage
+from ..config import FakeModelConfig
+
+FAKE_MODEL_PREFIX = "fake"
+
+# Agent roles the fake model knows how to answer for
+EVALUATION_ROLE = "evaluation"
+MULTI_ROUND_EVALUATION_ROLE = "multi_round_evaluation"
+TEEN_RESPONSE_ROLE = "teen_response"
+
+_CRITERIA_PATTERN = re.compile(r"(?:Evaluation criteria|評估標準)\s*[:：]\s*(.+)")
+
+_TEEN_REPLIES = {
+    "en": {
+        "cooperative": "Okay, that makes sense. I'll do it.",
+        "reluctant": "Fine... give me a minute.",
+        "defensive": "Why are you always on my case?",
+        "upset": "You never listen to me!",
+    },
+    "zh-HK": {
+        "cooperative": "好啦，我明白，我而家去做。",
+        "reluctant": "好啦好啦……等我一陣先。",
+        "defensive": "做乜成日都係講我？",
+        "upset": "你從來都唔聽我講！",
+    },
+}
+
+
+def is_fake_model(model_name: str) -> bool:
+    """Check if a model id selects the offline stand-in"""
+    return model_name == FAKE_MODEL_PREFIX or model_name.startswith(f"{FAKE_MODEL_PREFIX}:")
+
+
+def parse_fake_model_options(model_name: str) -> Dict[str, str]:
+    """Parse 'fake:key=value,key=value' overrides on top of FakeModelConfig"""
+    options = {
+        "latency": FakeModelConfig.LATENCY_DISTRIBUTION,
+        "latency_ms": str(FakeModelConfig.LATENCY_MS),
+        "jitter_ms": str(FakeModelConfig.LATENCY_JITTER_MS),
+        "error_rate": str(FakeModelConfig.ERROR_RATE),
+        "malformed_rate": str(FakeModelConfig.MALFORMED_RATE),
+        "output_tokens": str(FakeModelConfig.OUTPUT_TOKENS),
+        "seed": str(FakeModelConfig.SEED),
+    }
+    _, _, spec = model_name.partition(":")
+    for item in filter(None, spec.split(",")):
+        key, _, value = item.partition("=")
+        if key.strip() not in options:
+            raise ValueError(f"Unknown fake model option: {key}")
+        options[key.strip()] = value.strip()
+    return options
+
+
+class FakeModelBehaviour:
+    """Latency, error and output generation for one fake model instance"""
+
+    def __init__(self, role: str, options: Dict[str, str]):
+        self.role = role
+        self.distribution = options["latency"]
+        self.latency_ms = float(options["latency_ms"])
+        self.jitter_ms = float(options["jitter_ms"])
+        self.error_rate = float(options["error_rate"])
+        self.malformed_rate = float(options["malformed_rate"])
+        self.output_tokens = int(options["output_tokens"])
+        self._random = random.Random(int(options["seed"]))
+
+    def sample_latency(self) -> float:
+        """Sample a latency in seconds from the configured distribution"""
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            low = max(self.latency_ms - self.jitter_ms, 0)
+            millis = self._random.uniform(low, self.latency_ms + self.jitter_ms)
+        elif self.distribution == "lognormal":
+            # Median at latency_ms with a long right tail, like real providers
+            sigma = self.jitter_ms / self.latency_ms if self.jitter_ms else 0.5
+            millis = self.latency_ms * self._random.lognormvariate(0, sigma)
+        else:
+            millis = self.latency_ms
+        return millis / 1000
+
+    async def __call__(self, messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        prompt = _last_user_prompt(messages)
+        await asyncio.sleep(self.sample_latency())
+
+        roll = self._random.random()
+        if roll < self.error_rate:
+            raise ModelHTTPError(status_code=503, model_name=FAKE_MODEL_PREFIX, body="fake model error")
+
+        if roll < self.error_rate + self.malformed_rate:
+            text = '{"total_score": 7, "feedback": "truncated'
+        else:
+            text = json.dumps(self._build_output(prompt), ensure_ascii=False)
+
+        usage = RequestUsage(input_tokens=_estimate_tokens(messages), output_tokens=self.output_tokens)
+        return ModelResponse(parts=[TextPart(text)], usage=usage)
+
+    def _build_output(self, prompt: str) -> dict:
+        """Deterministic, schema-valid output derived from the prompt text"""
+        score = _stable_score(prompt)
+        language = "en" if "English" in prompt else "zh-HK"
+        feedback = "Fake evaluation feedback." if language == "en" else "模擬評估反饋。"
+
+        if self.role == MULTI_ROUND_EVALUATION_ROLE:
+            match = _CRITERIA_PATTERN.search(prompt)
+            criteria = [c.strip() for c in match.group(1).split(",")] if match else ["overall"]
+            criteria_scores = {criterion: min(score // 3, 3) for criterion in criteria}
+            return {
+                "criteria_scores": criteria_scores,
+                "total_score": sum(criteria_scores.values()),
+                "feedback": feedback,
+                "detailed_feedback": {criterion: feedback for criterion in criteria},
+                "passed": False,
+            }
+
+        if self.role == TEEN_RESPONSE_ROLE:
+            match = re.search(r"(\d+)\s*/\s*10", prompt)
+            parent_score = int(match.group(1)) if match else score
+            if parent_score >= 8:
+                emotion = "cooperative"
+            elif parent_score >= 6:
+                emotion = "reluctant"
+            elif parent_score >= 4:
+                emotion = "defensive"
+            else:
+                emotion = "upset"
+            return {"response": _TEEN_REPLIES[language][emotion], "emotion": emotion}
+
+        tone, approach = min(score, 4), min(score // 2, 3)
+        respect = min(max(score - tone - approach, 0), 3)
+        total = tone + approach + respect
+        return {
+            "tone_score": tone,
+            "approach_score": approach,
+            "respect_score": respect,
+            "total_score": total,
+            "feedback": feedback,
+            "passed": total >= 7,
+        }
+
+
+def build_fake_model(model_name: str, role: str) -> FunctionModel:
+    """Build a pydantic_ai FunctionModel that answers like the real agents"""
+    behaviour = FakeModelBehaviour(role, parse_fake_model_options(model_name))
+    return FunctionModel(behaviour, model_name=f"{FAKE_MODEL_PREFIX}-{role}")
+
+
+def _last_user_prompt(messages: List[ModelMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, UserPromptPart):
+                    if isinstance(part.content, str):
+                        return part.content
+                    # Prompts split around a CachePoint
+                    return "\n\n".join(item for item in part.content if isinstance(item, str))
+    return ""
+
+
+def _stable_score(prompt: str) -> int:
+    """Score 0-10 that only depends on the prompt, so runs are reproducible"""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    return digest[0] % 11
+
+
+def _estimate_tokens(messages: List[ModelMessage]) -> int:
+    chars = 0
+    for message in messages:
+        for part in message.parts:
+            content = getattr(part, "content", "")
+            chars += len(content) if isinstance(content, str) else 0
+    return max(chars // 4, 1)
@@ -0,0 +1,133 @@
+"""Process-wide, keep-alive HTTP clients shared by every agent
+
+One httpx.AsyncClient per provider is created on first use and handed to the
+pydantic_ai provider of every model, so evaluation and teen agents (and warm
+Lambda invocations) reuse the same pooled TLS connections. HTTP/2 is opt-in
+(HTTP_CLIENT_HTTP2) and needs the optional h2 package. Bedrock goes through boto3, which gets a
+shared botocore client with TCP keep-alive and the same connection limit.
+"""
+
+import importlib.util
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+import httpx
+from ..config import HttpClientConfig
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def check_configuration() -> None:
+    """Called at startup: say once that HTTP/2 was asked for but cannot be used"""
+    if HttpClientConfig.HTTP2 and not HTTP2_AVAILABLE:
+        logger.warning("HTTP_CLIENT_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+
+
+class _ConnectionCounters:
+    """Requests and newly opened connections per provider"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.new_connections: Dict[str, int] = defaultdict(int)
+        self.tls_handshakes: Dict[str, int] = defaultdict(int)
+
+    def tracer(self, provider: str):
+        """httpcore trace callback that counts connection setup for one provider"""
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                with self._lock:
+                    self.new_connections[provider] += 1
+            elif event_name == "connection.start_tls.complete":
+                with self._lock:
+                    self.tls_handshakes[provider] += 1
+        return trace
+
+    def count_request(self, provider: str) -> None:
+        with self._lock:
+            self.requests[provider] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                provider: {
+                    "requests": requests,
+                    "new_connections": self.new_connections[provider],
+                    "tls_handshakes": self.tls_handshakes[provider],
+                    "reused_connections": max(requests - self.new_connections[provider], 0),
+                    "reuse_ratio": round(1 - self.new_connections[provider] / requests, 3) if requests else 0.0,
+                }
+                for provider, requests in sorted(self.requests.items())
+            }
+
+
+class HttpClientPool:
+    """Lazily created shared clients, one per provider"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._bedrock_client: Any = None
+        self.counters = _ConnectionCounters()
+
+    def get_client(self, provider: str) -> httpx.AsyncClient:
+        """Shared async client for a provider such as 'openai' or 'anthropic'"""
+        with self._lock:
+            client = self._clients.get(provider)
+            if client is None or client.is_closed:
+                client = self._clients[provider] = self._build_client(provider)
+            return client
+
+    def _build_client(self, provider: str) -> httpx.AsyncClient:
+        counters = self.counters
+
+        async def on_request(request: httpx.Request) -> None:
+            counters.count_request(provider)
+            request.extensions["trace"] = counters.tracer(provider)
+
+        return httpx.AsyncClient(
+            http2=HttpClientConfig.HTTP2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=HttpClientConfig.MAX_CONNECTIONS,
+                max_keepalive_connections=HttpClientConfig.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HttpClientConfig.KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(HttpClientConfig.TIMEOUT, connect=HttpClientConfig.CONNECT_TIMEOUT),
+            event_hooks={"request": [on_request]},
+        )
+
+    def get_bedrock_client(self) -> Any:
+        """Shared boto3 bedrock-runtime client with keep-alive and a sized pool"""
+        with self._lock:
+            if self._bedrock_client is None:
+                import boto3
+                from botocore.config import Config
+
+                self._bedrock_client = boto3.client(
+                    "bedrock-runtime",
+                    config=Config(
+                        max_pool_connections=HttpClientConfig.MAX_CONNECTIONS,
+                        tcp_keepalive=True,
+                        read_timeout=HttpClientConfig.TIMEOUT,
+                        connect_timeout=HttpClientConfig.CONNECT_TIMEOUT,
+                    ),
+                )
+            return self._bedrock_client
+
+    def snapshot(self) -> dict:
+        """Connection reuse counters per provider"""
+        return {"http2": HttpClientConfig.HTTP2 and HTTP2_AVAILABLE, "providers": self.counters.snapshot()}
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+# Process-wide pool; lives as long as the process, including warm Lambda containers
+http_client_pool = HttpClientPool()
@@ -0,0 +1,204 @@
+"""Optional in-process CPU model for the teen responder
+
+Teen replies are short and low-stakes, so a small quantized chat model
+(e.g. a 0.5B-1.5B instruct model as Q4 GGUF) running on the container's CPU
+can answer them without a provider round-trip. Needs the optional
+llama-cpp-python package and a model file:
+
+    TEEN_RESPONSE_MODEL=local                      # uses LOCAL_MODEL_PATH
+    TEEN_RESPONSE_MODEL=local:path=/models/teen.gguf,workers=2,threads=2
+
+The model is loaded (and run once) when the agent is built, not on the first
+request. Generation runs on a bounded thread pool, one loaded copy per
+worker since llama.cpp contexts are not thread-safe, and requests beyond
+max_queue waiting ones fail straight away so callers use their fallback.
+"""
+
+import asyncio
+import importlib.util
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import (
+    ModelMessage, ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.usage import RequestUsage
+from ..config import LocalModelConfig, ModelConfig
+
+LOCAL_MODEL_PREFIX = "local"
+LLAMA_CPP_AVAILABLE = importlib.util.find_spec("llama_cpp") is not None
+
+# Loads one model copy: (path, context_tokens, threads) -> object with create_chat_completion
+Loader = Callable[[str, int, int], Any]
+
+
+def is_local_model(model_name: str) -> bool:
+    """Check if a model id selects the in-process CPU model"""
+    return model_name == LOCAL_MODEL_PREFIX or model_name.startswith(f"{LOCAL_MODEL_PREFIX}:")
+
+
+def parse_local_model_options(model_name: str) -> Dict[str, str]:
+    """Parse 'local:key=value,key=value' overrides on top of LocalModelConfig"""
+    options = {
+        "path": LocalModelConfig.PATH,
+        "ctx": str(LocalModelConfig.CONTEXT_TOKENS),
+        "threads": str(LocalModelConfig.THREADS),
+        "workers": str(LocalModelConfig.WORKERS),
+        "max_queue": str(LocalModelConfig.MAX_QUEUE),
+        "max_tokens": str(LocalModelConfig.MAX_TOKENS),
+    }
+    _, _, spec = model_name.partition(":")
+    for item in filter(None, spec.split(",")):
+        key, _, value = item.partition("=")
+        if key.strip() not in options:
+            raise ValueError(f"Unknown local model option: {key}")
+        options[key.strip()] = value.strip()
+    if not options["path"]:
+        raise ValueError("Local model needs a GGUF file: set LOCAL_MODEL_PATH or local:path=...")
+    return options
+
+
+def load_llama(path: str, context_tokens: int, threads: int) -> Any:
+    """Load a GGUF model with llama-cpp-python"""
+    if not LLAMA_CPP_AVAILABLE:
+        raise RuntimeError("Local models need the llama-cpp-python package (pip install llama-cpp-python)")
+    from llama_cpp import Llama
+
+    return Llama(model_path=path, n_ctx=context_tokens, n_threads=threads or None, verbose=False)
+
+
+def to_chat_messages(messages: List[ModelMessage]) -> List[dict]:
+    """pydantic_ai message history as OpenAI-style chat messages for llama.cpp"""
+    chat = []
+    for message in messages:
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, SystemPromptPart):
+                    chat.append({"role": "system", "content": part.content})
+                elif isinstance(part, UserPromptPart):
+                    content = part.content
+                    if not isinstance(content, str):
+                        # Prompts split around a CachePoint
+                        content = "\n\n".join(item for item in content if isinstance(item, str))
+                    chat.append({"role": "user", "content": content})
+        elif isinstance(message, ModelResponse):
+            text = "".join(part.content for part in message.parts if isinstance(part, TextPart))
+            if text:
+                chat.append({"role": "assistant", "content": text})
+    return chat
+
+
+class LocalChatModel:
+    """Warm llama.cpp model copies behind a bounded inference pool"""
+
+    def __init__(
+        self,
+        path: str,
+        context_tokens: int = 2048,
+        threads: int = 0,
+        workers: int = 1,
+        max_queue: int = 8,
+        max_tokens: int = 128,
+        loader: Loader = load_llama
+    ):
+        self.path = path
+        self.workers = max(workers, 1)
+        self.max_queue = max_queue
+        self.max_tokens = max_tokens
+        self._idle: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        for _ in range(self.workers):
+            llm = loader(path, context_tokens, threads)
+            # Page the weights in and build the compute graph before the first real request
+            llm.create_chat_completion(messages=[{"role": "user", "content": "Hi"}], max_tokens=1)
+            self._idle.put(llm)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="local-model")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def complete(self, chat: List[dict], max_tokens: int, temperature: float) -> Tuple[str, int, int]:
+        """Blocking generation on an idle model copy: (text, prompt tokens, completion tokens)"""
+        llm = self._idle.get()
+        try:
+            result = llm.create_chat_completion(
+                messages=chat,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                response_format={"type": "json_object"},
+            )
+        finally:
+            self._idle.put(llm)
+        usage = result.get("usage") or {}
+        text = result["choices"][0]["message"]["content"] or ""
+        return text, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+    async def __call__(self, messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                raise ModelHTTPError(status_code=503, model_name=self.model_name, body="local model queue is full")
+            self._in_flight += 1
+        try:
+            settings = info.model_settings or {}
+            text, input_tokens, output_tokens = await asyncio.get_running_loop().run_in_executor(
+                self._pool,
+                self.complete,
+                to_chat_messages(messages),
+                settings.get("max_tokens", self.max_tokens),
+                settings.get("temperature", ModelConfig.TEMPERATURE),
+            )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        usage = RequestUsage(input_tokens=input_tokens, output_tokens=output_tokens)
+        return ModelResponse(parts=[TextPart(text)], usage=usage, model_name=self.model_name)
+
+    @property
+    def model_name(self) -> str:
+        return f"{LOCAL_MODEL_PREFIX}-{Path(self.path).stem}"
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_loaded: Dict[str, LocalChatModel] = {}
+_loaded_lock = threading.Lock()
+
+
+def get_local_model(model_name: str, loader: Optional[Loader] = None) -> LocalChatModel:
+    """The process's loaded model for a model id, loading it on first use"""
+    with _loaded_lock:
+        model = _loaded.get(model_name)
+        if model is None:
+            options = parse_local_model_options(model_name)
+            model = LocalChatModel(
+                options["path"],
+                context_tokens=int(options["ctx"]),
+                threads=int(options["threads"]),
+                workers=int(options["workers"]),
+                max_queue=int(options["max_queue"]),
+                max_tokens=int(options["max_tokens"]),
+                loader=loader or load_llama,
+            )
+            _loaded[model_name] = model
+        return model
+
+
+def build_local_model(model_name: str, role: str) -> FunctionModel:
+    """Build a pydantic_ai model that generates on the in-process CPU model"""
+    model = get_local_model(model_name)
+    return FunctionModel(model, model_name=f"{model.model_name}-{role}")
+
+
+def close_local_models() -> None:
+    """Stop the inference pools (on shutdown)"""
+    with _loaded_lock:
+        for model in _loaded.values():
+            model.close()
+        _loaded.clear()
@@ -0,0 +1,43 @@
+"""Resolve configured model ids into pydantic_ai models"""
+
+from typing import Union
+from pydantic_ai.models import Model
+from ..config import HttpClientConfig
+from .fake_model import (
+    EVALUATION_ROLE, MULTI_ROUND_EVALUATION_ROLE, TEEN_RESPONSE_ROLE,
+    build_fake_model, is_fake_model,
+)
+from .http_clients import http_client_pool
+from .local_model import build_local_model, is_local_model
+
+
+def build_model(model_name: str, role: str) -> Union[Model, str]:
+    """Build the model for an agent role from a configured model id
+
+    'fake[:options]' selects the deterministic offline stand-in and
+    'local[:options]' a small GGUF model run on CPU in process. OpenAI and
+    Bedrock models are built on the process-wide shared HTTP clients; other
+    provider ids are passed through to pydantic_ai.
+    """
+    if is_fake_model(model_name):
+        return build_fake_model(model_name, role)
+    if is_local_model(model_name):
+        return build_local_model(model_name, role)
+
+    provider, _, name = model_name.partition(":")
+    if not HttpClientConfig.SHARED_CLIENTS or not name:
+        return model_name
+
+    if provider == "openai":
+        from pydantic_ai.models.openai import OpenAIChatModel
+        from pydantic_ai.providers.openai import OpenAIProvider
+
+        return OpenAIChatModel(name, provider=OpenAIProvider(http_client=http_client_pool.get_client("openai")))
+
+    if provider == "bedrock":
+        from pydantic_ai.models.bedrock import BedrockConverseModel
+        from pydantic_ai.providers.bedrock import BedrockProvider
+
+        return BedrockConverseModel(name, provider=BedrockProvider(bedrock_client=http_client_pool.get_bedrock_client()))
+
+    return model_name
@@ -0,0 +1,192 @@
+"""Prompt templates laid out for provider prefix caching
+
+Every request is split into a stable prefix (rubric, scenario and output
+instructions, identical for every call on the same scenario round and
+language) and a small dynamic suffix (the parent's words or the score). The
+system prompts are fully static. Providers that cache prompt prefixes can then
+reuse everything up to the suffix.
+"""
+
+from typing import List, NamedTuple, Optional, Tuple, Union
+from ..config import ModelConfig
+
+try:
+    from pydantic_ai.messages import CachePoint
+except ImportError:  # pydantic_ai releases before explicit cache points
+    CachePoint = None
+
+# Providers whose pydantic_ai models honour explicit CachePoint markers
+CACHE_POINT_PROVIDERS = ("anthropic", "bedrock")
+
+EVALUATION_SYSTEM_PROMPT = """You are evaluating parent-teen communication quality on a 0-10 scale.
+
+IMPORTANT: You MUST provide feedback in the language requested by the user.
+- If language is "en", provide ALL feedback in English only
+- If language is "zh-HK", provide ALL feedback in Cantonese only
+
+RUBRIC:
+- Tone (0-4): 4=Very calm/patient, 3=Mostly calm, 2=Neutral, 1=Slightly frustrated, 0=Angry/harsh
+- Approach (0-3): 3=Solution-focused/collaborative, 2=Clear expectations with reasoning, 1=Direct instruction, 0=Dismissive/demanding
+- Respect (0-3): 3=Acknowledges teen feelings, 2=Shows understanding, 1=Neutral, 0=Ignores/dismisses feelings
+
+Return your evaluation as a JSON object with:
+- tone_score: int (0-4)
+- approach_score: int (0-3)
+- respect_score: int (0-3)
+- total_score: int (sum of above, 0-10)
+- feedback: str (in the requested language)
+- passed: bool (true if total_score >= 7)
+
+Be strict but fair in scoring. Provide specific feedback in the requested language exactly."""
+
+MULTI_ROUND_SYSTEM_PROMPT = """You are evaluating parent communication in a multi-round scenario with dynamic criteria.
+
+IMPORTANT: You MUST provide feedback in the language requested by the user.
+- If language is "en", provide ALL feedback in English only
+- If language is "zh-HK", provide ALL feedback in Cantonese only
+
+Each request lists the criteria for the current round with their maximum points.
+
+Return evaluation as JSON:
+- criteria_scores: dict with each criterion and score
+- total_score: int (sum of all criteria scores)
+- max_possible_score: int (maximum possible for this round)
+- feedback: str (overall feedback in the requested language)
+- detailed_feedback: dict with feedback for each criterion in the requested language
+- passed: bool (true if total_score >= threshold)
+
+Be specific in feedback. Focus on what worked and what could improve. Remember to match the requested language exactly."""
+
+TEEN_SYSTEM_PROMPT = """You are a 14-year-old teenager responding to your parent in various scenarios.
+
+Your response should be based on the parent's communication quality (score 0-10) and the specific scenario context provided.
+
+RESPONSE GUIDELINES BY SCORE:
+
+CANTONESE RESPONSES (language: zh-HK):
+- Score 8-10: Cooperative, willing to listen and work together
+- Score 6-7: Somewhat resistant but eventually willing to engage
+- Score 4-5: Defensive, argumentative, pushing back
+- Score 0-3: Very defensive, upset, feeling misunderstood
+
+ENGLISH RESPONSES (language: en):
+- Score 8-10: Cooperative, willing to listen and work together
+- Score 6-7: Somewhat resistant but eventually willing to engage
+- Score 4-5: Defensive, argumentative, pushing back
+- Score 0-3: Very defensive, upset, feeling misunderstood
+
+IMPORTANT:
+- Base your response on the specific scenario context provided
+- Stay in character as the child/teen in that scenario
+- Don't reference cleaning, homework, or other unrelated activities
+- Respond naturally to what the parent actually said
+
+Return JSON with:
+- response: str (your response in the specified language, appropriate to the scenario)
+- emotion: str (cooperative/reluctant/defensive/upset)
+
+Keep responses realistic for a 14-year-old in the given situation."""
+
+
+class PromptParts(NamedTuple):
+    """A user prompt split into a cacheable prefix and a per-call suffix"""
+
+    prefix: str
+    suffix: str
+
+    @property
+    def text(self) -> str:
+        return f"{self.prefix}\n\n{self.suffix}"
+
+
+def build_evaluation_prompt(parent_response: str, teen_opening: str, language: str = "zh-HK") -> PromptParts:
+    """Single-round evaluation prompt"""
+    if language == "en":
+        prefix = f"""Situation: The teenager said: "{teen_opening}"
+LANGUAGE: English - ALL feedback must be in English only!
+
+Please rate the parent's response below according to tone, approach, and respect criteria. Return pure JSON format only, no other text."""
+        suffix = f"Parent's response to the teenager: '{parent_response}'"
+    else:
+        prefix = f"""情境：青少年話「{teen_opening}」
+語言：廣東話 - 所有反饋必須只用廣東話！
+
+請根據語調、方法、尊重三個標準為以下父母嘅回應評分。返回純JSON格式，唔好其他文字。"""
+        suffix = f"父母對青少年嘅回應：'{parent_response}'"
+    return PromptParts(prefix, suffix)
+
+
+def build_round_rubric(rubric: List[Tuple[str, int, str]]) -> str:
+    """Rubric lines for just the criteria used in one round"""
+    return "\n".join(f"- {name} (0-{max_score}): {description}" for name, max_score, description in rubric)
+
+
+def build_multi_round_prompt(
+    parent_response: str,
+    child_prompt: str,
+    rubric: List[Tuple[str, int, str]],
+    threshold: int,
+    round_number: int,
+    language: str = "zh-HK"
+) -> PromptParts:
+    """Multi-round evaluation prompt carrying only this round's (name, max, description) rubric"""
+    criteria_desc = ", ".join(name for name, _, _ in rubric)
+    rubric_text = build_round_rubric(rubric)
+
+    if language == "en":
+        prefix = f"""Round {round_number} criteria:
+{rubric_text}
+
+Child said: '{child_prompt}'
+
+Evaluation criteria: {criteria_desc}
+Passing score: {threshold}
+LANGUAGE: English - ALL feedback must be in English only!
+
+Please rate the parent's response below according to Round {round_number} criteria. Return pure JSON format only, no other text."""
+        suffix = f"Round {round_number} parent's response to child: '{parent_response}'"
+    else:
+        prefix = f"""第{round_number}輪評估標準：
+{rubric_text}
+
+子女話：'{child_prompt}'
+
+評估標準：{criteria_desc}
+合格分數：{threshold}
+語言：廣東話 - 所有反饋必須只用廣東話！
+
+請根據第{round_number}輪嘅標準為以下父母嘅回應評分。返回純JSON格式，唔好其他文字。"""
+        suffix = f"第{round_number}輪父母對子女嘅回應：'{parent_response}'"
+    return PromptParts(prefix, suffix)
+
+
+def build_teen_prompt(score: int, context: str = "", language: str = "zh-HK", parent_response: str = "") -> PromptParts:
+    """Teen response prompt; the scenario context is the stable part"""
+    if language == "en":
+        context_part = f"Context: {context}\n" if context else ""
+        prefix = f"""{context_part}Language: English
+Higher score means better parent communication, so your response should be more cooperative. Return pure JSON format only, no other text."""
+        parent_part = f"Parent said: '{parent_response}'\n" if parent_response else ""
+        suffix = f"{parent_part}Parent's communication score is {score}/10. Please respond to the parent based on this score."
+    else:
+        context_part = f"背景：{context}\n" if context else ""
+        prefix = f"""{context_part}語言：廣東話
+分數越高表示父母溝通越好，你嘅回應應該越配合。返回純JSON格式，唔好其他文字。"""
+        parent_part = f"父母話：'{parent_response}'\n" if parent_response else ""
+        suffix = f"{parent_part}父母嘅溝通得分係 {score}/10。請根據呢個分數回應父母嘅話。"
+    return PromptParts(prefix, suffix)
+
+
+def to_user_prompt(parts: PromptParts, model_name: str) -> Union[str, list]:
+    """User prompt content, with an explicit cache point where the provider supports it"""
+    provider = model_name.split(":", 1)[0]
+    if ModelConfig.PROMPT_CACHE_HINTS and CachePoint is not None and provider in CACHE_POINT_PROVIDERS:
+        return [parts.prefix, CachePoint(), parts.suffix]
+    return parts.text
+
+
+def cache_settings(model_name: str, cache_key: str) -> Optional[dict]:
+    """Model settings that route same-prefix requests to the same provider cache"""
+    if ModelConfig.PROMPT_CACHE_HINTS and model_name.startswith("openai:"):
+        return {"openai_prompt_cache_key": cache_key}
+    return None
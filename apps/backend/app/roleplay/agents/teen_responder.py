@@ -1,70 +1,85 @@
 """Teen response generation agent"""
 
 import json
+from typing import List, Optional
 from pydantic_ai import Agent
-from ..config import ModelConfig
+from ..config import GameConfig, ModelConfig
+from .model_factory import build_model, TEEN_RESPONSE_ROLE
+from .prompts import TEEN_SYSTEM_PROMPT, build_teen_prompt, cache_settings, to_user_prompt
+from ..services.conversation import build_history
+from ..services.quota import metered
+from ..services.reply_bank import ReplyBank, reply_bank
 from ..models.evaluation import TeenResponse
+from ..models.game_state import ConversationTurn
 
 
 class TeenResponderAgent:
     """Agent responsible for generating teen responses"""
 
-    def __init__(self):
-        self._agent = Agent(ModelConfig.get_teen_response_model())
+    def __init__(self, bank: Optional[ReplyBank] = None, model_name: Optional[str] = None):
+        self.reply_bank = bank or reply_bank
+        self._model_name = model_name or ModelConfig.get_teen_response_model()
+        self._agent = Agent(build_model(self._model_name, TEEN_RESPONSE_ROLE))
         self._setup_system_prompt()
 
     def _setup_system_prompt(self):
         """Configure the teen response system prompt"""
         @self._agent.system_prompt
         def teen_prompt() -> str:
-            return """You are a 14-year-old teenager responding to your parent in various scenarios.
-
-Your response should be based on the parent's communication quality (score 0-10) and the specific scenario context provided.
-
-RESPONSE GUIDELINES BY SCORE:
-
-CANTONESE RESPONSES (language: zh-HK):
-- Score 8-10: Cooperative, willing to listen and work together
-- Score 6-7: Somewhat resistant but eventually willing to engage
-- Score 4-5: Defensive, argumentative, pushing back
-- Score 0-3: Very defensive, upset, feeling misunderstood
-
-ENGLISH RESPONSES (language: en):
-- Score 8-10: Cooperative, willing to listen and work together
-- Score 6-7: Somewhat resistant but eventually willing to engage
-- Score 4-5: Defensive, argumentative, pushing back
-- Score 0-3: Very defensive, upset, feeling misunderstood
-
-IMPORTANT:
-- Base your response on the specific scenario context provided
-- Stay in character as the child/teen in that scenario
-- Don't reference cleaning, homework, or other unrelated activities
-- Respond naturally to what the parent actually said
-
-Return JSON with:
-- response: str (your response in the specified language, appropriate to the scenario)
-- emotion: str (cooperative/reluctant/defensive/upset)
-
-Keep responses realistic for a 14-year-old in the given situation."""
-
-    async def respond(self, score: int, context: str = "", language: str = "zh-HK") -> TeenResponse:
-        """Generate teen response based on parent communication score"""
-
-        if language == "en":
-            context_part = f" Context: {context}" if context else ""
-            prompt = f"""Parent's communication score is {score}/10. Please respond to the parent based on this score. Higher score means better parent communication, so your response should be more cooperative.{context_part}
-
-Language: English
-Return pure JSON format only, no other text."""
-        else:
-            context_part = f" 背景：{context}" if context else ""
-            prompt = f"""父母嘅溝通得分係 {score}/10。請根據呢個分數回應父母嘅話。分數越高表示父母溝通越好，你嘅回應應該越配合。{context_part}
-
-語言：廣東話
-返回純JSON格式，唔好其他文字。"""
+            return TEEN_SYSTEM_PROMPT
+
+    async def respond(
+        self,
+        score: int,
+        context: str = "",
+        language: str = "zh-HK",
+        scenario: str = "",
+        round_number: Optional[int] = None,
+        used_replies: Optional[List[str]] = None,
+        seed: int = 0,
+        parent_response: str = "",
+        history: Optional[List[ConversationTurn]] = None
+    ) -> TeenResponse:
+        """Generate teen response based on parent communication score
+
+        With the reply bank enabled, a precomputed reply the session has not
+        seen yet (tracked in used_replies) is returned without a model call.
+        Otherwise the model sees the parent's words and a token-capped window
+        of earlier turns.
+        """
+        if GameConfig.TEEN_REPLY_BANK and scenario and used_replies is not None:
+            banked = self.reply_bank.draw(scenario, round_number or 1, language, score, used_replies, seed)
+            if banked:
+                return banked
 
         try:
-            result = await self._agent.run(prompt)
+            return await self.generate(score, context, language, scenario, round_number, parent_response, history)
+        except Exception:
+            # Fallback response based on score and language
+            return self._create_fallback_response(score, language)
+
+    async def generate(
+        self,
+        score: int,
+        context: str = "",
+        language: str = "zh-HK",
+        scenario: str = "",
+        round_number: Optional[int] = None,
+        parent_response: str = "",
+        history: Optional[List[ConversationTurn]] = None
+    ) -> TeenResponse:
+        """Ask the model for a reply, raising on model or parsing errors"""
+        prompt = build_teen_prompt(score, context, language, parent_response)
+        cache_key = f"{TEEN_RESPONSE_ROLE}:{scenario}:{round_number or 1}:{language}"
+        window = build_history(history or [], TEEN_SYSTEM_PROMPT, language)
+
+        with metered(TEEN_RESPONSE_ROLE, self._model_name, scenario, language, round_number) as call:
+            result = await self._agent.run(
+                to_user_prompt(prompt, self._model_name),
+                message_history=window.messages or None,
+                model_settings=cache_settings(self._model_name, cache_key)
+            )
+            call.set_usage(result.usage)
 
             # Clean up response
             output = self._clean_json_output(result.output)
@@ -74,10 +89,6 @@ Return pure JSON format only, no other text."""
 
             return TeenResponse.from_dict(teen_data)
 
-        except Exception:
-            # Fallback response based on score and language
-            return self._create_fallback_response(score, language)
-
     def _clean_json_output(self, output: str) -> str:
         """Clean up JSON output from AI response"""
         output = output.strip()
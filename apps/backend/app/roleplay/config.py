@@ -1,16 +1,85 @@
 """Configuration management for the roleplay game"""
 
 import os
-from dotenv import load_dotenv
+import json
 import logging
+import math
+from typing import Dict
+from dotenv import load_dotenv
 
 load_dotenv()
 
-# Set up logging to see what's happening
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _is_level(name: str) -> bool:
+    return isinstance(logging.getLevelName(name), int)
+
+
+def _log_level(value: str, default: str = 'INFO') -> str:
+    """A logging level name, or the default (with a warning) when it is not one"""
+    if _is_level(value.upper()):
+        return value.upper()
+    logger.warning(f"Ignoring LOG_LEVEL={value!r}; using {default}")
+    return default
+
+
+def _log_levels(spec: str) -> Dict[str, str]:
+    """LOG_LEVELS as {logger: level}; malformed entries are skipped with a warning"""
+    levels = {}
+    for item in filter(None, spec.replace(' ', '').split(',')):
+        name, _, level = item.partition('=')
+        if not name or not _is_level(level.upper()):
+            logger.warning(f"Ignoring LOG_LEVELS entry {item!r}; expected logger=LEVEL")
+            continue
+        levels[name] = level.upper()
+    return levels
+
+
+def _sample_rates(spec: str) -> Dict[str, float]:
+    """LOG_SAMPLE_RATES as {event: rate}; a malformed value or entry is skipped with a warning"""
+    try:
+        rates = json.loads(spec or '{}')
+    except ValueError:
+        rates = None
+    if not isinstance(rates, dict):
+        logger.warning(f"Ignoring LOG_SAMPLE_RATES={spec!r}; expected a JSON object of event rates")
+        return {}
+    parsed = {}
+    for event, rate in rates.items():
+        try:
+            rate = float(rate)
+        except (TypeError, ValueError):
+            rate = math.nan
+        if math.isnan(rate):
+            logger.warning(f"Ignoring LOG_SAMPLE_RATES entry {event!r}: {rates[event]!r} is not a number")
+            continue
+        parsed[event] = rate
+    return parsed
+
+
+def _model_prices(spec: str) -> Dict[str, tuple]:
+    """MODEL_PRICES as {model: (input, output)}; a malformed value or entry is skipped with a warning"""
+    try:
+        prices = json.loads(spec or '{}')
+    except ValueError:
+        prices = None
+    if not isinstance(prices, dict):
+        logger.warning(f"Ignoring MODEL_PRICES={spec!r}; expected a JSON object of [input, output] prices")
+        return {}
+    parsed = {}
+    for model, pair in prices.items():
+        try:
+            input_price, output_price = (float(price) for price in pair)
+        except (TypeError, ValueError):
+            input_price = output_price = math.nan
+        if math.isnan(input_price) or math.isnan(output_price):
+            logger.warning(f"Ignoring MODEL_PRICES entry {model!r}: {pair!r} is not [input, output]")
+            continue
+        parsed[model] = (input_price, output_price)
+    return parsed
+
+
 class ModelConfig:
     """AI Model configuration from environment variables"""
 
@@ -18,23 +87,100 @@ class ModelConfig:
     EVALUATION_MODEL = os.getenv('EVALUATION_MODEL', 'openai:gpt-4o-mini')
     TEEN_RESPONSE_MODEL = os.getenv('TEEN_RESPONSE_MODEL', 'openai:gpt-4o-mini')
 
+    # Evaluation cascade: a cheaper model scores first and only results within
+    # CASCADE_ESCALATION_MARGIN points of the pass threshold (or that disagree with the
+    # local pre-score) go to EVALUATION_MODEL. Empty disables the fast tier.
+    FAST_EVALUATION_MODEL = os.getenv('FAST_EVALUATION_MODEL', '')
+    CASCADE_ESCALATION_MARGIN = int(os.getenv('CASCADE_ESCALATION_MARGIN', '1'))
+
+    # Send provider prompt-cache hints (cache points / cache keys) for stable prompt prefixes
+    PROMPT_CACHE_HINTS = os.getenv('PROMPT_CACHE_HINTS', 'true').lower() == 'true'
+
     # Model parameters
     MAX_TOKENS = int(os.getenv('MAX_TOKENS', '1000'))
     TEMPERATURE = float(os.getenv('TEMPERATURE', '0.7'))
 
+    # USD per million (input, output) tokens, for cost estimates in agent metrics.
+    # Override or extend with MODEL_PRICES='{"openai:gpt-4o": [2.5, 10.0]}'
+    MODEL_PRICES = {
+        'openai:gpt-4o-mini': (0.15, 0.60),
+        'openai:gpt-4o': (2.50, 10.00),
+        'bedrock:deepseek.v3-v1:0': (0.58, 1.68),
+        **_model_prices(os.getenv('MODEL_PRICES', '{}')),
+    }
+
+    @classmethod
+    def get_model_prices(cls, model: str) -> tuple:
+        """Get (input, output) USD per million tokens; unknown models cost 0"""
+        return cls.MODEL_PRICES.get(model, (0.0, 0.0))
+
     @classmethod
     def get_evaluation_model(cls) -> str:
         """Get the model for evaluation tasks"""
-        logger.info(f"Using evaluation model: {cls.EVALUATION_MODEL}")
         return cls.EVALUATION_MODEL
 
     @classmethod
     def get_teen_response_model(cls) -> str:
         """Get the model for teen response generation"""
-        logger.info(f"Using teen response model: {cls.TEEN_RESPONSE_MODEL}")
         return cls.TEEN_RESPONSE_MODEL
 
 
+class LoggingConfig:
+    """Process-wide logging (set up by app.services.logging_service.configure_logging)"""
+
+    # Unknown level names and malformed entries below are ignored with a warning, not fatal at import
+    LEVEL = _log_level(os.getenv('LOG_LEVEL', 'INFO'))
+    # Per-logger levels, e.g. LOG_LEVELS='app.roleplay.agents.evaluator=DEBUG,httpx=WARNING'
+    LEVELS = _log_levels(os.getenv('LOG_LEVELS', ''))
+    FORMAT = os.getenv('LOG_FORMAT', 'json')  # json, or text for local development
+    # Share of verbose events kept, by the event name passed as extra={"event": ...};
+    # warnings and errors are never sampled out
+    SAMPLE_RATES = {
+        'cascade.routed': 0.1,
+        'evaluation.output': 0.1,
+        **_sample_rates(os.getenv('LOG_SAMPLE_RATES', '{}')),
+    }
+    QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))  # Records beyond this are dropped, not waited on
+    # Write in the calling thread instead of through the queue. On by default on Lambda, which
+    # freezes the listener thread between invocations and runs no shutdown hook to drain it
+    SYNCHRONOUS = os.getenv('LOG_SYNCHRONOUS', 'true' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'false').lower() == 'true'
+
+
+class HttpClientConfig:
+    """Shared provider HTTP clients (connection pooling and keep-alive)"""
+
+    SHARED_CLIENTS = os.getenv('SHARED_HTTP_CLIENTS', 'true').lower() == 'true'
+    HTTP2 = os.getenv('HTTP_CLIENT_HTTP2', 'false').lower() == 'true'  # Needs the h2 package (httpx[http2])
+    MAX_CONNECTIONS = int(os.getenv('HTTP_CLIENT_MAX_CONNECTIONS', '100'))
+    MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('HTTP_CLIENT_MAX_KEEPALIVE', '20'))
+    KEEPALIVE_EXPIRY = float(os.getenv('HTTP_CLIENT_KEEPALIVE_EXPIRY', '120'))
+    TIMEOUT = float(os.getenv('HTTP_CLIENT_TIMEOUT', '60'))
+    CONNECT_TIMEOUT = float(os.getenv('HTTP_CLIENT_CONNECT_TIMEOUT', '5'))
+
+
+class FakeModelConfig:
+    """Defaults for the offline 'fake' model (overridable inline, e.g. fake:latency_ms=200)"""
+
+    LATENCY_DISTRIBUTION = os.getenv('FAKE_MODEL_LATENCY', 'fixed')  # fixed, uniform, lognormal
+    LATENCY_MS = float(os.getenv('FAKE_MODEL_LATENCY_MS', '0'))
+    LATENCY_JITTER_MS = float(os.getenv('FAKE_MODEL_LATENCY_JITTER_MS', '0'))
+    ERROR_RATE = float(os.getenv('FAKE_MODEL_ERROR_RATE', '0'))
+    MALFORMED_RATE = float(os.getenv('FAKE_MODEL_MALFORMED_RATE', '0'))
+    OUTPUT_TOKENS = int(os.getenv('FAKE_MODEL_OUTPUT_TOKENS', '120'))
+    SEED = int(os.getenv('FAKE_MODEL_SEED', '42'))
+
+
+class LocalModelConfig:
+    """In-process CPU model (llama-cpp-python, GGUF), overridable inline, e.g. local:path=/models/teen.gguf,workers=2"""
+
+    PATH = os.getenv('LOCAL_MODEL_PATH', '')
+    CONTEXT_TOKENS = int(os.getenv('LOCAL_MODEL_CONTEXT_TOKENS', '2048'))
+    THREADS = int(os.getenv('LOCAL_MODEL_THREADS', '0'))  # Per worker; 0 lets llama.cpp decide
+    WORKERS = int(os.getenv('LOCAL_MODEL_WORKERS', '1'))  # Concurrent generations, one loaded copy each
+    MAX_QUEUE = int(os.getenv('LOCAL_MODEL_MAX_QUEUE', '8'))  # Waiting requests before failing fast
+    MAX_TOKENS = int(os.getenv('LOCAL_MODEL_MAX_TOKENS', '128'))
+
+
 class GameConfig:
     """Game-specific configuration"""
 
@@ -42,4 +188,88 @@ class GameConfig:
     PASS_THRESHOLD = int(os.getenv('PASS_THRESHOLD', '7'))
 
     # Scenario settings - adjust path for main backend
-    SCENARIOS_DIR = os.getenv('SCENARIOS_DIR', 'app/roleplay/scenarios/data')
\ No newline at end of file
+    SCENARIOS_DIR = os.getenv('SCENARIOS_DIR', 'app/roleplay/scenarios/data')
+    # Compiled scenario pack (python -m app.roleplay.tools.compile_scenarios); used instead
+    # of the YAML files when the file exists
+    SCENARIO_PACK = os.getenv('SCENARIO_PACK', '')
+
+    # Local pre-scorer: provisional scores are always computed; short-circuiting
+    # the evaluation model on clear pass/fail answers is opt-in
+    PRESCORE_SHORT_CIRCUIT = os.getenv('PRESCORE_SHORT_CIRCUIT', 'false').lower() == 'true'
+    PRESCORE_FAIL_BELOW = int(os.getenv('PRESCORE_FAIL_BELOW', '3'))
+    PRESCORE_PASS_ABOVE = int(os.getenv('PRESCORE_PASS_ABOVE', '9'))
+    PRESCORE_MIN_CONFIDENCE = float(os.getenv('PRESCORE_MIN_CONFIDENCE', '0.75'))
+
+    # Teen reply bank: draw precomputed replies and only call the model when a cell is empty
+    TEEN_REPLY_BANK = os.getenv('TEEN_REPLY_BANK', 'false').lower() == 'true'
+    REPLY_BANK_DIR = os.getenv('REPLY_BANK_DIR', 'app/roleplay/scenarios/data/replies')
+
+    # Teen conversation memory: recent turns go in as message history, older ones are
+    # folded into a short summary, and both together stay under the token cap
+    TEEN_HISTORY_MAX_TOKENS = int(os.getenv('TEEN_HISTORY_MAX_TOKENS', '240'))
+    TEEN_HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv('TEEN_HISTORY_SUMMARY_MAX_TOKENS', '80'))
+    TEEN_HISTORY_MAX_MESSAGE_CHARS = int(os.getenv('TEEN_HISTORY_MAX_MESSAGE_CHARS', '400'))
+    # Exchanges kept in the game state (and so in state tokens and saved sessions); 0 keeps all
+    CONVERSATION_MAX_TURNS = int(os.getenv('CONVERSATION_MAX_TURNS', '12'))
+
+    # Batch evaluation API: items per request, concurrent model calls, remembered results
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '1000'))
+    BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '8'))
+    BATCH_CACHE_SIZE = int(os.getenv('BATCH_CACHE_SIZE', '5000'))
+
+    # Stateless sessions: the signed game state travels with the client instead of
+    # living in this process, so any Lambda container can serve any turn
+    STATELESS_SESSIONS = os.getenv('ROLEPLAY_STATELESS', 'false').lower() == 'true'
+    STATE_TOKEN_SECRET = os.getenv('ROLEPLAY_STATE_SECRET', '')
+    STATE_TOKEN_TTL = int(os.getenv('ROLEPLAY_STATE_TTL', '86400'))
+
+    # Local input gate run before any model call: blocklist and gibberish checks
+    INPUT_FILTER_ENABLED = os.getenv('INPUT_FILTER_ENABLED', 'true').lower() == 'true'
+    INPUT_MIN_ENTROPY = float(os.getenv('INPUT_MIN_ENTROPY', '1.5'))  # Bits per character, for 10+ characters
+
+    # Size limits on text interpolated into prompts, checked when request bodies are parsed:
+    # over-long text is rejected (422) or, with INPUT_OVERSIZE=truncate, cut to fit.
+    # Raw bodies are capped while they are read (413)
+    INPUT_MAX_CHARS = int(os.getenv('INPUT_MAX_CHARS', '1000'))
+    INPUT_MAX_TOKENS = int(os.getenv('INPUT_MAX_TOKENS', '400'))
+    INPUT_OVERSIZE = os.getenv('INPUT_OVERSIZE', 'reject')  # reject, truncate
+    MAX_BODY_BYTES = int(os.getenv('ROLEPLAY_MAX_BODY_BYTES', '65536'))
+    BATCH_MAX_BODY_BYTES = int(os.getenv('BATCH_MAX_BODY_BYTES', '4194304'))
+
+    # Per-user daily model budgets (0 disables a limit); usage is counted in process,
+    # flushed to the database at most this often and re-read from it once this old
+    QUOTA_DAILY_CALLS = int(os.getenv('QUOTA_DAILY_CALLS', '200'))
+    QUOTA_DAILY_TOKENS = int(os.getenv('QUOTA_DAILY_TOKENS', '300000'))
+    QUOTA_FLUSH_SECONDS = float(os.getenv('QUOTA_FLUSH_SECONDS', '30'))
+
+    # Signed-in players' sessions are kept in the database (resumable on any device);
+    # anonymous sessions stay in memory or in state tokens
+    PERSISTENT_SESSIONS = os.getenv('ROLEPLAY_PERSISTENT_SESSIONS', 'true').lower() == 'true'
+    # Each turn appends only what it changed; the full state is rewritten every this many saves
+    SESSION_SNAPSHOT_EVERY = int(os.getenv('ROLEPLAY_SESSION_SNAPSHOT_EVERY', '8'))
+
+    # WebSocket play (/ws/{session_id}): the server pings after this many idle seconds and
+    # closes after WS_MISSED_HEARTBEATS unanswered pings; the last WS_REPLAY_FRAMES frames of
+    # up to WS_REPLAY_SESSIONS sessions are kept for clients that reconnect
+    WS_HEARTBEAT_SECONDS = float(os.getenv('ROLEPLAY_WS_HEARTBEAT_SECONDS', '20'))
+    WS_MISSED_HEARTBEATS = int(os.getenv('ROLEPLAY_WS_MISSED_HEARTBEATS', '2'))
+    WS_REPLAY_FRAMES = int(os.getenv('ROLEPLAY_WS_REPLAY_FRAMES', '50'))
+    WS_REPLAY_SESSIONS = int(os.getenv('ROLEPLAY_WS_REPLAY_SESSIONS', '1000'))
+
+    # Transcripts: every turn is appended to the roleplay_transcripts table. The NDJSON
+    # export is disabled unless an export token is configured
+    TRANSCRIPTS_ENABLED = os.getenv('ROLEPLAY_TRANSCRIPTS', 'true').lower() == 'true'
+    TRANSCRIPT_EXPORT_TOKEN = os.getenv('TRANSCRIPT_EXPORT_TOKEN', '')
+    TRANSCRIPT_EXPORT_BATCH = int(os.getenv('TRANSCRIPT_EXPORT_BATCH', '1000'))
+
+    # Scenario recommender: per-user criterion totals cached in-process (LRU, seconds);
+    # mastered scenarios keep this fraction of their score
+    RECOMMENDER_CACHE_SIZE = int(os.getenv('RECOMMENDER_CACHE_SIZE', '10000'))
+    RECOMMENDER_CACHE_TTL = float(os.getenv('RECOMMENDER_CACHE_TTL', '900'))
+    RECOMMENDER_MASTERED_PENALTY = float(os.getenv('RECOMMENDER_MASTERED_PENALTY', '0.25'))
+
+    # Scenario catalog pagination; the scenario directory is checked for added, removed or
+    # edited files at most this often and the indexes rebuilt when something changed
+    CATALOG_PAGE_SIZE = int(os.getenv('CATALOG_PAGE_SIZE', '20'))
+    CATALOG_MAX_PAGE_SIZE = int(os.getenv('CATALOG_MAX_PAGE_SIZE', '100'))
+    CATALOG_REFRESH_SECONDS = float(os.getenv('CATALOG_REFRESH_SECONDS', '30'))
@@ -1,7 +1,9 @@
 """Evaluation and response models"""
 
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from pydantic import AfterValidator, BaseModel, PrivateAttr
+from typing import Annotated, ClassVar, Dict, List, Optional, Tuple
+from ..config import GameConfig
+from ..services.tokens import estimate_tokens, truncate_to_tokens
 
 
 class EvaluationResult(BaseModel):
@@ -58,6 +60,18 @@ class MultiRoundEvaluationResult(BaseModel):
         )
 
 
+class ProvisionalScore(BaseModel):
+    """Instant rubric estimate from the local pre-scorer (no model call)"""
+
+    tone_score: int  # 0-4
+    approach_score: int  # 0-3
+    respect_score: int  # 0-3
+    total_score: int  # 0-10
+    confidence: float  # 0-1, how decisive the lexicon signals are
+    verdict: str  # pass, fail, uncertain
+    signals: Dict[str, int] = {}  # Lexicon hit counts that drove the score
+
+
 class RoundResult(BaseModel):
     """Result of a completed round"""
 
@@ -97,17 +111,63 @@ class TeenResponse(BaseModel):
         )
 
 
+def _limit_prompt_text(text: str) -> str:
+    """Hold text bound for a prompt to INPUT_MAX_CHARS and INPUT_MAX_TOKENS (estimated)"""
+    max_chars, max_tokens = GameConfig.INPUT_MAX_CHARS, GameConfig.INPUT_MAX_TOKENS
+    if len(text) <= max_chars and estimate_tokens(text) <= max_tokens:
+        return text
+    if GameConfig.INPUT_OVERSIZE == "truncate":
+        return truncate_to_tokens(text[:max_chars], max_tokens)
+    raise ValueError(f"Text is limited to {max_chars} characters and about {max_tokens} tokens")
+
+
+# Request text that ends up in a model prompt
+PromptText = Annotated[str, AfterValidator(_limit_prompt_text)]
+
+
+class PromptRequest(BaseModel):
+    """Request carrying prompt text, with its token estimate worked out once on arrival for budgeting"""
+
+    _prompt_fields: ClassVar[Tuple[str, ...]] = ("parent_response",)
+    _estimated_tokens: int = PrivateAttr(0)
+
+    def model_post_init(self, __context) -> None:
+        self._estimated_tokens = sum(estimate_tokens(getattr(self, field)) for field in self._prompt_fields)
+
+    @property
+    def estimated_tokens(self) -> int:
+        return self._estimated_tokens
+
+
 # API Request/Response models
-class EvaluateRequest(BaseModel):
+class EvaluateRequest(PromptRequest):
     """Request to evaluate parent response (standalone evaluation)"""
-    parent_response: str
-    teen_opening: str
+    _prompt_fields = ("parent_response", "teen_opening")
+
+    parent_response: PromptText
+    teen_opening: PromptText
     language: Optional[str] = "zh-HK"  # Default to Cantonese for backward compatibility
 
 
-class GameResponseRequest(BaseModel):
+class BatchEvaluationItem(PromptRequest):
+    """One sample response to evaluate in a batch"""
+    scenario: str
+    round: int = 1
+    language: str = "zh-HK"
+    parent_response: PromptText
+    id: Optional[str] = None  # Caller's reference, echoed back in the result
+
+
+class BatchEvaluationRequest(BaseModel):
+    """Request to evaluate many sample responses at once"""
+    items: List[BatchEvaluationItem]
+
+
+class GameResponseRequest(PromptRequest):
     """Request to submit parent response in game"""
-    parent_response: str
+    parent_response: PromptText
+    state_token: Optional[str] = None  # Stateless sessions: token from the previous response
+    version: Optional[int] = None  # Signed-in sessions: version from the previous response, to detect races
 
 
 class TeenResponseRequest(BaseModel):
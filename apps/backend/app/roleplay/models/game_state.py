@@ -4,15 +4,26 @@ from typing import Optional, List
 from pydantic import BaseModel
 
 
+class ConversationTurn(BaseModel):
+    """One parent message and the teen's reply to it"""
+
+    round: int = 1
+    parent: str
+    teen: str
+    emotion: str = ""
+
+
 class GameState(BaseModel):
     """State tracking for the roleplay game"""
 
     # Scenario information
+    scenario_name: str = ""  # Scenario file stem, used to reload round data
     scenario_title: str
     scenario_background: str
     teen_opening: str
     is_multi_round: bool = False
     language: str = "zh-HK"  # User's preferred language
+    user_id: Optional[str] = None  # Set when the player is known, for achievements
 
     # Single-round game progress (legacy)
     parent_response: str = ""
@@ -26,7 +37,15 @@ class GameState(BaseModel):
     max_round_attempts: int = 3
     round_history: List['RoundResult'] = []
 
+    # Latest parent/teen exchanges, oldest first, for the teen's memory (capped by remember_turn)
+    conversation: List[ConversationTurn] = []
+
+    # Reply bank draws for this session: seed and the replies already shown
+    reply_seed: int = 0
+    used_replies: List[str] = []
+
     # Results
+    provisional_evaluation: Optional['ProvisionalScore'] = None
     evaluation: Optional['EvaluationResult'] = None
     multi_round_evaluation: Optional['MultiRoundEvaluationResult'] = None
     teen_response: Optional[str] = None
@@ -46,6 +65,12 @@ class GameState(BaseModel):
             return self.multi_round_evaluation is not None and self.multi_round_evaluation.passed
         return self.evaluation is not None and self.evaluation.passed
 
+    def remember_turn(self, turn: ConversationTurn, max_turns: int) -> None:
+        """Append an exchange, keeping only the last max_turns"""
+        self.conversation.append(turn)
+        if max_turns > 0 and len(self.conversation) > max_turns:
+            del self.conversation[:-max_turns]
+
     def increment_attempt(self) -> None:
         """Increment the attempt counter"""
         if self.is_multi_round:
@@ -89,5 +114,5 @@ class GameState(BaseModel):
 
 
 # Forward reference resolution
-from .evaluation import EvaluationResult, MultiRoundEvaluationResult, RoundResult, ScenarioCompletion
+from .evaluation import EvaluationResult, MultiRoundEvaluationResult, ProvisionalScore, RoundResult, ScenarioCompletion
 GameState.model_rebuild()
\ No newline at end of file
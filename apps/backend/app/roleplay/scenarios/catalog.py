@@ -0,0 +1,178 @@
+"""In-memory scenario catalog with inverted indexes for filtering and search"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from pydantic import BaseModel
+from ..config import GameConfig
+from .loader import Scenario, ScenarioLoader
+
+# Latin words, or single CJK characters (Cantonese titles have no word breaks)
+_TOKEN_PATTERN = re.compile(r"[㐀-鿿]|[^\W_]+")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Search tokens for free-text matching"""
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+class ScenarioSummary(BaseModel):
+    """Catalog entry: everything a scenario picker shows without loading the YAML"""
+
+    name: str
+    title: str
+    title_zh: Optional[str] = None
+    level: int
+    is_multi_round: bool
+    visible: bool
+    tags: List[str]
+    age_min: int
+    age_max: int
+    difficulty: str
+    techniques: List[str]
+    languages: List[str]
+
+    @classmethod
+    def from_scenario(cls, scenario: Scenario) -> "ScenarioSummary":
+        return cls(
+            name=scenario.name,
+            title=scenario.case_name,
+            title_zh=scenario.case_name_zh,
+            level=scenario.level,
+            is_multi_round=scenario.is_multi_round,
+            visible=scenario.visible,
+            tags=scenario.tags,
+            age_min=scenario.age_min,
+            age_max=scenario.age_max,
+            difficulty=scenario.difficulty,
+            techniques=scenario.techniques,
+            languages=scenario.languages,
+        )
+
+
+class ScenarioCatalog:
+    """Scenario summaries indexed by tag, age, difficulty, technique, language and title words
+
+    Queries are set intersections over the indexes, so filtering stays cheap
+    with thousands of scenarios. At most every refresh_seconds a query checks
+    the scenario directory and rebuilds the indexes if a file was added,
+    removed or edited (the loader only re-parses the changed ones). The first
+    build blocks concurrent queries; later ones serve the current indexes
+    until the rebuild is done.
+    """
+
+    def __init__(self, loader: Optional[ScenarioLoader] = None, refresh_seconds: Optional[float] = None):
+        self.loader = loader or ScenarioLoader()
+        self.refresh_seconds = GameConfig.CATALOG_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._summaries: Optional[Dict[str, ScenarioSummary]] = None
+        self._index: Dict[str, Dict[str, Set[str]]] = {}
+        self._visible: Set[str] = set()
+        self._fingerprint: Optional[tuple] = None
+        self._checked_at = 0.0
+
+    def refresh(self) -> None:
+        """Re-read the scenario directory and rebuild the indexes"""
+        with self._refresh_lock:
+            self._build(self.loader.fingerprint())
+
+    def _build(self, fingerprint: tuple) -> None:
+        summaries = {}
+        index: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        for name in self.loader.list_scenario_files():
+            scenario = self.loader.load_scenario(name)
+            if not scenario:
+                continue
+            summary = ScenarioSummary.from_scenario(scenario)
+            summaries[name] = summary
+            for tag in summary.tags:
+                index["tag"][tag.lower()].add(name)
+            for technique in summary.techniques:
+                index["technique"][technique.lower()].add(name)
+            for language in summary.languages:
+                index["language"][language].add(name)
+            for age in range(summary.age_min, summary.age_max + 1):
+                index["age"][str(age)].add(name)
+            index["difficulty"][summary.difficulty.lower()].add(name)
+            words = " ".join([summary.title, summary.title_zh or "", *summary.tags, *summary.techniques])
+            for token in tokenize(words.replace("_", " ")):
+                index["word"][token].add(name)
+
+        with self._lock:
+            self._summaries = summaries
+            self._index = {field: dict(values) for field, values in index.items()}
+            self._visible = {name for name, summary in summaries.items() if summary.visible}
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+
+    def _ensure_loaded(self) -> None:
+        if self._summaries is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        # Only the first build makes queries wait; while a later one runs they use the current indexes
+        if not self._refresh_lock.acquire(blocking=self._summaries is None):
+            return
+        try:
+            if self._summaries is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+                return
+            fingerprint = self.loader.fingerprint()
+            if self._summaries is None or fingerprint != self._fingerprint:
+                self._build(fingerprint)
+            else:
+                self._checked_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def get(self, name: str) -> Optional[ScenarioSummary]:
+        """Summary for one scenario, hidden ones included"""
+        self._ensure_loaded()
+        return self._summaries.get(name)
+
+    def names(self, include_hidden: bool = False) -> List[str]:
+        """All catalog scenario names in display order"""
+        self._ensure_loaded()
+        return sorted(self._summaries if include_hidden else self._visible)
+
+    def search(
+        self,
+        tags: Optional[Iterable[str]] = None,
+        age: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        technique: Optional[str] = None,
+        language: Optional[str] = None,
+        query: Optional[str] = None,
+        include_hidden: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[int, List[ScenarioSummary]]:
+        """Scenarios matching every given filter, as (total matches, requested page)
+
+        Tags and query words are AND-ed: a scenario must carry all of them.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            candidates = set(self._summaries) if include_hidden else set(self._visible)
+            postings = [("tag", tag.lower()) for tag in tags or []]
+            if age is not None:
+                postings.append(("age", str(age)))
+            if difficulty:
+                postings.append(("difficulty", difficulty.lower()))
+            if technique:
+                postings.append(("technique", technique.lower()))
+            if language:
+                postings.append(("language", language))
+            if query:
+                postings.extend(("word", token) for token in tokenize(query.replace("_", " ")))
+
+            # Intersect smallest posting lists first so the candidate set shrinks fast
+            lists = sorted((self._index.get(field, {}).get(value, set()) for field, value in postings), key=len)
+            for names in lists:
+                candidates &= names
+                if not candidates:
+                    break
+
+            matches = sorted(candidates)
+            page = matches[offset:offset + limit] if limit is not None else matches[offset:]
+            return len(matches), [self._summaries[name] for name in page]
@@ -0,0 +1,102 @@
+"""Compile scenario rounds into ready-to-use prompt templates and score tables"""
+
+from typing import Dict, Optional, Tuple
+from pydantic import BaseModel, ConfigDict
+from ..agents.prompts import PromptParts, build_multi_round_prompt
+from .loader import Scenario
+
+LANGUAGES = ("en", "zh-HK")
+
+# Placeholder swapped for the parent's words when a compiled round is rendered
+PARENT_RESPONSE_SLOT = "\x00parent_response\x00"
+
+
+class CompiledRound(BaseModel):
+    """Everything an evaluation call needs for one (scenario, round, language)"""
+
+    model_config = ConfigDict(frozen=True)
+
+    scenario_name: str
+    round_number: int
+    language: str
+    criteria: Tuple[str, ...]
+    max_scores: Dict[str, int]
+    max_possible_score: int
+    pass_threshold: int
+    child_prompt: str
+    teen_context: str
+    prompt_prefix: str
+    suffix_template: str
+
+    def render(self, parent_response: str) -> PromptParts:
+        """Fill the parent's response into the precompiled template"""
+        return PromptParts(self.prompt_prefix, self.suffix_template.replace(PARENT_RESPONSE_SLOT, parent_response))
+
+
+def compile_round(scenario: Scenario, round_number: int, language: str) -> Optional[CompiledRound]:
+    """Compile one round of a multi-round scenario"""
+    round_data = scenario.get_round_data(round_number)
+    if not round_data:
+        return None
+
+    definitions = [(name, scenario.get_criterion(name)) for name in round_data.evaluation_criteria]
+    rubric = [(name, definition.max_score, definition.get_description(language)) for name, definition in definitions]
+    child_prompt = round_data.get_child_prompt(language)
+    template = build_multi_round_prompt(
+        PARENT_RESPONSE_SLOT, child_prompt, rubric, round_data.pass_threshold, round_number, language
+    )
+
+    return CompiledRound(
+        scenario_name=scenario.name,
+        round_number=round_number,
+        language=language,
+        criteria=tuple(round_data.evaluation_criteria),
+        max_scores={name: definition.max_score for name, definition in definitions},
+        max_possible_score=sum(definition.max_score for _, definition in definitions),
+        pass_threshold=round_data.pass_threshold,
+        child_prompt=child_prompt,
+        teen_context=f"{scenario.get_background(language)} Child state: {round_data.child_state}",
+        prompt_prefix=template.prefix,
+        suffix_template=template.suffix,
+    )
+
+
+def compile_scenario(scenario: Scenario) -> Dict[Tuple[int, str], CompiledRound]:
+    """Compile every round of a scenario in every supported language"""
+    compiled = {}
+    if not scenario.is_multi_round:
+        return compiled
+    for round_data in scenario.rounds:
+        for language in LANGUAGES:
+            compiled[(round_data.round, language)] = compile_round(scenario, round_data.round, language)
+    return compiled
+
+
+class ScenarioCompiler:
+    """Compiles each scenario once and serves its rounds from memory
+
+    Rounds are cached with the scenario they were compiled from. The loader
+    hands out the same Scenario until its file changes, so a re-parsed
+    (edited) scenario is compiled again instead of keeping its old rubric.
+    """
+
+    def __init__(self):
+        self._compiled: Dict[str, Tuple[Scenario, Dict[Tuple[int, str], CompiledRound]]] = {}
+
+    def get_round(self, scenario: Scenario, round_number: int, language: str) -> Optional[CompiledRound]:
+        """Get the compiled round, compiling the whole scenario on first use"""
+        cached = self._compiled.get(scenario.name)
+        if cached is not None and (cached[0] is scenario or cached[0] == scenario):
+            rounds = cached[1]
+        else:
+            rounds = compile_scenario(scenario)
+            self._compiled[scenario.name] = (scenario, rounds)
+
+        compiled = rounds.get((round_number, language))
+        if compiled is None and scenario.is_multi_round:
+            # Languages outside LANGUAGES fall back to the English rubric, like Scenario.get_*
+            compiled = rounds.get((round_number, "en"))
+        return compiled
+
+    def clear(self) -> None:
+        self._compiled.clear()
@@ -1,10 +1,29 @@
 """YAML scenario loading and management"""
 
+import logging
 import os
+import threading
 import yaml
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
 from ..config import GameConfig
+from .pack import read_pack
+
+logger = logging.getLogger(__name__)
+
+
+class CriterionDefinition(BaseModel):
+    """Rubric entry for one evaluation criterion"""
+
+    max_score: int = 3
+    description: str
+    description_zh: Optional[str] = None
+
+    def get_description(self, language: str = "en") -> str:
+        """Get rubric text in specified language"""
+        if language == "zh-HK" and self.description_zh:
+            return self.description_zh
+        return self.description
 
 
 class RoundData(BaseModel):
@@ -27,6 +46,7 @@ class RoundData(BaseModel):
 class Scenario(BaseModel):
     """A roleplay scenario"""
 
+    name: str = ""  # File stem the scenario was loaded from, e.g. "messy_room"
     case_name: str
     case_name_zh: Optional[str] = None
     background_and_instructions: str
@@ -36,6 +56,15 @@ class Scenario(BaseModel):
     # Multi-round scenario fields
     multi_round: bool = False
     rounds: Optional[List[RoundData]] = None
+    criteria: Dict[str, CriterionDefinition] = {}  # Referenced by rounds' evaluation_criteria
+
+    # Catalog metadata
+    visible: bool = True  # Hidden scenarios stay loadable by name but are not listed
+    tags: List[str] = []
+    age_min: int = 0  # Child age band the scenario is written for, inclusive
+    age_max: int = 18
+    difficulty: str = "medium"  # easy, medium, hard
+    techniques: List[str] = []  # Parenting techniques practised, e.g. "emotion_coaching"
 
     def get_title(self, language: str = "en") -> str:
         """Get scenario title in specified language"""
@@ -49,6 +78,13 @@ class Scenario(BaseModel):
             return self.background_and_instructions_zh
         return self.background_and_instructions
 
+    @property
+    def languages(self) -> List[str]:
+        """Languages the scenario text is available in"""
+        if self.case_name_zh and self.background_and_instructions_zh:
+            return ["en", "zh-HK"]
+        return ["en"]
+
     @property
     def title(self) -> str:
         """Get scenario title"""
@@ -117,6 +153,12 @@ class Scenario(BaseModel):
             return round_data.evaluation_criteria
         return ["tone_score", "approach_score", "respect_score"]  # Default criteria
 
+    def get_criterion(self, name: str) -> CriterionDefinition:
+        """Get a criterion definition, with a generic 0-3 entry for undeclared names"""
+        if name in self.criteria:
+            return self.criteria[name]
+        return CriterionDefinition(description=name.replace("_", " "))
+
     def get_pass_threshold(self, round_number: int) -> int:
         """Get pass threshold for a specific round"""
         round_data = self.get_round_data(round_number)
@@ -125,57 +167,111 @@ class Scenario(BaseModel):
         return 7  # Default threshold
 
 
+def parse_scenario_file(path: str, scenario_name: str) -> Scenario:
+    """Parse and validate one scenario YAML file, raising on any problem"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f)
+
+    return Scenario(name=scenario_name, **data)
+
+
 class ScenarioLoader:
-    """Loader for YAML scenario files"""
+    """Loader for scenarios, from a compiled pack when one is configured or from YAML files"""
 
-    def __init__(self, scenarios_dir: Optional[str] = None):
+    def __init__(self, scenarios_dir: Optional[str] = None, pack_path: Optional[str] = None):
         self.scenarios_dir = scenarios_dir or GameConfig.SCENARIOS_DIR
+        self.pack_path = GameConfig.SCENARIO_PACK if pack_path is None else pack_path
+        self.pack_version: Optional[str] = None
+        self._pack: Optional[Dict[str, Scenario]] = None
+        # Parsed YAML scenarios by name, with the (mtime_ns, size) of the file they came from;
+        # files that failed to parse are kept as None until they change
+        self._parsed: Dict[str, Tuple[Tuple[int, int], Optional[Scenario]]] = {}
+        self._parsed_lock = threading.Lock()
+
+        if self.pack_path and os.path.exists(self.pack_path):
+            try:
+                pack = read_pack(self.pack_path)
+                self._pack = pack.scenarios
+                self.pack_version = pack.version
+                logger.info(f"Loaded {len(pack.scenarios)} scenarios from pack {self.pack_path} ({pack.version})")
+            except Exception as e:
+                logger.error(f"Error reading scenario pack {self.pack_path}, falling back to YAML: {e}")
 
     def load_scenario(self, scenario_name: str) -> Optional[Scenario]:
-        """Load a specific scenario by name"""
-        scenario_path = os.path.join(self.scenarios_dir, f"{scenario_name}.yaml")
-
-        if not os.path.exists(scenario_path):
-            return None
+        """Load a specific scenario by name; YAML files are only re-parsed after they change"""
+        if self._pack is not None:
+            return self._pack.get(scenario_name)
 
+        scenario_path = os.path.join(self.scenarios_dir, f"{scenario_name}.yaml")
         try:
-            with open(scenario_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            stat = os.stat(scenario_path)
+        except OSError:
+            with self._parsed_lock:
+                self._parsed.pop(scenario_name, None)
+            return None
 
-            return Scenario(**data)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._parsed_lock:
+            cached = self._parsed.get(scenario_name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
 
+        try:
+            scenario = parse_scenario_file(scenario_path, scenario_name)
         except Exception as e:
-            print(f"Error loading scenario {scenario_name}: {e}")
-            return None
+            logger.error(f"Error loading scenario {scenario_name}: {e}")
+            scenario = None
+        with self._parsed_lock:
+            self._parsed[scenario_name] = (stamp, scenario)
+        return scenario
+
+    def list_scenario_files(self) -> List[str]:
+        """List the names of all scenario files, hidden ones included"""
+        if self._pack is not None:
+            return sorted(self._pack)
 
-    def list_scenarios(self) -> List[str]:
-        """List all available scenario names"""
         if not os.path.exists(self.scenarios_dir):
             return []
 
-        scenarios = []
-        for filename in os.listdir(self.scenarios_dir):
-            if filename.endswith('.yaml') or filename.endswith('.yml'):
-                scenario_name = os.path.splitext(filename)[0]
-                # Temporarily hide school_dropoff_anxiety scenario
-                if scenario_name != "school_dropoff_anxiety":
-                    scenarios.append(scenario_name)
+        return sorted(
+            os.path.splitext(filename)[0]
+            for filename in os.listdir(self.scenarios_dir)
+            if filename.endswith('.yaml') or filename.endswith('.yml')
+        )
+
+    def fingerprint(self) -> tuple:
+        """Changes whenever a scenario file is added, removed or edited (never for a pack)"""
+        if self._pack is not None:
+            return (self.pack_version,)
+
+        try:
+            entries = list(os.scandir(self.scenarios_dir))
+        except OSError:
+            return ()
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in entries
+            if entry.name.endswith('.yaml') or entry.name.endswith('.yml')
+        ))
 
-        return sorted(scenarios)
+    def list_scenarios(self) -> List[str]:
+        """List all available (visible) scenario names"""
+        return [scenario.name for scenario in self.load_all_scenarios()]
 
     def load_all_scenarios(self) -> List[Scenario]:
         """Load all available scenarios"""
         scenarios = []
-        for scenario_name in self.list_scenarios():
+        for scenario_name in self.list_scenario_files():
             scenario = self.load_scenario(scenario_name)
-            if scenario:
+            if scenario and scenario.visible:
                 scenarios.append(scenario)
 
         return scenarios
 
     def get_default_scenario(self) -> Optional[Scenario]:
         """Get the default scenario (first available)"""
-        scenario_names = self.list_scenarios()
-        if scenario_names:
-            return self.load_scenario(scenario_names[0])
+        for scenario_name in self.list_scenario_files():
+            scenario = self.load_scenario(scenario_name)
+            if scenario and scenario.visible:
+                return scenario
         return None
\ No newline at end of file
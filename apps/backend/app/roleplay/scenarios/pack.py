@@ -0,0 +1,65 @@
+"""Compiled scenario packs: every scenario validated once and pickled into one file
+
+A pack is a short header followed by a pickled payload. The server maps the
+file into memory and unpickles the validated Scenario models in one go instead of
+parsing YAML files one at a time.
+"""
+
+import hashlib
+import mmap
+import pickle
+import time
+from typing import TYPE_CHECKING, Dict, NamedTuple
+
+if TYPE_CHECKING:
+    from .loader import Scenario
+
+PACK_MAGIC = b"RPSCNPK"
+# Bump when Scenario (or anything pickled with it) changes shape
+PACK_FORMAT_VERSION = 1
+
+
+class ScenarioPack(NamedTuple):
+    """Scenarios loaded from a pack, with the content version they were built from"""
+
+    version: str
+    built_at: float
+    scenarios: Dict[str, "Scenario"]
+
+
+class PackFormatError(ValueError):
+    """The file is not a scenario pack this code can read"""
+
+
+def content_version(sources: Dict[str, bytes]) -> str:
+    """Hash of the source files, so packs built from the same YAML compare equal"""
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(name.encode("utf-8") + b"\0" + sources[name] + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def write_pack(path: str, scenarios: Dict[str, "Scenario"], version: str) -> None:
+    """Write scenarios to a pack file"""
+    payload = pickle.dumps(
+        {"version": version, "built_at": time.time(), "scenarios": scenarios},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    with open(path, "wb") as f:
+        f.write(PACK_MAGIC + PACK_FORMAT_VERSION.to_bytes(2, "big") + payload)
+
+
+def read_pack(path: str) -> ScenarioPack:
+    """Memory-map a pack file and load its scenarios"""
+    header_size = len(PACK_MAGIC) + 2
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if mapped[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise PackFormatError(f"{path} is not a scenario pack")
+        format_version = int.from_bytes(mapped[len(PACK_MAGIC):header_size], "big")
+        if format_version != PACK_FORMAT_VERSION:
+            raise PackFormatError(
+                f"{path} has pack format {format_version}, expected {PACK_FORMAT_VERSION}; rebuild it"
+            )
+        with memoryview(mapped) as view:
+            data = pickle.loads(view[header_size:])
+    return ScenarioPack(data["version"], data["built_at"], data["scenarios"])
@@ -0,0 +1,145 @@
+"""Incremental per-scenario, per-round analytics
+
+Each finished round adds one observation to a handful of running
+(count, sum, sum of squares) cells in roleplay_rollups: pass/fail, total
+score, attempts used, an attempts histogram and every criterion score. Cells
+are kept for the day and for all time, so a summary reads a fixed number of
+rows per round and never touches the transcripts.
+"""
+
+import math
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.models.roleplay_rollup import RoleplayRollup
+
+ALL_TIME = "all"
+CRITERION_PREFIX = "criterion:"
+ATTEMPTS_PREFIX = "attempts="
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+_METRIC_MAX_CHARS = RoleplayRollup.__table__.c.metric.type.length
+ROLLUP_KEY = ("period", "scenario", "round_number", "language", "metric")
+
+
+def round_metrics(row: dict) -> List[Tuple[str, float]]:
+    """Observations a finished round contributes, from its transcript row"""
+    metrics = [
+        ("passed", 1.0 if row.get("passed") else 0.0),
+        ("attempts", float(row["attempt"])),
+        (f"{ATTEMPTS_PREFIX}{row['attempt']}", 1.0),
+    ]
+    if row.get("total_score") is not None:
+        metrics.append(("total_score", float(row["total_score"])))
+    for criterion, score in (row.get("criteria_scores") or {}).items():
+        # Older transcripts may hold criteria a model made up; skip what cannot be a metric
+        metric = f"{CRITERION_PREFIX}{criterion}"
+        if len(metric) <= _METRIC_MAX_CHARS and isinstance(score, (int, float)) and not isinstance(score, bool):
+            metrics.append((metric, float(score)))
+    return metrics
+
+
+def round_cells(row: dict, day: Optional[date] = None) -> List[dict]:
+    """Rollup increments for a finished round: every metric, for its day and for all time"""
+    day = day or datetime.now(timezone.utc).date()
+    return [
+        {"period": period, "scenario": row["scenario"], "round_number": row["round_number"],
+         "language": row["language"], "metric": metric, "count": 1, "value_sum": value, "value_sq_sum": value * value}
+        for period in (ALL_TIME, day.isoformat())
+        for metric, value in round_metrics(row)
+    ]
+
+
+def add_round(db: Session, row: dict, day: Optional[date] = None) -> None:
+    """Fold a finished round into the rollups; the caller commits"""
+    cells = round_cells(row, day)
+    table = RoleplayRollup.__table__
+    insert = _UPSERTS.get(db.get_bind().dialect.name)
+
+    if insert is not None:
+        statement = insert(table).values(cells)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={
+                "count": table.c.count + statement.excluded.count,
+                "value_sum": table.c.value_sum + statement.excluded.value_sum,
+                "value_sq_sum": table.c.value_sq_sum + statement.excluded.value_sq_sum,
+            },
+        ))
+        return
+
+    # Databases without INSERT ... ON CONFLICT
+    for cell in cells:
+        rollup = db.get(RoleplayRollup, tuple(cell[key] for key in ROLLUP_KEY), with_for_update=True)
+        if rollup is None:
+            db.add(RoleplayRollup(**cell))
+        else:
+            rollup.count += cell["count"]
+            rollup.value_sum += cell["value_sum"]
+            rollup.value_sq_sum += cell["value_sq_sum"]
+
+
+def _stats(count: int, total: float, total_sq: float) -> dict:
+    mean = total / count if count else 0.0
+    variance = max(total_sq / count - mean * mean, 0.0) if count else 0.0
+    return {"count": count, "mean": round(mean, 3), "stddev": round(math.sqrt(variance), 3)}
+
+
+def summarize(rollups: Iterable[RoleplayRollup]) -> List[dict]:
+    """Per-round pass rate, score and criterion statistics and attempt distribution"""
+    cells: Dict[int, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0.0]))
+    for rollup in rollups:
+        # Languages (and days) of one round add up
+        cell = cells[rollup.round_number][rollup.metric]
+        cell[0] += rollup.count
+        cell[1] += rollup.value_sum
+        cell[2] += rollup.value_sq_sum
+
+    rounds = []
+    for round_number in sorted(cells):
+        metrics = cells[round_number]
+        passed = metrics.get("passed", [0, 0.0, 0.0])
+        rounds.append({
+            "round_number": round_number,
+            "rounds_finished": passed[0],
+            "pass_rate": round(passed[1] / passed[0], 3) if passed[0] else 0.0,
+            "total_score": _stats(*metrics["total_score"]) if "total_score" in metrics else None,
+            "attempts": {
+                **_stats(*metrics.get("attempts", [0, 0.0, 0.0])),
+                "distribution": {
+                    metric[len(ATTEMPTS_PREFIX):]: int(cell[0])
+                    for metric, cell in sorted(metrics.items()) if metric.startswith(ATTEMPTS_PREFIX)
+                },
+            },
+            "criteria": {
+                metric[len(CRITERION_PREFIX):]: _stats(*cell)
+                for metric, cell in sorted(metrics.items()) if metric.startswith(CRITERION_PREFIX)
+            },
+        })
+    return rounds
+
+
+class RollupStore:
+    """Reads scenario summaries from the rollup table"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def summary(self, scenario: str, language: Optional[str] = None, day: Optional[date] = None) -> dict:
+        """All-time (or one day's) statistics for every round of a scenario"""
+        period = day.isoformat() if day else ALL_TIME
+        query = select(RoleplayRollup).where(RoleplayRollup.period == period, RoleplayRollup.scenario == scenario)
+        if language:
+            query = query.where(RoleplayRollup.language == language)
+
+        db = self.session_factory()
+        try:
+            rounds = summarize(db.scalars(query))
+        finally:
+            db.close()
+        return {"scenario": scenario, "language": language, "period": period, "rounds": rounds}
@@ -0,0 +1,169 @@
+"""Batch evaluation of sample parent responses for content authors and QA"""
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from ..agents.evaluator import EvaluationAgent
+from ..config import GameConfig
+from ..models.evaluation import BatchEvaluationItem
+from ..scenarios.compiler import ScenarioCompiler
+from ..scenarios.loader import ScenarioLoader
+from .quota import charged_to
+
+
+def item_key(item: BatchEvaluationItem, model_name: str) -> str:
+    """Identity of an evaluation: same scenario, round, language, words and model"""
+    text = " ".join(item.parent_response.split())
+    raw = "\x1f".join([model_name, item.scenario, str(item.round), item.language, text])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class BatchEvaluator:
+    """Evaluates batches with bounded concurrency and remembers results across batches
+
+    Identical items are evaluated once: within a batch they share one call,
+    across batches (and concurrent batches) they reuse the finished result or
+    the call still in flight. Each call runs as its own task that every batch
+    awaits through a shield, so a client that disconnects cancels only its
+    own wait, never the call other batches joined. Failed evaluations are
+    never cached.
+    """
+
+    def __init__(
+        self,
+        evaluator: EvaluationAgent,
+        loader: ScenarioLoader,
+        compiler: ScenarioCompiler,
+        concurrency: Optional[int] = None,
+        cache_size: Optional[int] = None
+    ):
+        self.evaluator = evaluator
+        self.loader = loader
+        self.compiler = compiler
+        self.concurrency = concurrency or GameConfig.BATCH_CONCURRENCY
+        self.cache_size = GameConfig.BATCH_CACHE_SIZE if cache_size is None else cache_size
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it belongs to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _cached(self, key: str) -> Optional[dict]:
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+
+    def _remember(self, key: str, result: dict) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def _evaluate(self, item: BatchEvaluationItem, user_id: Optional[str] = None) -> dict:
+        """Evaluate one item for user_id's budget, raising when the scenario, round or model call fails"""
+        scenario = self.loader.load_scenario(item.scenario)
+        if not scenario:
+            raise LookupError(f"Scenario not found: {item.scenario}")
+
+        async with self._get_semaphore():
+            # Charged for whoever started the call; items that join it or hit the cache are free
+            with charged_to(user_id):
+                if scenario.is_multi_round:
+                    compiled = self.compiler.get_round(scenario, item.round, item.language)
+                    if not compiled:
+                        raise LookupError(f"Round {item.round} not found in {item.scenario}")
+                    evaluation = await self.evaluator.score_multi_round(item.parent_response, compiled)
+                else:
+                    if item.round != 1:
+                        raise LookupError(f"{item.scenario} is single-round")
+                    evaluation = await self.evaluator.score(
+                        item.parent_response, scenario.get_teen_opening(item.language), item.language, item.scenario
+                    )
+        return evaluation.model_dump()
+
+    def _start(self, key: str, item: BatchEvaluationItem, user_id: Optional[str]) -> asyncio.Future:
+        """Run the evaluation as its own task, remembered once it succeeds whoever is still waiting"""
+        task = asyncio.ensure_future(self._evaluate(item, user_id))
+        self._inflight[key] = task
+
+        def finished(task: asyncio.Future) -> None:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+            # Reading the exception also marks it retrieved when every waiter has gone
+            if not task.cancelled() and task.exception() is None:
+                self._remember(key, task.result())
+
+        task.add_done_callback(finished)
+        return task
+
+    async def _shared(self, key: str, item: BatchEvaluationItem, user_id: Optional[str] = None) -> dict:
+        """Join the in-flight evaluation for this key, or start it"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, item, user_id)
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                # The evaluation itself was cancelled, not this wait: a failure for this item
+                raise RuntimeError("Evaluation was cancelled")
+            raise
+
+    async def run(self, items: List[BatchEvaluationItem], user_id: Optional[str] = None) -> AsyncIterator[dict]:
+        """Yield one result per item as evaluations complete, then a summary; model calls
+        are charged to user_id's daily budget (see quota.charged_to)"""
+        model_name = self.evaluator.model_name
+        groups: "OrderedDict[str, List[int]]" = OrderedDict()
+        for index, item in enumerate(items):
+            groups.setdefault(item_key(item, model_name), []).append(index)
+
+        def line(index: int, **fields) -> dict:
+            item = items[index]
+            return {"index": index, "id": item.id, "scenario": item.scenario, "round": item.round,
+                    "language": item.language, **fields}
+
+        cache_hits = errors = 0
+        pending = []
+        for key, indexes in groups.items():
+            cached = self._cached(key)
+            if cached is not None:
+                cache_hits += len(indexes)
+                for index in indexes:
+                    yield line(index, status="ok", cached=True, evaluation=cached)
+            else:
+                pending.append(self._outcome(key, items[indexes[0]], user_id))
+
+        for done in asyncio.as_completed(pending):
+            key, result, error = await done
+            for position, index in enumerate(groups[key]):
+                if error:
+                    errors += 1
+                    yield line(index, status="error", error=error)
+                else:
+                    # Later copies of an item reuse the first one's evaluation
+                    yield line(index, status="ok", cached=position > 0, evaluation=result)
+
+        yield {"summary": {"items": len(items), "unique": len(groups), "cache_hits": cache_hits, "errors": errors}}
+
+    async def _outcome(
+        self, key: str, item: BatchEvaluationItem, user_id: Optional[str]
+    ) -> Tuple[str, Optional[dict], Optional[str]]:
+        try:
+            return key, await self._shared(key, item, user_id), None
+        except Exception as e:
+            return key, None, f"{type(e).__name__}: {e}"
@@ -0,0 +1,215 @@
+"""Cost-aware evaluation cascade
+
+Tiers, cheapest first:
+  prescore  the local rule-based pre-score, when it is decisive and short-circuiting is on
+  fast      FAST_EVALUATION_MODEL, accepted unless its score sits within
+            CASCADE_ESCALATION_MARGIN of the pass threshold, the call failed, or it
+            contradicts a confident pre-score
+  strong    EVALUATION_MODEL, the final word
+Every routing decision is counted with an estimated saving against sending
+the response straight to the strong model, and logged as a sampled
+cascade.routed event.
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import Optional, Tuple, Union
+from pydantic import BaseModel
+from ..agents.evaluator import EvaluationAgent
+from ..agents.prompts import EVALUATION_SYSTEM_PROMPT, build_evaluation_prompt
+from ..config import GameConfig, ModelConfig
+from ..models.evaluation import EvaluationResult, MultiRoundEvaluationResult, ProvisionalScore
+from ..scenarios.compiler import CompiledRound
+from .prescorer import RuleBasedPreScorer
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Typical evaluation output size, for cost estimates before a call is made
+ESTIMATED_OUTPUT_TOKENS = 150
+
+Evaluation = Union[EvaluationResult, MultiRoundEvaluationResult]
+
+
+class RoutingDecision(BaseModel):
+    """Which tier produced an evaluation and why"""
+
+    tier: str  # prescore, fast, strong
+    reason: str
+    fast_score: Optional[int] = None
+    final_score: int
+    threshold: int
+    estimated_saving_usd: float = 0.0  # Versus always calling the strong model; negative when escalated
+
+
+def estimate_call_cost(model: str, prompt_text: str) -> float:
+    """Rough USD cost of one evaluation call from prompt size and model prices"""
+    input_price, output_price = ModelConfig.get_model_prices(model)
+    input_tokens = estimate_tokens(EVALUATION_SYSTEM_PROMPT) + estimate_tokens(prompt_text)
+    return (input_tokens * input_price + ESTIMATED_OUTPUT_TOKENS * output_price) / 1_000_000
+
+
+class CascadeStats:
+    """Routing counts and estimated savings for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tiers: Counter = Counter()
+            self._reasons: Counter = Counter()
+            self._saving = 0.0
+
+    def record(self, decision: RoutingDecision) -> None:
+        with self._lock:
+            self._tiers[decision.tier] += 1
+            self._reasons[decision.reason] += 1
+            self._saving += decision.estimated_saving_usd
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = sum(self._tiers.values())
+            return {
+                "evaluations": total,
+                "by_tier": dict(self._tiers),
+                "by_reason": dict(self._reasons),
+                "strong_rate": round(self._tiers["strong"] / total, 3) if total else 0.0,
+                "estimated_saving_usd": round(self._saving, 6),
+            }
+
+
+# Process-wide routing stats, exposed next to agent metrics
+cascade_stats = CascadeStats()
+
+
+class EvaluationCascade:
+    """Routes each evaluation to the cheapest tier that can be trusted with it"""
+
+    def __init__(
+        self,
+        strong: EvaluationAgent,
+        prescorer: Optional[RuleBasedPreScorer] = None,
+        fast: Optional[EvaluationAgent] = None,
+        stats: Optional[CascadeStats] = None
+    ):
+        self.strong = strong
+        self.prescorer = prescorer or RuleBasedPreScorer()
+        if fast is None and ModelConfig.FAST_EVALUATION_MODEL:
+            fast = EvaluationAgent(ModelConfig.FAST_EVALUATION_MODEL)
+        self.fast = fast
+        self.stats = stats or cascade_stats
+
+    async def evaluate(
+        self,
+        parent_response: str,
+        teen_opening: str,
+        provisional: ProvisionalScore,
+        language: str = "zh-HK",
+        scenario: str = ""
+    ) -> Tuple[EvaluationResult, RoutingDecision]:
+        """Single-round evaluation through the cascade"""
+        threshold = GameConfig.PASS_THRESHOLD
+        prompt_text = build_evaluation_prompt(parent_response, teen_opening, language).text
+
+        if self.prescorer.should_short_circuit(provisional):
+            evaluation = self.prescorer.to_evaluation(provisional, language, threshold)
+            return evaluation, self._decide("prescore", "decisive_prescore", None, evaluation, threshold, prompt_text)
+
+        fast_score = None
+        if self.fast:
+            try:
+                evaluation = await self.fast.score(parent_response, teen_opening, language, scenario)
+                fast_score = evaluation.total_score
+                reason = self._escalation_reason(evaluation, threshold, threshold, provisional)
+                if reason is None:
+                    return evaluation, self._decide("fast", "clear_fast_score", fast_score, evaluation, threshold, prompt_text)
+            except Exception as e:
+                logger.warning(f"Fast evaluation failed, escalating: {e}")
+                reason = "fast_error"
+        else:
+            reason = "no_fast_tier"
+
+        evaluation = await self.strong.evaluate(parent_response, teen_opening, language, scenario)
+        return evaluation, self._decide("strong", reason, fast_score, evaluation, threshold, prompt_text)
+
+    async def evaluate_multi_round(
+        self,
+        parent_response: str,
+        compiled: CompiledRound,
+        provisional: ProvisionalScore
+    ) -> Tuple[MultiRoundEvaluationResult, RoutingDecision]:
+        """Multi-round evaluation through the cascade"""
+        threshold = compiled.pass_threshold
+        prompt_text = compiled.render(parent_response).text
+
+        if self.prescorer.should_short_circuit(provisional):
+            evaluation = self.prescorer.to_multi_round_evaluation(
+                provisional, list(compiled.criteria), compiled.max_scores, compiled.round_number,
+                language=compiled.language, pass_threshold=threshold
+            )
+            return evaluation, self._decide("prescore", "decisive_prescore", None, evaluation, threshold, prompt_text)
+
+        fast_score = None
+        if self.fast:
+            try:
+                evaluation = await self.fast.score_multi_round(parent_response, compiled)
+                fast_score = evaluation.total_score
+                # The pre-score is on a 0-10 scale; compare it against the 0-10 threshold
+                reason = self._escalation_reason(evaluation, threshold, GameConfig.PASS_THRESHOLD, provisional)
+                if reason is None:
+                    return evaluation, self._decide("fast", "clear_fast_score", fast_score, evaluation, threshold, prompt_text)
+            except Exception as e:
+                logger.warning(f"Fast multi-round evaluation failed, escalating: {e}")
+                reason = "fast_error"
+        else:
+            reason = "no_fast_tier"
+
+        evaluation = await self.strong.evaluate_multi_round(parent_response, compiled)
+        return evaluation, self._decide("strong", reason, fast_score, evaluation, threshold, prompt_text)
+
+    def _escalation_reason(
+        self,
+        evaluation: Evaluation,
+        threshold: int,
+        prescore_threshold: int,
+        provisional: ProvisionalScore
+    ) -> Optional[str]:
+        """Why a fast-tier result should not be trusted, or None to accept it"""
+        if abs(evaluation.total_score - threshold) <= ModelConfig.CASCADE_ESCALATION_MARGIN:
+            return "near_threshold"
+        if provisional.verdict != "uncertain" and provisional.confidence >= GameConfig.PRESCORE_MIN_CONFIDENCE:
+            if (provisional.total_score >= prescore_threshold) != evaluation.passed:
+                return "prescore_disagrees"
+        return None
+
+    def _decide(
+        self,
+        tier: str,
+        reason: str,
+        fast_score: Optional[int],
+        evaluation: Evaluation,
+        threshold: int,
+        prompt_text: str
+    ) -> RoutingDecision:
+        strong_cost = estimate_call_cost(self.strong.model_name, prompt_text)
+        # The fast tier runs for every response the pre-score does not settle
+        fast_cost = estimate_call_cost(self.fast.model_name, prompt_text) if self.fast and tier != "prescore" else 0.0
+        if tier == "strong":
+            saving = -fast_cost
+        else:
+            saving = strong_cost - fast_cost
+
+        decision = RoutingDecision(
+            tier=tier,
+            reason=reason,
+            fast_score=fast_score,
+            final_score=evaluation.total_score,
+            threshold=threshold,
+            estimated_saving_usd=round(saving, 8),
+        )
+        self.stats.record(decision)
+        logger.info(f"Evaluation routed to {tier}", extra={"event": "cascade.routed", **decision.model_dump()})
+        return decision
@@ -0,0 +1,108 @@
+"""Teen conversation memory with a bounded token budget
+
+Earlier turns reach the teen model as pydantic_ai message history. The most
+recent turns are kept verbatim, newest first, until the budget is spent.
+Everything older is folded into a short rolling summary, so prompt size levels
+off instead of growing with every turn.
+"""
+
+import json
+from typing import List, NamedTuple, Optional
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart
+from ..config import GameConfig
+from ..models.game_state import ConversationTurn
+from .tokens import estimate_tokens
+
+# Characters kept per side of a turn once it is folded into the summary
+SUMMARY_CLIP_CHARS = 60
+
+
+class HistoryWindow(NamedTuple):
+    """Message history for one teen call and how it was assembled"""
+
+    messages: List[ModelMessage]
+    summary: str
+    kept_turns: int
+    summarized_turns: int
+    tokens: int
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _parent_message(turn: ConversationTurn, language: str, max_chars: int) -> str:
+    parent = _clip(turn.parent, max_chars)
+    return f"Parent said: '{parent}'" if language == "en" else f"父母話：'{parent}'"
+
+
+def _teen_message(turn: ConversationTurn) -> str:
+    # Same JSON shape the model is asked to produce, so the history reads like its own output
+    return json.dumps({"response": turn.teen, "emotion": turn.emotion}, ensure_ascii=False)
+
+
+def summarize_turns(turns: List[ConversationTurn], language: str, max_tokens: int) -> str:
+    """Extractive summary of older turns, keeping the most recent lines that fit"""
+    if not turns:
+        return ""
+    header = "Earlier in this conversation:" if language == "en" else "之前嘅對話："
+    lines: List[str] = []
+    budget = max_tokens - estimate_tokens(header)
+    for turn in reversed(turns):
+        line = f"- {_clip(turn.parent, SUMMARY_CLIP_CHARS)} → {turn.emotion or '?'}: {_clip(turn.teen, SUMMARY_CLIP_CHARS)}"
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            lines.append("- …")
+            break
+        budget -= cost
+        lines.append(line)
+    return "\n".join([header, *reversed(lines)])
+
+
+def build_history(
+    turns: List[ConversationTurn],
+    system_prompt: str,
+    language: str = "zh-HK",
+    max_tokens: Optional[int] = None,
+    summary_max_tokens: Optional[int] = None,
+    max_message_chars: Optional[int] = None
+) -> HistoryWindow:
+    """Message history for the next teen call, within max_tokens of turn and summary text"""
+    if not turns:
+        return HistoryWindow([], "", 0, 0, 0)
+
+    max_tokens = GameConfig.TEEN_HISTORY_MAX_TOKENS if max_tokens is None else max_tokens
+    summary_max_tokens = GameConfig.TEEN_HISTORY_SUMMARY_MAX_TOKENS if summary_max_tokens is None else summary_max_tokens
+    max_message_chars = max_message_chars or GameConfig.TEEN_HISTORY_MAX_MESSAGE_CHARS
+
+    # Keep recent turns verbatim while they fit next to a worst-case summary
+    verbatim_budget = max_tokens - min(summary_max_tokens, max_tokens)
+    kept: List[tuple] = []
+    used = 0
+    for turn in reversed(turns):
+        parent, teen = _parent_message(turn, language, max_message_chars), _teen_message(turn)
+        cost = estimate_tokens(parent) + estimate_tokens(teen)
+        if used + cost > verbatim_budget:
+            break
+        kept.append((parent, teen))
+        used += cost
+    kept.reverse()
+
+    older = turns[:len(turns) - len(kept)]
+    summary = summarize_turns(older, language, summary_max_tokens) if summary_max_tokens else ""
+    used += estimate_tokens(summary)
+
+    # The agent only adds its system prompt when there is no history, so it leads the history
+    first_parts = [SystemPromptPart(system_prompt)]
+    if summary:
+        first_parts.append(UserPromptPart(summary))
+    messages: List[ModelMessage] = []
+    for index, (parent, teen) in enumerate(kept):
+        parts = first_parts + [UserPromptPart(parent)] if index == 0 else [UserPromptPart(parent)]
+        messages.append(ModelRequest(parts=parts))
+        messages.append(ModelResponse(parts=[TextPart(teen)]))
+    if not kept:
+        messages.append(ModelRequest(parts=first_parts))
+
+    return HistoryWindow(messages, summary, len(kept), len(older), used)
@@ -1,12 +1,23 @@
 """Core game engine for roleplay scenarios"""
 
-from typing import Optional
-from ..models.game_state import GameState
-from ..models.evaluation import EvaluationResult, RoundResult
+import random
+from typing import Awaitable, Callable, Optional
+from app.services.achievement_service import AchievementEvent, BadgeEngine
+from ..models.game_state import ConversationTurn, GameState
+from ..models.evaluation import EvaluationResult, RoundResult, ScenarioCompletion
 from ..agents.evaluator import EvaluationAgent
 from ..agents.teen_responder import TeenResponderAgent
 from ..scenarios.loader import ScenarioLoader, Scenario
+from ..scenarios.catalog import ScenarioCatalog
+from ..scenarios.compiler import ScenarioCompiler
 from ..config import GameConfig
+from .cascade import EvaluationCascade
+from .input_filter import InputFilter
+from .prescorer import RuleBasedPreScorer
+from .recommender import ScenarioRecommender
+
+# Called with (event, payload) as a turn progresses: "provisional", "evaluation", "teen_response"
+TurnListener = Callable[[str, dict], Awaitable[None]]
 
 
 class RoleplayGameEngine:
@@ -16,11 +27,26 @@ class RoleplayGameEngine:
         self.evaluator = EvaluationAgent()
         self.teen_responder = TeenResponderAgent()
         self.scenario_loader = ScenarioLoader()
-
-    def create_game_state(self, scenario_name: Optional[str] = None, language: str = "zh-HK") -> Optional[GameState]:
+        self.input_filter = InputFilter()
+        self.prescorer = RuleBasedPreScorer()
+        self.cascade = EvaluationCascade(self.evaluator, self.prescorer)
+        self.compiler = ScenarioCompiler()
+        self.catalog = ScenarioCatalog(self.scenario_loader)
+        self.badges = BadgeEngine()
+        self.recommender = ScenarioRecommender(self.scenario_loader)
+
+    def create_game_state(
+        self,
+        scenario_name: Optional[str] = None,
+        language: str = "zh-HK",
+        user_id: Optional[str] = None
+    ) -> Optional[GameState]:
         """Create a new game state with the specified scenario"""
 
-        # Load scenario
+        # Load scenario; without one, pick what best targets the user's weak criteria
+        if not scenario_name:
+            picks = self.recommender.recommend(user_id, language, limit=1)
+            scenario_name = picks[0].scenario if picks else None
         if scenario_name:
             scenario = self.scenario_loader.load_scenario(scenario_name)
         else:
@@ -31,63 +57,85 @@ class RoleplayGameEngine:
 
         # Create game state with multi-round support
         game_state = GameState(
+            scenario_name=scenario.name,
             scenario_title=scenario.get_title(language),
             scenario_background=scenario.get_background(language),
             teen_opening=scenario.get_teen_opening(language),
             max_attempts=GameConfig.MAX_ATTEMPTS,
             is_multi_round=scenario.is_multi_round,
             max_rounds=scenario.max_rounds if scenario.is_multi_round else 1,
-            language=language
+            language=language,
+            user_id=user_id,
+            reply_seed=random.getrandbits(32)
         )
 
         return game_state
 
-    async def process_parent_response(self, game_state: GameState, parent_response: str) -> GameState:
-        """Process a parent's response and update game state"""
+    async def process_parent_response(
+        self,
+        game_state: GameState,
+        parent_response: str,
+        on_event: Optional[TurnListener] = None
+    ) -> GameState:
+        """Process a parent's response and update game state; on_event sees each result as soon as it is known"""
 
         # Update game state with parent response
         game_state.parent_response = parent_response
         game_state.increment_attempt()
 
-        # Get current scenario for context
-        # Try to map scenario title to filename
-        scenario_name = None
-        if "school drop" in game_state.scenario_title.lower():
-            scenario_name = "school_dropoff_anxiety"
-        elif "messy" in game_state.scenario_title.lower():
-            scenario_name = "messy_room"
-        else:
-            # Fallback to the title-based conversion
-            scenario_name = game_state.scenario_title.replace(" ", "_").lower().replace("-", "_")
+        # Instant local estimate, returned alongside (or instead of) the model evaluation
+        game_state.provisional_evaluation = self.prescorer.score(parent_response)
+        if on_event:
+            await on_event("provisional", game_state.provisional_evaluation.model_dump())
 
-        scenario = self.scenario_loader.load_scenario(scenario_name)
+        # Get current scenario for context
+        scenario = self.scenario_loader.load_scenario(self._resolve_scenario_name(game_state))
         if not scenario:
             # Fallback to default evaluation
-            return await self._process_single_round_response(game_state, parent_response)
+            return await self._process_single_round_response(game_state, parent_response, on_event)
 
         if game_state.is_multi_round:
-            return await self._process_multi_round_response(game_state, parent_response, scenario)
+            return await self._process_multi_round_response(game_state, parent_response, scenario, on_event)
         else:
-            return await self._process_single_round_response(game_state, parent_response)
-
-    async def _process_single_round_response(self, game_state: GameState, parent_response: str) -> GameState:
+            return await self._process_single_round_response(game_state, parent_response, on_event)
+
+    async def _process_single_round_response(
+        self,
+        game_state: GameState,
+        parent_response: str,
+        on_event: Optional[TurnListener] = None
+    ) -> GameState:
         """Process response for single-round scenarios (legacy)"""
 
-        # Evaluate the response with language support
-        evaluation = await self.evaluator.evaluate(
+        # Evaluate the response with language support, cheapest trustworthy tier first
+        evaluation, _ = await self.cascade.evaluate(
             parent_response,
             game_state.teen_opening,
-            language=game_state.language
+            game_state.provisional_evaluation,
+            language=game_state.language,
+            scenario=game_state.scenario_name
         )
         game_state.evaluation = evaluation
+        if on_event:
+            await on_event("evaluation", evaluation.model_dump())
 
         # Generate teen response with language support
         teen_response = await self.teen_responder.respond(
             evaluation.total_score,
             context=game_state.scenario_background,
-            language=game_state.language
+            language=game_state.language,
+            scenario=game_state.scenario_name,
+            used_replies=game_state.used_replies,
+            seed=game_state.reply_seed,
+            parent_response=parent_response,
+            history=game_state.conversation
         )
         game_state.teen_response = teen_response.response
+        if on_event:
+            await on_event("teen_response", teen_response.model_dump())
+        game_state.remember_turn(ConversationTurn(
+            round=1, parent=parent_response, teen=teen_response.response, emotion=teen_response.emotion
+        ), GameConfig.CONVERSATION_MAX_TURNS)
 
         # Check if game should end
         if evaluation.passed:
@@ -97,32 +145,46 @@ class RoleplayGameEngine:
 
         return game_state
 
-    async def _process_multi_round_response(self, game_state: GameState, parent_response: str, scenario: 'Scenario') -> GameState:
+    async def _process_multi_round_response(
+        self,
+        game_state: GameState,
+        parent_response: str,
+        scenario: 'Scenario',
+        on_event: Optional[TurnListener] = None
+    ) -> GameState:
         """Process response for multi-round scenarios"""
 
-        # Get current round data
-        round_data = scenario.get_round_data(game_state.current_round)
-        if not round_data:
+        # Get the current round's precompiled prompt and score table
+        compiled = self.compiler.get_round(scenario, game_state.current_round, game_state.language)
+        if not compiled:
             return game_state
 
-        # Evaluate the response with round-specific criteria and language support
-        evaluation = await self.evaluator.evaluate_multi_round(
-            parent_response,
-            round_data.child_prompt,
-            round_data.evaluation_criteria,
-            round_data.pass_threshold,
-            game_state.current_round,
-            language=game_state.language
+        # Evaluate the response with round-specific criteria, cheapest trustworthy tier first
+        evaluation, _ = await self.cascade.evaluate_multi_round(
+            parent_response, compiled, game_state.provisional_evaluation
         )
         game_state.multi_round_evaluation = evaluation
+        if on_event:
+            await on_event("evaluation", evaluation.model_dump())
 
         # Generate teen response with language support
         teen_response = await self.teen_responder.respond(
             evaluation.total_score,
-            context=f"{game_state.scenario_background} Child state: {round_data.child_state}",
-            language=game_state.language
+            context=compiled.teen_context,
+            language=game_state.language,
+            scenario=game_state.scenario_name,
+            round_number=game_state.current_round,
+            used_replies=game_state.used_replies,
+            seed=game_state.reply_seed,
+            parent_response=parent_response,
+            history=game_state.conversation
         )
         game_state.teen_response = teen_response.response
+        if on_event:
+            await on_event("teen_response", teen_response.model_dump())
+        game_state.remember_turn(ConversationTurn(
+            round=game_state.current_round, parent=parent_response, teen=teen_response.response, emotion=teen_response.emotion
+        ), GameConfig.CONVERSATION_MAX_TURNS)
 
         # Handle round completion/advancement
         if evaluation.passed or game_state.round_attempts >= game_state.max_round_attempts:
@@ -150,48 +212,48 @@ class RoleplayGameEngine:
 
         return game_state
 
-    def _create_scenario_completion(self, game_state: GameState, scenario: 'Scenario') -> 'ScenarioCompletion':
+    def _create_scenario_completion(self, game_state: GameState, scenario: 'Scenario') -> ScenarioCompletion:
         """Create scenario completion result"""
-        from .evaluation import ScenarioCompletion
-
         rounds_passed = sum(1 for result in game_state.round_history if result.evaluation.passed)
         total_score = sum(result.evaluation.total_score for result in game_state.round_history if result.evaluation.passed)
         avg_score = total_score / rounds_passed if rounds_passed > 0 else 0
 
-        badges = []
-        techniques = []
-
-        if rounds_passed == game_state.max_rounds:
-            badges.append("scenario_mastery")
-            techniques.append("separation_anxiety_management")
-
-        if avg_score >= 9:
-            badges.append("expert_communicator")
+        mastered = rounds_passed == game_state.max_rounds
 
-        return ScenarioCompletion(
+        completion = ScenarioCompletion(
             scenario_name=scenario.title,
             rounds_completed=len(game_state.round_history),
             total_rounds=game_state.max_rounds,
             rounds_passed=rounds_passed,
             overall_score=avg_score,
-            mastery_achieved=rounds_passed == game_state.max_rounds,
-            badges_earned=badges,
-            communication_techniques_unlocked=techniques
+            mastery_achieved=mastered,
+            communication_techniques_unlocked=list(scenario.techniques) if mastered else []
         )
+        # What this game earns on its own; the API swaps in the player's real progress when known
+        completion.badges_earned = self.badges.preview(self._completion_event(game_state, completion))
+        return completion
+
+    def completion_event(self, game_state: GameState) -> Optional[AchievementEvent]:
+        """Achievement event for a finished game"""
+        if not game_state.game_completed:
+            return None
+        return self._completion_event(game_state, game_state.scenario_completion)
+
+    def _completion_event(self, game_state: GameState, completion: Optional[ScenarioCompletion]) -> AchievementEvent:
+        if completion:
+            mastered, score = completion.mastery_achieved, completion.overall_score
+        else:
+            evaluation = game_state.evaluation
+            mastered = bool(evaluation and evaluation.passed)
+            score = evaluation.total_score if evaluation else None
+        return AchievementEvent(kind="scenario_completed", scenario=game_state.scenario_name,
+                                mastered=mastered, score=score)
 
     async def advance_to_next_round(self, game_state: GameState) -> GameState:
         """Manually advance to next round (for API endpoint)"""
         if game_state.can_advance_round():
-            # Get scenario to update teen opening using the same mapping logic
-            scenario_name = None
-            if "school drop" in game_state.scenario_title.lower():
-                scenario_name = "school_dropoff_anxiety"
-            elif "messy" in game_state.scenario_title.lower():
-                scenario_name = "messy_room"
-            else:
-                scenario_name = game_state.scenario_title.replace(" ", "_").lower().replace("-", "_")
-
-            scenario = self.scenario_loader.load_scenario(scenario_name)
+            # Get scenario to update teen opening
+            scenario = self.scenario_loader.load_scenario(self._resolve_scenario_name(game_state))
             if scenario:
                 game_state.advance_to_next_round()
                 # Update teen opening for new round
@@ -201,9 +263,21 @@ class RoleplayGameEngine:
 
         return game_state
 
+    def _resolve_scenario_name(self, game_state: GameState) -> str:
+        """Scenario file stem for a game, mapping legacy title-only states"""
+        if game_state.scenario_name:
+            return game_state.scenario_name
+
+        title = game_state.scenario_title.lower()
+        if "school drop" in title:
+            return "school_dropoff_anxiety"
+        if "messy" in title:
+            return "messy_room"
+        return game_state.scenario_title.replace(" ", "_").lower().replace("-", "_")
+
     def get_available_scenarios(self) -> list[str]:
         """Get list of available scenario names"""
-        return self.scenario_loader.list_scenarios()
+        return self.catalog.names()
 
     def get_scenario(self, scenario_name: str) -> Optional[Scenario]:
         """Get a specific scenario"""
@@ -0,0 +1,217 @@
+"""Local gate run on parent responses before any model call
+
+Rejects input that would only waste an evaluation and a teen reply:
+profanity (bilingual blocklist, matched in one pass with Aho-Corasick) and
+keyboard mashing or repeated characters. Length is limited earlier, when the
+request is parsed (PromptText). A check takes tens of microseconds for a
+typical message.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel
+from ..config import GameConfig
+
+
+# Profanity and slurs aimed at the child. English entries only match whole
+# words ("ass" does not match "class"); Cantonese entries match anywhere.
+BLOCKLIST = {
+    "en": [
+        "fuck", "fucking", "fucker", "motherfucker", "shit", "bullshit", "bitch", "bastard",
+        "asshole", "dickhead", "cunt", "retard", "retarded", "slut", "whore", "piss off",
+    ],
+    "zh-HK": [
+        "仆街", "屌", "撚", "閪", "戇鳩", "戇居", "on9", "含家鏟", "冚家鏟", "死全家", "食屎",
+        "頂你個肺",
+    ],
+}
+
+REJECTION_MESSAGES = {
+    "empty": {
+        "en": "Please type what you would say to your child.",
+        "zh-HK": "請輸入你會同孩子講嘅說話。",
+    },
+    "blocked": {
+        "en": "Let's keep the conversation respectful. Try rephrasing what you want to say.",
+        "zh-HK": "我哋保持尊重嘅對話啦。試下換個講法。",
+    },
+    "gibberish": {
+        "en": "That doesn't look like a reply yet. What would you actually say to your child?",
+        "zh-HK": "呢個似乎唔係一個回應。你實際上會同孩子講啲乜？",
+    },
+}
+
+_KEYBOARD_ROWS = ("qwertyuiop", "asdfghjkl", "zxcvbnm")
+_LETTER = re.compile(r"[^\W\d_]")
+_CJK = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]")
+_LATIN_WORD = re.compile(r"[a-z]+")
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher: one pass over the text for all patterns"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+
+        for pattern in patterns:
+            node = 0
+            for char in pattern.lower():
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = next_node
+            self._out[node] += (pattern.lower(),)
+
+        # Breadth-first: a node's failure link is the longest proper suffix that is also a prefix
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+    def find(self, text: str) -> Iterable[Tuple[int, str]]:
+        """(end index, pattern) of every match in the lowercased text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern in out[node]:
+                yield index, pattern
+
+
+class FilterVerdict(BaseModel):
+    """Whether a parent response may go to the models, and why not"""
+
+    allowed: bool
+    reason: Optional[str] = None  # empty, blocked, gibberish
+    message: Optional[str] = None  # Shown to the parent, in the game's language
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+def _entropy(text: str) -> float:
+    """Shannon entropy in bits per character"""
+    counts = Counter(text)
+    total = len(text)
+    return -sum(n / total * math.log2(n / total) for n in counts.values())
+
+
+def _is_mash(word: str) -> bool:
+    """Keyboard runs ("asdf", "qwerty"); vowel-less words such as "psst" and "strengths" are real"""
+    return len(word) >= 4 and any(word in row or word in row[::-1] for row in _KEYBOARD_ROWS)
+
+
+class InputFilterStats:
+    """Checked and rejected counts per reason for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._checked = 0
+            self._rejected: Counter = Counter()
+
+    def record(self, verdict: FilterVerdict) -> None:
+        with self._lock:
+            self._checked += 1
+            if not verdict.allowed:
+                self._rejected[verdict.reason] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            checked = self._checked
+            return {
+                "checked": checked,
+                "rejected": sum(self._rejected.values()),
+                "by_reason": dict(self._rejected),
+                "rejection_rate": {
+                    reason: round(count / checked, 4) for reason, count in self._rejected.items()
+                },
+            }
+
+
+# Process-wide rejection stats, exposed next to agent metrics
+input_filter_stats = InputFilterStats()
+
+
+class InputFilter:
+    """Screens parent responses locally, in microseconds"""
+
+    def __init__(
+        self,
+        blocklist: Dict[str, List[str]] = BLOCKLIST,
+        min_entropy: Optional[float] = None,
+        stats: InputFilterStats = input_filter_stats
+    ):
+        # Both languages are always checked: parents code-switch freely
+        self._matcher = AhoCorasick(phrase for phrases in blocklist.values() for phrase in phrases)
+        self.min_entropy = GameConfig.INPUT_MIN_ENTROPY if min_entropy is None else min_entropy
+        self.stats = stats
+
+    def _blocked(self, text: str) -> Optional[str]:
+        for end, pattern in self._matcher.find(text):
+            start = end - len(pattern) + 1
+            # Whole-word matches only for patterns that begin or end with a Latin letter or digit
+            if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if _is_word_char(pattern[-1]) and end + 1 < len(text) and _is_word_char(text[end + 1]):
+                continue
+            return pattern
+        return None
+
+    def _gibberish(self, text: str) -> bool:
+        if not _LETTER.search(text):
+            return True  # Only digits, punctuation or emoji
+        tokens = text.split()
+        # A repeated short word ("ok ok ok ok ok") is a reply; judge repetition across distinct tokens,
+        # or within one long token ("hahahahahaha")
+        sample = "".join(tokens) if len(set(tokens)) >= 2 else tokens[0]
+        if len(sample) >= 10 and _entropy(sample) < self.min_entropy:
+            return True
+        if _CJK.search(text):
+            return False
+        # Latin-script words only; other scripts are left to the models
+        words = _LATIN_WORD.findall(text)
+        return sum(_is_mash(word) for word in words) * 2 >= len(words) > 0
+
+    def _verdict(self, text: str) -> Tuple[bool, Optional[str]]:
+        text = text.strip()
+        if not text:
+            return False, "empty"
+        lowered = text.lower()
+        if self._blocked(lowered):
+            return False, "blocked"
+        if self._gibberish(lowered):
+            return False, "gibberish"
+        return True, None
+
+    def check(self, parent_response: str, language: str = "en") -> FilterVerdict:
+        """Verdict for one response, counted in the process stats"""
+        allowed, reason = self._verdict(parent_response)
+        verdict = FilterVerdict(allowed=allowed)
+        if not allowed:
+            messages = REJECTION_MESSAGES[reason]
+            verdict = FilterVerdict(allowed=False, reason=reason, message=messages.get(language, messages["en"]))
+        self.stats.record(verdict)
+        return verdict
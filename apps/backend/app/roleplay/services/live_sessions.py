@@ -0,0 +1,53 @@
+"""Numbered frames of WebSocket roleplay sessions, kept for clients that reconnect
+
+Every frame the server sends over /ws/{session_id} gets the next sequence
+number of its session. The last few are kept in process, so a client whose
+connection dropped mid-turn reconnects with ?last_seq=N and receives what it
+missed; the turn itself keeps running and is saved either way.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Tuple
+from ..config import GameConfig
+
+
+class FrameLog:
+    """Last frames per session, for the most recently active sessions"""
+
+    def __init__(self, max_frames: Optional[int] = None, max_sessions: Optional[int] = None):
+        self.max_frames = GameConfig.WS_REPLAY_FRAMES if max_frames is None else max_frames
+        self.max_sessions = GameConfig.WS_REPLAY_SESSIONS if max_sessions is None else max_sessions
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Tuple[int, Deque[dict]]]" = OrderedDict()
+
+    def append(self, session_id: str, frame: dict) -> dict:
+        """Number the frame, keep it and return it"""
+        with self._lock:
+            seq, frames = self._sessions.pop(session_id, (0, None))
+            if frames is None:
+                frames = deque(maxlen=self.max_frames)
+            frame = {"seq": seq + 1, **frame}
+            frames.append(frame)
+            self._sessions[session_id] = (seq + 1, frames)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return frame
+
+    def since(self, session_id: str, last_seq: int) -> List[dict]:
+        """Kept frames after last_seq, oldest first"""
+        with self._lock:
+            _, frames = self._sessions.get(session_id, (0, ()))
+            return [frame for frame in frames if frame["seq"] > last_seq]
+
+    def last_seq(self, session_id: str) -> int:
+        with self._lock:
+            return self._sessions.get(session_id, (0, None))[0]
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+# Process-wide log; a reconnect has to reach the same process to replay
+frame_log = FrameLog()
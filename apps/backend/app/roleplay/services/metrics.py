@@ -0,0 +1,166 @@
+"""In-process token, latency and cost metrics for agent runs"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+from ..config import ModelConfig
+
+# Latency samples kept per breakdown key for percentile estimates
+LATENCY_WINDOW = 1000
+
+
+class AgentCall:
+    """One agent run, filled in by the agent while it executes"""
+
+    def __init__(self, role: str, model: str, scenario: str = "", language: str = "", round_number: Optional[int] = None):
+        self.role = role
+        self.model = model
+        self.scenario = scenario
+        self.language = language
+        self.round_number = round_number
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.retries = 0
+        self.latency_ms = 0.0
+        self.outcome = "ok"  # ok, fallback
+        self.error: Optional[str] = None
+
+    def set_usage(self, usage) -> None:
+        """Copy token counts from a pydantic_ai RunUsage (a method before pydantic_ai 2.0)"""
+        if callable(usage):
+            usage = usage()
+        self.input_tokens = usage.input_tokens or 0
+        self.output_tokens = usage.output_tokens or 0
+        self.cache_read_tokens = getattr(usage, "cache_read_tokens", 0) or 0
+        self.retries = max((usage.requests or 1) - 1, 0)
+
+    def mark_fallback(self, error: str) -> None:
+        """Record that the agent returned its fallback instead of model output"""
+        self.outcome = "fallback"
+        self.error = error
+
+    @property
+    def cost_usd(self) -> float:
+        input_price, output_price = ModelConfig.get_model_prices(self.model)
+        return (self.input_tokens * input_price + self.output_tokens * output_price) / 1_000_000
+
+
+class _Aggregate:
+    """Running totals for one breakdown key"""
+
+    __slots__ = (
+        "calls", "fallbacks", "retries", "input_tokens", "output_tokens", "cache_read_tokens",
+        "cost_usd", "latency_ms_total", "latencies",
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.fallbacks = 0
+        self.retries = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cost_usd = 0.0
+        self.latency_ms_total = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, call: AgentCall) -> None:
+        self.calls += 1
+        self.fallbacks += call.outcome == "fallback"
+        self.retries += call.retries
+        self.input_tokens += call.input_tokens
+        self.output_tokens += call.output_tokens
+        self.cache_read_tokens += call.cache_read_tokens
+        self.cost_usd += call.cost_usd
+        self.latency_ms_total += call.latency_ms
+        self.latencies.append(call.latency_ms)
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            return round(ordered[min(int(p * len(ordered)), len(ordered) - 1)], 1) if ordered else 0.0
+
+        return {
+            "calls": self.calls,
+            "fallbacks": self.fallbacks,
+            "retries": self.retries,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "avg_input_tokens": round(self.input_tokens / self.calls, 1) if self.calls else 0.0,
+            "avg_output_tokens": round(self.output_tokens / self.calls, 1) if self.calls else 0.0,
+            "cost_usd": round(self.cost_usd, 6),
+            "avg_latency_ms": round(self.latency_ms_total / self.calls, 1) if self.calls else 0.0,
+            "p50_latency_ms": pct(0.50),
+            "p95_latency_ms": pct(0.95),
+        }
+
+
+class AgentMetrics:
+    """Aggregates agent calls overall and per model, role, scenario, round and language"""
+
+    DIMENSIONS = ("model", "role", "scenario", "scenario_round", "language")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._total = _Aggregate()
+            self._by: Dict[str, Dict[str, _Aggregate]] = {
+                dimension: defaultdict(_Aggregate) for dimension in self.DIMENSIONS
+            }
+
+    @contextmanager
+    def track(
+        self,
+        role: str,
+        model: str,
+        scenario: str = "",
+        language: str = "",
+        round_number: Optional[int] = None
+    ) -> Iterator[AgentCall]:
+        """Time an agent run and record it when the block exits"""
+        call = AgentCall(role, model, scenario, language, round_number)
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            call.mark_fallback(str(e))
+            raise
+        finally:
+            call.latency_ms = (time.perf_counter() - start) * 1000
+            self.record(call)
+
+    def record(self, call: AgentCall) -> None:
+        keys = {
+            "model": call.model,
+            "role": call.role,
+            "scenario": call.scenario or "unknown",
+            "scenario_round": f"{call.scenario or 'unknown'}/{call.round_number or 1}",
+            "language": call.language or "unknown",
+        }
+        with self._lock:
+            self._total.add(call)
+            for dimension, key in keys.items():
+                self._by[dimension][key].add(call)
+
+    def snapshot(self) -> dict:
+        """Current aggregates as plain JSON-serializable data"""
+        with self._lock:
+            return {
+                "total": self._total.to_dict(),
+                **{
+                    f"by_{dimension}": {key: agg.to_dict() for key, agg in sorted(groups.items())}
+                    for dimension, groups in self._by.items()
+                },
+            }
+
+
+# Process-wide collector shared by all agents
+agent_metrics = AgentMetrics()
@@ -0,0 +1,223 @@
+"""Roleplay sessions of signed-in players, kept in the database
+
+Each session is one roleplay_sessions row keyed by session id: loading a
+turn is a primary-key lookup, and any device or Lambda container can serve
+it. The state is stored in the session store's compact form; the columns a
+session listing needs are copied out next to it.
+
+Saves are optimistic: each carries the version it was based on and only
+applies if the row still has that version, so two devices answering the
+same turn cannot silently overwrite each other.
+
+A save writes only what the turn changed: the session store's delta goes to
+roleplay_session_deltas and the session row just gets its new version and
+listing columns. Every SESSION_SNAPSHOT_EVERY saves the full state is written
+to the row instead and the deltas are cleared, so a load reads the snapshot
+plus a few deltas. A delta needs the state it was based on, so the store
+keeps the compact state of each session's last version it read or wrote; a
+save based on anything else (another container played the last turn) writes
+a snapshot.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.db.database import SessionLocal
+from app.models.roleplay_session import RoleplaySession, RoleplaySessionDelta
+from ..config import GameConfig
+from ..models.game_state import GameState
+from .session_store import CompactGameState, diff, pack, replay, unpack
+
+
+class SessionConflict(Exception):
+    """The session was saved by another request since it was loaded"""
+
+
+class ActiveSession(BaseModel):
+    """Listing entry for an unfinished session"""
+
+    session_id: str
+    scenario: str
+    scenario_title: str
+    language: str
+    is_multi_round: bool
+    current_round: int
+    max_rounds: int
+    version: int
+    updated_at: Optional[datetime] = None
+
+
+def _columns(state: GameState) -> dict:
+    return {
+        "scenario": state.scenario_name,
+        "scenario_title": state.scenario_title,
+        "language": state.language,
+        "is_multi_round": state.is_multi_round,
+        "current_round": state.current_round,
+        "max_rounds": state.max_rounds,
+        "completed": state.game_completed,
+    }
+
+
+def _dumps(delta: dict) -> str:
+    return json.dumps(delta, ensure_ascii=False)
+
+
+class DatabaseSessionStore:
+    """Versioned game sessions owned by users"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        snapshot_every: Optional[int] = None,
+        max_bases: int = 1000
+    ):
+        self.session_factory = session_factory
+        self.snapshot_every = GameConfig.SESSION_SNAPSHOT_EVERY if snapshot_every is None else snapshot_every
+        self.max_bases = max_bases
+        self._lock = threading.Lock()
+        # Session id -> (version, snapshot version, compact state) last read or written by this process
+        self._bases: "OrderedDict[str, Tuple[int, int, CompactGameState]]" = OrderedDict()
+        self.snapshots = 0
+        self.deltas = 0
+        self.delta_bytes = 0
+
+    def _remember(self, session_id: str, version: int, snapshot_version: int, compact: CompactGameState) -> None:
+        with self._lock:
+            self._bases.pop(session_id, None)
+            self._bases[session_id] = (version, snapshot_version, compact)
+            while len(self._bases) > self.max_bases:
+                self._bases.popitem(last=False)
+
+    def _base(self, session_id: str, version: int) -> Optional[Tuple[int, CompactGameState]]:
+        """Snapshot version and compact state of the session at `version`, if this process has them"""
+        with self._lock:
+            base = self._bases.get(session_id)
+        return base[1:] if base is not None and base[0] == version else None
+
+    def create(self, session_id: str, user_id: str, state: GameState) -> int:
+        """Store a new session; returns its first version"""
+        compact = pack(state)
+        db = self.session_factory()
+        try:
+            db.add(RoleplaySession(id=session_id, user_id=user_id, version=1, snapshot_version=1,
+                                   state=_dumps(diff(None, compact)), **_columns(state)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self._remember(session_id, 1, 1, compact)
+        return 1
+
+    def load(self, session_id: str, user_id: str) -> Optional[Tuple[GameState, int]]:
+        """The session's state and version, or None when the user has no such session"""
+        db = self.session_factory()
+        try:
+            row = db.execute(
+                select(RoleplaySession.user_id, RoleplaySession.version, RoleplaySession.snapshot_version,
+                       RoleplaySession.state)
+                .where(RoleplaySession.id == session_id)
+            ).first()
+            if row is None or row.user_id != user_id:
+                return None
+            deltas = db.execute(
+                select(RoleplaySessionDelta.delta)
+                .where(RoleplaySessionDelta.session_id == session_id,
+                       RoleplaySessionDelta.version > row.snapshot_version,
+                       RoleplaySessionDelta.version <= row.version)
+                .order_by(RoleplaySessionDelta.version)
+            ).scalars().all()
+        finally:
+            db.close()
+        compact = replay(json.loads(delta) for delta in (row.state, *deltas))
+        self._remember(session_id, row.version, row.snapshot_version, compact)
+        return unpack(compact), row.version
+
+    def save(self, session_id: str, user_id: str, state: GameState, version: int) -> int:
+        """Record the turn played on `version`; returns the new version or raises SessionConflict"""
+        compact = pack(state)
+        base = self._base(session_id, version)
+        values = {"version": version + 1, "updated_at": func.now(), **_columns(state)}
+        if base is None or version + 1 - base[0] > self.snapshot_every:
+            snapshot_version, delta = version + 1, None
+            values.update(state=_dumps(diff(None, compact)), snapshot_version=snapshot_version)
+        else:
+            snapshot_version, delta = base[0], _dumps(diff(base[1], compact))
+
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(RoleplaySession)
+                .where(RoleplaySession.id == session_id, RoleplaySession.user_id == user_id,
+                       RoleplaySession.version == version)
+                .values(**values)
+            )
+            if result.rowcount != 1:
+                raise SessionConflict(f"Session {session_id} changed since version {version}")
+            if delta is None:
+                db.execute(delete(RoleplaySessionDelta).where(RoleplaySessionDelta.session_id == session_id))
+            else:
+                db.add(RoleplaySessionDelta(session_id=session_id, version=version + 1, delta=delta))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self._remember(session_id, version + 1, snapshot_version, compact)
+        with self._lock:
+            if delta is None:
+                self.snapshots += 1
+            else:
+                self.deltas += 1
+                self.delta_bytes += len(delta.encode("utf-8"))
+        return version + 1
+
+    def delete(self, session_id: str, user_id: str) -> bool:
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                delete(RoleplaySession).where(RoleplaySession.id == session_id, RoleplaySession.user_id == user_id)
+            )
+            if result.rowcount == 1:
+                db.execute(delete(RoleplaySessionDelta).where(RoleplaySessionDelta.session_id == session_id))
+            db.commit()
+        finally:
+            db.close()
+        with self._lock:
+            self._bases.pop(session_id, None)
+        return result.rowcount == 1
+
+    def active(self, user_id: str, limit: int = 20) -> List[ActiveSession]:
+        """Unfinished sessions of a user, most recently played first"""
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(RoleplaySession.id.label("session_id"), RoleplaySession.scenario, RoleplaySession.scenario_title,
+                       RoleplaySession.language, RoleplaySession.is_multi_round, RoleplaySession.current_round,
+                       RoleplaySession.max_rounds, RoleplaySession.version, RoleplaySession.updated_at)
+                .where(RoleplaySession.user_id == user_id, RoleplaySession.completed.is_(False))
+                .order_by(RoleplaySession.updated_at.desc())
+                .limit(limit)
+            )
+            return [ActiveSession(**row._mapping) for row in rows]
+        finally:
+            db.close()
+
+    def snapshot(self) -> dict:
+        """Saves written as full snapshots and as deltas, and the mean delta size"""
+        with self._lock:
+            return {
+                "snapshots": self.snapshots,
+                "deltas": self.deltas,
+                "mean_delta_bytes": round(self.delta_bytes / self.deltas) if self.deltas else 0,
+            }
@@ -0,0 +1,211 @@
+"""Local rule-based pre-scorer for instant provisional feedback"""
+
+import math
+from typing import Dict, List, Optional
+from ..config import GameConfig
+from ..models.evaluation import EvaluationResult, MultiRoundEvaluationResult, ProvisionalScore
+
+
+# Bilingual lexicons. Matching is case-insensitive substring matching, which
+# works for Cantonese (no word boundaries) and is good enough for English.
+VALIDATION_PHRASES = {
+    "en": [
+        "i understand", "i know you", "i hear you", "i see you", "sounds like",
+        "you must be", "you seem", "you look", "you feel", "feeling", "that's hard",
+        "that is hard", "it's okay", "it's ok", "makes sense", "i get it",
+        "thank you", "i appreciate", "must be tiring", "long day",
+    ],
+    "zh-HK": [
+        "明白", "理解", "知道你", "辛苦", "好攰", "感受", "你覺得", "唔緊要",
+        "體諒", "聽你講", "我知你", "多謝", "難為你", "唔容易",
+    ],
+}
+
+COLLABORATIVE_PHRASES = {
+    "en": [
+        "let's", "let us", "together", "how about", "what if we", "could we",
+        "can we", "would you", "what do you think", "shall we", "we can",
+    ],
+    "zh-HK": [
+        "一齊", "不如", "我哋", "你諗", "點睇", "好唔好", "可唔可以", "點樣先", "你想",
+    ],
+}
+
+REASONING_PHRASES = {
+    "en": ["because", "so that", "that way", "the reason"],
+    "zh-HK": ["因為", "咁樣", "所以", "原因"],
+}
+
+DISMISSIVE_PHRASES = {
+    "en": [
+        "i don't care", "stop whining", "no excuses", "whatever", "because i said so",
+        "don't talk back", "lazy", "ridiculous", "how many times", "shut up",
+        "stupid", "useless", "excuses", "i don't want to hear",
+    ],
+    "zh-HK": [
+        "唔理", "搵藉口", "藉口", "懶", "講幾多次", "收聲", "廢", "蠢", "唔准",
+        "駁嘴", "我話事", "係咁先", "唔好再講", "煩死",
+    ],
+}
+
+IMPERATIVE_PHRASES = {
+    "en": [
+        "right now", "immediately", "you must", "you have to", "do it now",
+        "go clean", "clean it up", "clean your", "get up", "now!",
+    ],
+    "zh-HK": [
+        "即刻", "而家就", "快啲", "馬上", "俾我", "同我", "你要", "一定要", "執返",
+    ],
+}
+
+
+class RuleBasedPreScorer:
+    """Scores parent responses locally in milliseconds, without a model call"""
+
+    def __init__(self):
+        lexicons = {
+            "validation": VALIDATION_PHRASES,
+            "collaborative": COLLABORATIVE_PHRASES,
+            "reasoning": REASONING_PHRASES,
+            "dismissive": DISMISSIVE_PHRASES,
+            "imperative": IMPERATIVE_PHRASES,
+        }
+        # Both languages are always checked: parents code-switch freely
+        self._compiled = {
+            name: [phrase for phrases in lexicon.values() for phrase in phrases]
+            for name, lexicon in lexicons.items()
+        }
+
+    def score(self, parent_response: str) -> ProvisionalScore:
+        """Produce a provisional tone/approach/respect rubric score"""
+        text = parent_response.strip()
+        lowered = text.lower()
+        signals = {
+            name: sum(1 for phrase in phrases if phrase in lowered)
+            for name, phrases in self._compiled.items()
+        }
+        signals["exclamations"] = text.count("!") + text.count("！")
+        letters = [c for c in text if c.isascii() and c.isalpha()]
+        signals["shouting"] = int(len(letters) >= 8 and sum(c.isupper() for c in letters) / len(letters) > 0.6)
+
+        harsh = signals["imperative"] + (signals["exclamations"] >= 2) + signals["shouting"]
+
+        tone = 3 - min(signals["dismissive"], 3) - min(harsh, 2)
+        if signals["validation"] >= 2 and not signals["dismissive"]:
+            tone += 1
+        tone = _clamp(tone, 0, 4)
+
+        approach = 1 + min(signals["collaborative"], 1) + min(signals["reasoning"], 1) - min(signals["dismissive"], 2)
+        if signals["imperative"] and not signals["collaborative"]:
+            approach = min(approach, 1)
+        approach = _clamp(approach, 0, 3)
+
+        respect = 1 + min(signals["validation"], 2) - min(signals["dismissive"], 2)
+        respect = _clamp(respect, 0, 3)
+
+        total = tone + approach + respect
+        confidence = self._confidence(signals, text)
+
+        verdict = "uncertain"
+        if confidence >= GameConfig.PRESCORE_MIN_CONFIDENCE:
+            if total <= GameConfig.PRESCORE_FAIL_BELOW:
+                verdict = "fail"
+            elif total >= GameConfig.PRESCORE_PASS_ABOVE:
+                verdict = "pass"
+
+        return ProvisionalScore(
+            tone_score=tone,
+            approach_score=approach,
+            respect_score=respect,
+            total_score=total,
+            confidence=confidence,
+            verdict=verdict,
+            signals={name: count for name, count in signals.items() if count},
+        )
+
+    def _confidence(self, signals: Dict[str, int], text: str) -> float:
+        """Estimate how far the lexicon signals can be trusted"""
+        positive = signals["validation"] + signals["collaborative"] + signals["reasoning"]
+        negative = signals["dismissive"] + signals["imperative"] + signals["shouting"]
+        evidence = positive + negative
+        if not text or evidence == 0:
+            return 0.2
+
+        confidence = min(0.4 + 0.15 * evidence, 0.95)
+        # Mixed signals ("I understand, but you're so lazy") need a real evaluator
+        if positive and negative:
+            confidence *= 0.5
+        return round(confidence, 2)
+
+    def should_short_circuit(self, provisional: Optional[ProvisionalScore]) -> bool:
+        """Check if the provisional score is decisive enough to skip the model"""
+        return (GameConfig.PRESCORE_SHORT_CIRCUIT
+                and provisional is not None
+                and provisional.verdict != "uncertain")
+
+    def to_evaluation(
+        self,
+        provisional: ProvisionalScore,
+        language: str = "zh-HK",
+        threshold: Optional[int] = None
+    ) -> EvaluationResult:
+        """Turn a decisive provisional score into a final single-round evaluation,
+        passed by the same total >= threshold rule as the model evaluations"""
+        threshold = GameConfig.PASS_THRESHOLD if threshold is None else threshold
+        passed = provisional.total_score >= threshold
+        return EvaluationResult(
+            tone_score=provisional.tone_score,
+            approach_score=provisional.approach_score,
+            respect_score=provisional.respect_score,
+            total_score=provisional.total_score,
+            feedback=self._feedback(passed, language),
+            passed=passed,
+        )
+
+    def to_multi_round_evaluation(
+        self,
+        provisional: ProvisionalScore,
+        criteria: List[str],
+        max_scores: Dict[str, int],
+        round_number: int,
+        language: str = "zh-HK",
+        pass_threshold: Optional[int] = None
+    ) -> MultiRoundEvaluationResult:
+        """Project a decisive provisional score onto a round's criteria; passed when the projected
+        total reaches the round's pass_threshold (PASS_THRESHOLD scaled to the round without one)"""
+        ratio = provisional.total_score / 10
+        criteria_scores = {
+            criterion: round(ratio * max_scores.get(criterion, 3))
+            for criterion in criteria
+        }
+        total_score = sum(criteria_scores.values())
+        max_possible_score = sum(max_scores.get(criterion, 3) for criterion in criteria)
+        if pass_threshold is None:
+            pass_threshold = math.ceil(GameConfig.PASS_THRESHOLD / 10 * max_possible_score)
+        passed = total_score >= pass_threshold
+        feedback = self._feedback(passed, language)
+
+        return MultiRoundEvaluationResult(
+            criteria_scores=criteria_scores,
+            total_score=total_score,
+            max_possible_score=max_possible_score,
+            feedback=feedback,
+            detailed_feedback={criterion: feedback for criterion in criteria},
+            passed=passed,
+            round_number=round_number
+        )
+
+    def _feedback(self, passed: bool, language: str) -> str:
+        """Localized feedback for short-circuited evaluations"""
+        if passed:
+            if language == "en":
+                return "Great response: you acknowledged your child's feelings and invited them to work with you."
+            return "回應得好好：你有認同小朋友嘅感受，亦邀請佢一齊解決問題。"
+
+        if language == "en":
+            return "This response sounds dismissive or demanding. Try acknowledging how your child feels before asking for change."
+        return "呢個回應聽落比較否定或者命令式。試下先認同小朋友嘅感受，再傾點樣改善。"
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(high, value))
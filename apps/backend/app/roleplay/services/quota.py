@@ -0,0 +1,300 @@
+"""Per-user daily budgets for paid model calls
+
+Usage is counted in process: every agent run made for a known user adds its
+calls and tokens to that user's totals for the UTC day, and checking a
+budget is a dict lookup. Totals are read from user_llm_usage when a user is
+first seen, again once the cached total is a flush interval old, and after
+every flush; increments are flushed back periodically (after requests, and
+at shutdown). Other containers' usage is therefore seen within about two
+flush intervals, so budgets hold across containers to within that window.
+
+Turns are charged to the signed-in user, and anonymous turns to the caller's
+address ("ip:<address>"), so leaving out the sign-in token escapes no budget.
+The user a call is made for travels in a context variable set by the API;
+agents run their model calls inside metered(), which records the call in
+agent metrics and checks and charges that user, so the agents need no extra
+arguments. A turn that may still be
+discarded (a versioned save can lose to another device) holds its charges
+back and settles them once the turn is kept.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.models.llm_usage import UserLLMUsage
+from ..config import GameConfig
+from .metrics import AgentCall, AgentMetrics, agent_metrics
+
+logger = logging.getLogger(__name__)
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+_FIELDS = ("calls", "input_tokens", "output_tokens", "cost_usd")
+
+# User the current request's agent calls are charged to, and whether each call checks the budget first
+quota_user: ContextVar[Optional[str]] = ContextVar("quota_user", default=None)
+quota_checked_per_call: ContextVar[bool] = ContextVar("quota_checked_per_call", default=True)
+
+
+@contextmanager
+def charged_to(user_id: Optional[str], check_each_call: bool = True) -> Iterator[None]:
+    """Charge agent calls made inside the block to user_id (nothing is charged for None).
+    Blocks that checked the budget once up front pass check_each_call=False, so their
+    work is never cut off halfway"""
+    token = quota_user.set(user_id)
+    check_token = quota_checked_per_call.set(check_each_call)
+    try:
+        yield
+    finally:
+        quota_checked_per_call.reset(check_token)
+        quota_user.reset(token)
+
+
+# Charges held back by the current block, if any (see held_charges)
+held_quota_charges: ContextVar[Optional[List[Tuple[int, int, float]]]] = ContextVar("held_quota_charges", default=None)
+
+
+@contextmanager
+def held_charges() -> Iterator[List[Tuple[int, int, float]]]:
+    """Collect the block's charges instead of applying them; pass them to QuotaLedger.settle
+    once the work they paid for is kept"""
+    charges: List[Tuple[int, int, float]] = []
+    token = held_quota_charges.set(charges)
+    try:
+        yield charges
+    finally:
+        held_quota_charges.reset(token)
+
+
+@contextmanager
+def metered(
+    role: str,
+    model: str,
+    scenario: str = "",
+    language: str = "",
+    round_number: Optional[int] = None,
+    metrics: Optional[AgentMetrics] = None
+) -> Iterator[AgentCall]:
+    """Track an agent run in metrics and charge it to the current quota_user. The run is refused
+    up front once that user's daily budget is spent, unless the caller checked it already"""
+    user_id = quota_user.get()
+    if user_id and quota_checked_per_call.get():
+        quota_ledger.check(user_id)
+    call = None
+    try:
+        with (metrics or agent_metrics).track(role, model, scenario, language, round_number) as call:
+            yield call
+    finally:
+        if user_id and call is not None:
+            held = held_quota_charges.get()
+            if held is not None:
+                held.append((call.input_tokens, call.output_tokens, call.cost_usd))
+            else:
+                quota_ledger.charge(user_id, call.input_tokens, call.output_tokens, call.cost_usd)
+
+
+class QuotaExceeded(Exception):
+    """The user has used up a daily budget"""
+
+
+class _Usage:
+    __slots__ = _FIELDS
+
+    def __init__(self, calls: int = 0, input_tokens: int = 0, output_tokens: int = 0, cost_usd: float = 0.0):
+        self.calls = calls
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cost_usd = cost_usd
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, other: "_Usage") -> None:
+        for field in _FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def to_dict(self) -> dict:
+        return {field: round(getattr(self, field), 6) for field in _FIELDS}
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class QuotaLedger:
+    """Today's usage per user, with budgets checked locally and totals flushed to the database"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        daily_calls: Optional[int] = None,
+        daily_tokens: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        today: Callable[[], date] = _today
+    ):
+        self.session_factory = session_factory
+        self.daily_calls = GameConfig.QUOTA_DAILY_CALLS if daily_calls is None else daily_calls
+        self.daily_tokens = GameConfig.QUOTA_DAILY_TOKENS if daily_tokens is None else daily_tokens
+        self.flush_interval = GameConfig.QUOTA_FLUSH_SECONDS if flush_interval is None else flush_interval
+        self.today = today
+        self._lock = threading.Lock()
+        self._day = today()
+        self._usage: Dict[str, Tuple[_Usage, float]] = {}  # Today's totals in this process, and when they were read
+        self._pending: Dict[Tuple[str, date], _Usage] = {}  # Increments not yet in the database
+        self._flushing: Dict[Tuple[str, date], _Usage] = {}  # Increments being written right now
+        self._flush_lock = threading.Lock()
+        self._flushes = 0  # Finished flushes, so a read that overlapped one is not cached
+        self._flushed_at = time.monotonic()
+
+    def _roll_day(self) -> None:
+        # Called with the lock held; pending increments keep their own day
+        day = self.today()
+        if day != self._day:
+            self._day = day
+            self._usage = {}
+
+    def _load(self, user_id: str, day: date) -> _Usage:
+        db = self.session_factory()
+        try:
+            row = db.get(UserLLMUsage, (user_id, day))
+            return _Usage(*(getattr(row, field) for field in _FIELDS)) if row else _Usage()
+        except SQLAlchemyError as e:
+            logger.warning(f"Failed to load LLM usage for {user_id}: {e}")
+            return _Usage()
+        finally:
+            db.close()
+
+    def usage(self, user_id: str) -> _Usage:
+        """Today's totals for a user, read from the database again once a flush interval old,
+        so usage flushed by other containers counts too"""
+        with self._lock:
+            self._roll_day()
+            cached = self._usage.get(user_id)
+            day, flushes = self._day, self._flushes
+        if cached is not None and time.monotonic() - cached[1] < self.flush_interval:
+            return cached[0]
+        loaded = self._load(user_id, day)
+        with self._lock:
+            # The stored total lacks this process's increments that are not written yet
+            for unwritten in (self._pending, self._flushing):
+                increment = unwritten.get((user_id, day))
+                if increment is not None:
+                    loaded.add(increment)
+            if day == self._day and flushes == self._flushes:
+                self._usage[user_id] = (loaded, time.monotonic())
+            return loaded
+
+    def check(self, user_id: str, expected_tokens: int = 0) -> None:
+        """Raise QuotaExceeded if the user cannot afford another call of about expected_tokens"""
+        usage = self.usage(user_id)
+        if self.daily_calls and usage.calls >= self.daily_calls:
+            raise QuotaExceeded(f"Daily limit of {self.daily_calls} model calls reached")
+        if self.daily_tokens and usage.tokens + expected_tokens > self.daily_tokens:
+            raise QuotaExceeded(f"Daily limit of {self.daily_tokens} model tokens reached")
+
+    def charge(self, user_id: str, input_tokens: int = 0, output_tokens: int = 0, cost_usd: float = 0.0) -> None:
+        """Add one call to the user's totals; never touches the database"""
+        delta = _Usage(1, input_tokens, output_tokens, cost_usd)
+        with self._lock:
+            self._roll_day()
+            cached = self._usage.get(user_id)
+            if cached is not None:
+                cached[0].add(delta)
+            # Users not loaded yet see this call when they are, as a pending increment
+            self._pending.setdefault((user_id, self._day), _Usage()).add(delta)
+
+    def settle(self, user_id: str, charges: List[Tuple[int, int, float]]) -> None:
+        """Apply charges collected by held_charges"""
+        for input_tokens, output_tokens, cost_usd in charges:
+            self.charge(user_id, input_tokens, output_tokens, cost_usd)
+
+    def flush_due(self) -> bool:
+        return bool(self._pending) and time.monotonic() - self._flushed_at >= self.flush_interval
+
+    def maybe_flush(self) -> None:
+        if self.flush_due():
+            self.flush()
+
+    def flush(self) -> int:
+        """Write pending increments to the database, and have cached totals read again so they
+        include other containers' usage; returns the rows written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._flushing = pending
+                self._flushed_at = time.monotonic()
+            written = self._write(pending) if pending else 0
+            with self._lock:
+                self._flushing = {}
+                self._usage = {}
+                self._flushes += 1
+            return written
+
+    def _write(self, pending: Dict[Tuple[str, date], _Usage]) -> int:
+        rows = [{"user_id": user_id, "day": day, **usage.to_dict()} for (user_id, day), usage in pending.items()]
+
+        db = self.session_factory()
+        try:
+            table = UserLLMUsage.__table__
+            insert = _UPSERTS.get(db.get_bind().dialect.name)
+            if insert is not None:
+                statement = insert(table).values(rows)
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=["user_id", "day"],
+                    set_={field: table.c[field] + statement.excluded[field] for field in _FIELDS},
+                ))
+            else:
+                for values in rows:
+                    row = db.get(UserLLMUsage, (values["user_id"], values["day"]), with_for_update=True)
+                    if row is None:
+                        db.add(UserLLMUsage(**values))
+                    else:
+                        for field in _FIELDS:
+                            setattr(row, field, getattr(row, field) + values[field])
+            db.commit()
+            return len(rows)
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Failed to flush LLM usage for {len(rows)} users: {e}")
+            with self._lock:
+                # Keep the increments for the next attempt
+                for key, usage in pending.items():
+                    self._pending.setdefault(key, _Usage()).add(usage)
+            return 0
+        finally:
+            db.close()
+
+    def top(self, day: Optional[date] = None, limit: int = 20) -> List[dict]:
+        """Heaviest users of a day (today by default) by tokens, after flushing this process"""
+        self.flush()
+        day = day or self.today()
+        db = self.session_factory()
+        try:
+            rows = db.scalars(
+                select(UserLLMUsage)
+                .where(UserLLMUsage.day == day)
+                .order_by((UserLLMUsage.input_tokens + UserLLMUsage.output_tokens).desc())
+                .limit(limit)
+            )
+            return [
+                {"user_id": row.user_id, "day": row.day.isoformat(),
+                 **{field: getattr(row, field) for field in _FIELDS},
+                 "tokens": row.input_tokens + row.output_tokens}
+                for row in rows
+            ]
+        finally:
+            db.close()
+
+
+# Process-wide ledger, charged by metered() for the current quota_user
+quota_ledger = QuotaLedger()
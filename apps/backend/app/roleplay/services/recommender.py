@@ -0,0 +1,282 @@
+"""Next-scenario recommendations from a parent's criterion-level weaknesses
+
+Scenarios are precomputed into a row-normalised matrix over the evaluation
+criteria they exercise (weighted by the points at stake). Each user has a
+weakness vector over the same criteria: one minus their average
+score/max ratio, shrunk towards a neutral prior until there is evidence.
+A recommendation is one matrix-vector product over the whole catalog, plus
+masks for language, mastered scenarios and exclusions.
+
+Per-user totals are kept in user_criterion_stats and cached in-process;
+every evaluated turn updates both, so a cached vector never needs a reload.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.models.achievement import UserCounterMember
+from app.models.user_skill import UserCriterionStat
+from app.services.achievement_service import MASTERED_COUNTER
+from ..config import GameConfig
+from ..models.game_state import GameState
+from ..scenarios.loader import Scenario, ScenarioLoader
+from .transcripts import transcript_row
+
+logger = logging.getLogger(__name__)
+
+# Rubric of single-round scenarios, as recorded in transcripts
+SINGLE_ROUND_CRITERIA = {"tone": 4, "approach": 3, "respect": 3}
+DIFFICULTY_FACTOR = {"easy": 1.0, "medium": 0.95, "hard": 0.9}
+PRIOR_WEAKNESS = 0.5
+PRIOR_WEIGHT = 2.0  # Observations a criterion needs before the user's own average dominates
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def scenario_criteria(scenario: Scenario) -> Dict[str, int]:
+    """Points at stake per criterion over the whole scenario, as it is actually played"""
+    if not scenario.is_multi_round:
+        return dict(SINGLE_ROUND_CRITERIA)
+    points: Dict[str, int] = {}
+    for round_data in scenario.rounds:
+        for criterion in round_data.evaluation_criteria:
+            points[criterion] = points.get(criterion, 0) + scenario.get_criterion(criterion).max_score
+    return points
+
+
+class Recommendation(BaseModel):
+    """A suggested scenario and the weak criteria it practises"""
+
+    scenario: str
+    score: float
+    focus: List[str]
+
+
+class ScenarioVectors:
+    """Criterion matrix of the recommendable scenarios"""
+
+    def __init__(self, scenarios: Sequence[Scenario]):
+        self.names = [scenario.name for scenario in scenarios]
+        self.position = {name: index for index, name in enumerate(self.names)}
+        criteria = [scenario_criteria(scenario) for scenario in scenarios]
+        self.vocabulary = sorted({criterion for points in criteria for criterion in points})
+        self.column = {criterion: index for index, criterion in enumerate(self.vocabulary)}
+        self.max_scores = {
+            scenario.name: {criterion: scenario.get_criterion(criterion).max_score for criterion in points}
+            if scenario.is_multi_round else SINGLE_ROUND_CRITERIA
+            for scenario, points in zip(scenarios, criteria)
+        }
+
+        matrix = np.zeros((len(self.names), len(self.vocabulary)), dtype=np.float32)
+        for row, points in enumerate(criteria):
+            for criterion, value in points.items():
+                matrix[row, self.column[criterion]] = value
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        difficulty = np.array(
+            [[DIFFICULTY_FACTOR.get(scenario.difficulty, 1.0)] for scenario in scenarios], dtype=np.float32
+        )
+        # Difficulty is folded into the rows so scoring is a single product
+        self.matrix = matrix / np.where(norms == 0, 1, norms) * difficulty
+        # Added to the scores: 0 where the scenario has the language, -inf elsewhere
+        self.language_bias: Dict[str, np.ndarray] = {}
+        for index, scenario in enumerate(scenarios):
+            for language in scenario.languages:
+                bias = self.language_bias.setdefault(language, np.full(len(self.names), -np.inf, dtype=np.float32))
+                bias[index] = 0
+
+
+class _UserSkills:
+    """Cached running totals of one user, aligned with a vocabulary"""
+
+    __slots__ = ("loaded_at", "counts", "ratio_sums", "mastered")
+
+    def __init__(self, loaded_at: float, counts: np.ndarray, ratio_sums: np.ndarray, mastered: Set[str]):
+        self.loaded_at = loaded_at
+        self.counts = counts
+        self.ratio_sums = ratio_sums
+        self.mastered = mastered
+
+    def weakness(self) -> np.ndarray:
+        misses = self.counts - self.ratio_sums
+        return (misses + PRIOR_WEIGHT * PRIOR_WEAKNESS) / (self.counts + PRIOR_WEIGHT)
+
+
+class ScenarioRecommender:
+    """Picks the scenario that best targets a user's weakest criteria"""
+
+    def __init__(
+        self,
+        loader: Optional[ScenarioLoader] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None
+    ):
+        self.loader = loader or ScenarioLoader()
+        self.session_factory = session_factory
+        self.cache_size = GameConfig.RECOMMENDER_CACHE_SIZE if cache_size is None else cache_size
+        self.cache_ttl = GameConfig.RECOMMENDER_CACHE_TTL if cache_ttl is None else cache_ttl
+        self._lock = threading.Lock()
+        self._vectors: Optional[ScenarioVectors] = None
+        self._users: "OrderedDict[str, _UserSkills]" = OrderedDict()
+
+    @property
+    def vectors(self) -> ScenarioVectors:
+        if self._vectors is None:
+            self.refresh()
+        return self._vectors
+
+    def refresh(self) -> None:
+        """Rebuild the scenario matrix; cached users are realigned on next use"""
+        vectors = ScenarioVectors(self.loader.load_all_scenarios())
+        with self._lock:
+            self._vectors = vectors
+            self._users.clear()
+
+    def _load_user(self, user_id: str) -> _UserSkills:
+        vectors = self.vectors
+        counts = np.zeros(len(vectors.vocabulary), dtype=np.float32)
+        ratio_sums = np.zeros(len(vectors.vocabulary), dtype=np.float32)
+        mastered: Set[str] = set()
+        db = self.session_factory()
+        try:
+            for stat in db.scalars(select(UserCriterionStat).where(UserCriterionStat.user_id == user_id)):
+                column = vectors.column.get(stat.criterion)
+                if column is not None:
+                    counts[column] = stat.count
+                    ratio_sums[column] = stat.ratio_sum
+            mastered = set(db.scalars(select(UserCounterMember.member).where(
+                UserCounterMember.user_id == user_id, UserCounterMember.counter == MASTERED_COUNTER
+            )))
+        except SQLAlchemyError as e:
+            logger.warning(f"Failed to load criterion stats for {user_id}: {e}")
+        finally:
+            db.close()
+        return _UserSkills(time.monotonic(), counts, ratio_sums, mastered)
+
+    def _user(self, user_id: str) -> _UserSkills:
+        with self._lock:
+            skills = self._users.get(user_id)
+            if skills is not None and time.monotonic() - skills.loaded_at < self.cache_ttl:
+                self._users.move_to_end(user_id)
+                return skills
+        skills = self._load_user(user_id)
+        with self._lock:
+            self._users[user_id] = skills
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.cache_size:
+                self._users.popitem(last=False)
+        return skills
+
+    def weakness(self, user_id: Optional[str]) -> np.ndarray:
+        """Weakness per criterion of the vocabulary; the neutral prior for unknown users"""
+        if not user_id:
+            return np.full(len(self.vectors.vocabulary), PRIOR_WEAKNESS, dtype=np.float32)
+        return self._user(user_id).weakness()
+
+    def recommend(
+        self,
+        user_id: Optional[str] = None,
+        language: Optional[str] = None,
+        limit: int = 3,
+        exclude: Iterable[str] = ()
+    ) -> List[Recommendation]:
+        """Best scenarios for the user, best first"""
+        vectors = self.vectors
+        if not vectors.names:
+            return []
+        weakness = self.weakness(user_id)
+        scores = vectors.matrix @ weakness
+
+        if user_id:
+            for name in self._user(user_id).mastered:
+                index = vectors.position.get(name)
+                if index is not None:
+                    scores[index] *= GameConfig.RECOMMENDER_MASTERED_PENALTY
+        if language:
+            bias = vectors.language_bias.get(language)
+            if bias is None:
+                return []
+            scores += bias
+        for name in exclude:
+            index = vectors.position.get(name)
+            if index is not None:
+                scores[index] = -np.inf
+
+        limit = min(limit, len(scores))
+        top = np.argpartition(scores, -limit)[-limit:] if limit < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results = []
+        for index in top:
+            if not np.isfinite(scores[index]):
+                break
+            contribution = vectors.matrix[index] * weakness
+            focus = [vectors.vocabulary[c] for c in np.argsort(-contribution)[:3] if contribution[c] > 0]
+            results.append(Recommendation(scenario=vectors.names[index], score=round(float(scores[index]), 4),
+                                          focus=focus))
+        return results
+
+    def observe(self, user_id: str, state: GameState) -> None:
+        """Fold the latest evaluated turn into the user's criterion totals"""
+        row = transcript_row("", state)
+        if not row or not row.get("criteria_scores"):
+            return
+        max_scores = self.vectors.max_scores.get(state.scenario_name, SINGLE_ROUND_CRITERIA)
+        ratios = {
+            criterion: min(max(score / max_scores.get(criterion, 3), 0.0), 1.0)
+            for criterion, score in row["criteria_scores"].items()
+        }
+
+        db = self.session_factory()
+        try:
+            values = [{"user_id": user_id, "criterion": c, "count": 1, "ratio_sum": r} for c, r in ratios.items()]
+            table = UserCriterionStat.__table__
+            insert = _UPSERTS.get(db.get_bind().dialect.name)
+            if insert is not None:
+                statement = insert(table).values(values)
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=["user_id", "criterion"],
+                    set_={"count": table.c.count + statement.excluded.count,
+                          "ratio_sum": table.c.ratio_sum + statement.excluded.ratio_sum},
+                ))
+            else:
+                for value in values:
+                    stat = db.get(UserCriterionStat, (user_id, value["criterion"]), with_for_update=True)
+                    if stat is None:
+                        db.add(UserCriterionStat(**value))
+                    else:
+                        stat.count += 1
+                        stat.ratio_sum += value["ratio_sum"]
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Failed to record criterion stats for {user_id}: {e}")
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            skills = self._users.get(user_id)
+            if skills is not None:
+                for criterion, ratio in ratios.items():
+                    column = self.vectors.column.get(criterion)
+                    if column is not None:
+                        skills.counts[column] += 1
+                        skills.ratio_sums[column] += ratio
+                if state.game_completed and state.scenario_completion and state.scenario_completion.mastery_achieved:
+                    skills.mastered.add(state.scenario_name)
+
+    def forget(self, user_id: str) -> None:
+        """Drop a user's cached totals so the next recommendation reloads them"""
+        with self._lock:
+            self._users.pop(user_id, None)
@@ -0,0 +1,114 @@
+"""Precomputed teen replies per scenario, round, language and score bucket
+
+Bank files live next to the scenario data, one per scenario
+(data/replies/<scenario>.yaml), and are filled offline by
+python -m app.roleplay.tools.generate_replies:
+
+    scenario: messy_room
+    rounds:
+      1:
+        en:
+          "8-10":
+            - {response: "Okay, fair. I'll do it now.", emotion: cooperative}
+"""
+
+import logging
+import os
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+import yaml
+from ..config import GameConfig
+from ..models.evaluation import TeenResponse
+
+logger = logging.getLogger(__name__)
+
+# Score ranges the teen prompt distinguishes, highest first
+SCORE_BUCKETS: Tuple[Tuple[str, int], ...] = (("8-10", 8), ("6-7", 6), ("4-5", 4), ("0-3", 0))
+
+Cell = Dict[str, List[TeenResponse]]  # bucket -> candidates
+
+
+def score_bucket(score: int) -> str:
+    """Bucket label for a parent communication score"""
+    for label, lower in SCORE_BUCKETS:
+        if score >= lower:
+            return label
+    return SCORE_BUCKETS[-1][0]
+
+
+class ReplyBank:
+    """Reads bank files on first use and draws seeded, non-repeating replies"""
+
+    def __init__(self, bank_dir: Optional[str] = None):
+        self.bank_dir = bank_dir or GameConfig.REPLY_BANK_DIR
+        self._lock = threading.Lock()
+        # scenario -> (round, language) -> bucket -> candidates
+        self._banks: Dict[str, Dict[Tuple[int, str], Cell]] = {}
+
+    def path_for(self, scenario: str) -> str:
+        return os.path.join(self.bank_dir, f"{scenario}.yaml")
+
+    def load(self, scenario: str) -> Dict[Tuple[int, str], Cell]:
+        """Bank for one scenario, empty when it has no bank file"""
+        with self._lock:
+            if scenario in self._banks:
+                return self._banks[scenario]
+
+        bank: Dict[Tuple[int, str], Cell] = {}
+        path = self.path_for(scenario)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = yaml.safe_load(f) or {}
+                for round_number, languages in (data.get("rounds") or {}).items():
+                    for language, buckets in (languages or {}).items():
+                        bank[(int(round_number), language)] = {
+                            bucket: [TeenResponse.from_dict(reply) for reply in replies or []]
+                            for bucket, replies in (buckets or {}).items()
+                        }
+            except Exception as e:
+                logger.error(f"Error loading reply bank {path}: {e}")
+                bank = {}
+
+        with self._lock:
+            self._banks[scenario] = bank
+        return bank
+
+    def candidates(self, scenario: str, round_number: int, language: str, score: int) -> List[TeenResponse]:
+        return self.load(scenario).get((round_number, language), {}).get(score_bucket(score), [])
+
+    def draw(
+        self,
+        scenario: str,
+        round_number: int,
+        language: str,
+        score: int,
+        used: List[str],
+        seed: int = 0
+    ) -> Optional[TeenResponse]:
+        """Pick a reply this session has not seen yet and record it in used
+
+        The choice is seeded by the session seed and the cell, so replays of
+        a session draw the same replies. Returns None when the cell is empty
+        or exhausted, leaving the reply to the model.
+        """
+        bucket = score_bucket(score)
+        cell_id = f"{scenario}/{round_number}/{language}/{bucket}"
+        replies = self.candidates(scenario, round_number, language, score)
+        seen = set(used)
+        fresh = [index for index in range(len(replies)) if f"{cell_id}/{index}" not in seen]
+        if not fresh:
+            return None
+
+        index = random.Random(f"{seed}:{cell_id}:{len(seen)}").choice(fresh)
+        used.append(f"{cell_id}/{index}")
+        return replies[index]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._banks.clear()
+
+
+# Process-wide bank shared by all teen responders
+reply_bank = ReplyBank()
@@ -0,0 +1,73 @@
+"""Request body size limits for the roleplay endpoints
+
+Bodies are counted as they are received, so an oversized upload is cut off
+after the limit rather than read into memory and parsed first. Requests
+declaring a larger Content-Length are refused without reading anything.
+"""
+
+import json
+from typing import Dict, Optional
+from fastapi import HTTPException
+
+
+class BodyTooLarge(HTTPException):
+    """The request body grew past its limit while being read; FastAPI answers it as a 413"""
+
+    def __init__(self, limit: int):
+        super().__init__(status_code=413, detail=f"Request body exceeds {limit} bytes")
+
+
+class RequestSizeLimitMiddleware:
+    """ASGI middleware answering 413 for bodies over the limit of their path"""
+
+    def __init__(self, app, prefix: str, max_bytes: int, overrides: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.overrides = overrides or {}  # Exact path -> limit, for endpoints taking larger bodies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.overrides.get(scope["path"], self.max_bytes)
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                await self._reject(send, limit)
+                return
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise BodyTooLarge(limit)
+            return message
+
+        async def tracked_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except BodyTooLarge:
+            if started:
+                raise
+            await self._reject(send, limit)
+
+    @staticmethod
+    async def _reject(send, limit: int) -> None:
+        body = json.dumps({"detail": f"Request body exceeds {limit} bytes"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
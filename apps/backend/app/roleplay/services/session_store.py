@@ -0,0 +1,315 @@
+"""Compact in-memory game sessions with per-turn deltas
+
+A live GameState is a tree of pydantic models: every RoundResult repeats the
+parent and teen text already in the conversation, and every evaluation carries
+its own criterion-name dicts. Active sessions are instead kept as a
+CompactGameState made of tuples:
+
+  - scenario text, criterion names, emotions and bank replies are interned, so
+    sessions of the same scenario share one copy
+  - criterion scores and feedback are tuples aligned with a shared key tuple
+  - transcript text lives once, in the conversation; round results and the
+    current turn point at it
+
+diff() gives the changes between two compact states as JSON-ready data.
+Append-only parts (conversation, round history, used replies) contribute only
+their new tail, so the delta of a turn holds just what that turn changed; the
+database session store journals these per turn and replays them on load.
+"""
+
+import sys
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+from ..models.evaluation import (
+    EvaluationResult, MultiRoundEvaluationResult, ProvisionalScore, RoundResult, ScenarioCompletion
+)
+from ..models.game_state import ConversationTurn, GameState
+
+# Scalar GameState fields by position. Saved sessions hold these tuples, so add new fields at the
+# end (older rows then unpack them as defaults); a test checks every model field is covered
+_TEXTS = ("scenario_name", "scenario_title", "scenario_background", "teen_opening", "language", "user_id")
+_NUMBERS = ("attempts", "max_attempts", "current_round", "max_rounds", "round_attempts", "max_round_attempts",
+            "reply_seed", "final_score", "game_completed", "is_multi_round")
+# Fields packed into their own slots
+_STRUCTURED = ("conversation", "round_history", "used_replies", "parent_response", "teen_response",
+               "provisional_evaluation", "evaluation", "multi_round_evaluation", "scenario_completion")
+_APPEND_ONLY = ("turns", "rounds", "used")
+
+# Criterion key tuples shared by every session; bounded in case a model invents keys
+_MAX_SHARED_KEYS = 4096
+_shared_keys: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern(text: Optional[str]) -> Optional[str]:
+    return sys.intern(text) if text else text
+
+
+def _keys(keys: Iterable[str]) -> Tuple[str, ...]:
+    keys = tuple(sys.intern(key) for key in keys)
+    shared = _shared_keys.get(keys)
+    if shared is not None:
+        return shared
+    if len(_shared_keys) < _MAX_SHARED_KEYS:
+        _shared_keys[keys] = keys
+    return keys
+
+
+def _freeze(value: Any) -> Any:
+    """JSON lists back to tuples (dicts are left alone)"""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class CompactGameState:
+    """Tuple-based GameState; see the module docstring for the layout"""
+
+    __slots__ = ("texts", "numbers", "turns", "rounds", "used", "current")
+
+    def __init__(self, texts: tuple, numbers: tuple, turns: tuple, rounds: tuple, used: tuple, current: tuple):
+        self.texts = texts
+        self.numbers = numbers
+        self.turns = turns  # (round, parent, teen, emotion)
+        self.rounds = rounds  # (round_number, turn index or (parent, child), evaluation, attempts_used, completed_at)
+        self.used = used
+        self.current = current  # (parent, teen, provisional, evaluation, multi_round_evaluation, completion)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CompactGameState) and all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
+
+
+# --- Packing -----------------------------------------------------------------
+
+def _pack_multi(evaluation: Optional[MultiRoundEvaluationResult]) -> Optional[tuple]:
+    if evaluation is None:
+        return None
+    keys = _keys(evaluation.criteria_scores)
+    detail_keys = _keys(evaluation.detailed_feedback)
+    return (
+        evaluation.round_number, keys, tuple(evaluation.criteria_scores[key] for key in keys),
+        evaluation.total_score, evaluation.max_possible_score, evaluation.feedback,
+        detail_keys, tuple(evaluation.detailed_feedback[key] for key in detail_keys), evaluation.passed,
+    )
+
+
+def _unpack_multi(packed: Optional[tuple]) -> Optional[MultiRoundEvaluationResult]:
+    if packed is None:
+        return None
+    round_number, keys, scores, total, max_score, feedback, detail_keys, details, passed = packed
+    return MultiRoundEvaluationResult(
+        criteria_scores=dict(zip(keys, scores)), total_score=total, max_possible_score=max_score,
+        feedback=feedback, detailed_feedback=dict(zip(detail_keys, details)), passed=passed,
+        round_number=round_number,
+    )
+
+
+def _transcript_index(turns: tuple, round_number: int, parent: str, child: str):
+    """Index of the turn holding this text, or the text itself when no turn does"""
+    for index in range(len(turns) - 1, -1, -1):
+        turn = turns[index]
+        if turn[0] == round_number and turn[1] == parent and turn[2] == child:
+            return index
+    return (parent, child)
+
+
+def _last_turn_ref(text: Optional[str], turns: tuple, field: int):
+    # True stands for "the same text as the latest conversation turn"
+    if text and turns and turns[-1][field] == text:
+        return True
+    return text
+
+
+def pack(state: GameState) -> CompactGameState:
+    """Compact form of a game state"""
+    turns = tuple((turn.round, turn.parent, turn.teen, _intern(turn.emotion)) for turn in state.conversation)
+
+    rounds = []
+    for result in state.round_history:
+        rounds.append((
+            result.round_number,
+            _transcript_index(turns, result.round_number, result.parent_response, result.child_response),
+            _pack_multi(result.evaluation),
+            result.attempts_used,
+            result.completed_at,
+        ))
+    rounds = tuple(rounds)
+
+    multi = state.multi_round_evaluation
+    if multi is not None and state.round_history and state.round_history[-1].evaluation == multi:
+        multi = True  # Same as the last round result's evaluation
+    else:
+        multi = _pack_multi(multi)
+
+    provisional = state.provisional_evaluation
+    if provisional is not None:
+        signal_keys = _keys(provisional.signals)
+        provisional = (
+            provisional.tone_score, provisional.approach_score, provisional.respect_score, provisional.total_score,
+            provisional.confidence, sys.intern(provisional.verdict),
+            signal_keys, tuple(provisional.signals[key] for key in signal_keys),
+        )
+
+    evaluation = state.evaluation
+    if evaluation is not None:
+        evaluation = (evaluation.tone_score, evaluation.approach_score, evaluation.respect_score,
+                      evaluation.total_score, evaluation.feedback, evaluation.passed)
+
+    completion = state.scenario_completion.model_dump() if state.scenario_completion else None
+
+    return CompactGameState(
+        texts=tuple(_intern(getattr(state, field)) for field in _TEXTS),
+        numbers=tuple(getattr(state, field) for field in _NUMBERS),
+        turns=turns,
+        rounds=rounds,
+        used=tuple(sys.intern(reply) for reply in state.used_replies),
+        current=(
+            _last_turn_ref(state.parent_response, turns, 1), _last_turn_ref(state.teen_response, turns, 2),
+            provisional, evaluation, multi, completion,
+        ),
+    )
+
+
+def unpack(compact: CompactGameState) -> GameState:
+    """Full GameState rebuilt from its compact form"""
+    turns = compact.turns
+    conversation = [ConversationTurn(round=r, parent=p, teen=t, emotion=e) for r, p, t, e in turns]
+
+    round_history = []
+    for round_number, transcript, evaluation, attempts_used, completed_at in compact.rounds:
+        parent, child = turns[transcript][1:3] if isinstance(transcript, int) else transcript
+        round_history.append(RoundResult(
+            round_number=round_number, parent_response=parent, child_response=child,
+            evaluation=_unpack_multi(evaluation), attempts_used=attempts_used, completed_at=completed_at,
+        ))
+
+    parent, teen, provisional, evaluation, multi, completion = compact.current
+    if provisional is not None:
+        tone, approach, respect, total, confidence, verdict, signal_keys, signal_values = provisional
+        provisional = ProvisionalScore(
+            tone_score=tone, approach_score=approach, respect_score=respect, total_score=total,
+            confidence=confidence, verdict=verdict, signals=dict(zip(signal_keys, signal_values)),
+        )
+    if evaluation is not None:
+        tone, approach, respect, total, feedback, passed = evaluation
+        evaluation = EvaluationResult(tone_score=tone, approach_score=approach, respect_score=respect,
+                                      total_score=total, feedback=feedback, passed=passed)
+
+    return GameState(
+        **dict(zip(_TEXTS, compact.texts)),
+        **dict(zip(_NUMBERS, compact.numbers)),
+        conversation=conversation,
+        round_history=round_history,
+        used_replies=list(compact.used),
+        parent_response=turns[-1][1] if parent is True else parent,
+        teen_response=turns[-1][2] if teen is True else teen,
+        provisional_evaluation=provisional,
+        evaluation=evaluation,
+        multi_round_evaluation=round_history[-1].evaluation if multi is True else _unpack_multi(multi),
+        scenario_completion=ScenarioCompletion.model_validate(completion) if completion else None,
+    )
+
+
+# --- Deltas ------------------------------------------------------------------
+
+def diff(old: Optional[CompactGameState], new: CompactGameState) -> dict:
+    """JSON-ready changes from old to new; append-only parts send only their new tail"""
+    delta = {}
+    for slot in CompactGameState.__slots__:
+        after = getattr(new, slot)
+        before = getattr(old, slot) if old is not None else None
+        if before is not None and before == after:
+            continue
+        if slot in _APPEND_ONLY and before is not None and after[:len(before)] == before:
+            delta[slot + "+"] = after[len(before):]
+        else:
+            delta[slot] = after
+    return delta
+
+
+def _thaw(slot: str, value: Any) -> Any:
+    """A delta value from JSON back in compact form, with strings interned again"""
+    value = _freeze(value)
+    if slot in ("texts", "used"):
+        return tuple(_intern(text) for text in value)
+    if slot == "turns":
+        return tuple((r, p, t, _intern(e)) for r, p, t, e in value)
+    if slot == "rounds":
+        return tuple((n, transcript, _thaw_multi(evaluation), attempts, at)
+                     for n, transcript, evaluation, attempts, at in value)
+    if slot == "current":
+        parent, teen, provisional, evaluation, multi, completion = value
+        if provisional is not None:
+            provisional = provisional[:5] + (_intern(provisional[5]), _keys(provisional[6]), provisional[7])
+        if multi is not True:
+            multi = _thaw_multi(multi)
+        return (parent, teen, provisional, evaluation, multi, completion)
+    return value
+
+
+def _thaw_multi(packed: Optional[tuple]) -> Optional[tuple]:
+    if packed is None:
+        return None
+    return packed[:1] + (_keys(packed[1]),) + packed[2:6] + (_keys(packed[6]),) + packed[7:]
+
+
+def apply_delta(old: Optional[CompactGameState], delta: dict) -> CompactGameState:
+    """State after applying a delta (old is None for a session's first delta)"""
+    values = {slot: getattr(old, slot) if old is not None else () for slot in CompactGameState.__slots__}
+    for key, value in delta.items():
+        if key.endswith("+"):
+            slot = key[:-1]
+            values[slot] = values[slot] + _thaw(slot, value)
+        else:
+            values[key] = _thaw(key, value)
+    return CompactGameState(**values)
+
+
+def replay(deltas: Iterable[dict]) -> CompactGameState:
+    """Rebuild a session from its journal of deltas"""
+    state = None
+    for delta in deltas:
+        state = apply_delta(state, delta)
+    return state
+
+
+class SessionStore:
+    """Active game sessions in compact form
+
+    States handed out by get() are fresh copies; changes take effect on the
+    next save().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, CompactGameState] = {}
+        self.saves = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[GameState]:
+        compact = self._sessions.get(session_id)
+        return unpack(compact) if compact is not None else None
+
+    def save(self, session_id: str, state: GameState) -> None:
+        compact = pack(state)
+        with self._lock:
+            self._sessions[session_id] = compact
+            self.saves += 1
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"active": len(self._sessions), "saves": self.saves}
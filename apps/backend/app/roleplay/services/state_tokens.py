@@ -0,0 +1,90 @@
+"""Signed, compressed game-state tokens for stateless sessions
+
+With ROLEPLAY_STATELESS on, the whole GameState travels with the client: each
+response carries a token and the next request sends it back, so any Lambda
+container can serve any turn without a shared session store.
+
+Token layout: v1.<base64url(zlib(json payload))>.<base64url(hmac-sha256)>
+The payload binds the state to its session id and issue time. Tokens older
+than ROLEPLAY_STATE_TTL seconds are rejected. Like any client-held state, a
+client can resend an earlier token within that window.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+import zlib
+from typing import Optional
+from ..config import GameConfig
+from ..models.game_state import GameState
+
+TOKEN_VERSION = "v1"
+
+
+class InvalidStateToken(ValueError):
+    """The token is malformed, tampered with, expired or for another session"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _secret(secret: Optional[str]) -> bytes:
+    secret = secret or GameConfig.STATE_TOKEN_SECRET
+    if not secret:
+        raise RuntimeError("ROLEPLAY_STATE_SECRET must be set to use stateless game sessions")
+    return secret.encode("utf-8")
+
+
+def check_configuration() -> None:
+    """Called at startup: fail fast when stateless sessions are on but have no secret,
+    rather than with a 500 on the first game"""
+    if GameConfig.STATELESS_SESSIONS:
+        _secret(None)
+
+
+def _sign(body: str, secret: bytes) -> str:
+    return _b64encode(hmac.new(secret, f"{TOKEN_VERSION}.{body}".encode("ascii"), hashlib.sha256).digest())
+
+
+def encode_state(state: GameState, session_id: str, secret: Optional[str] = None) -> str:
+    """Serialize, compress and sign a game state"""
+    payload = {
+        "sid": session_id,
+        "iat": int(time.time()),
+        "state": state.model_dump(mode="json", exclude_defaults=True),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    body = _b64encode(zlib.compress(raw, 9))
+    return f"{TOKEN_VERSION}.{body}.{_sign(body, _secret(secret))}"
+
+
+def decode_state(token: str, session_id: str, secret: Optional[str] = None, ttl: Optional[int] = None) -> GameState:
+    """Verify a token and restore the game state it carries"""
+    try:
+        version, body, signature = token.split(".")
+    except ValueError:
+        raise InvalidStateToken("Malformed game state token")
+    if version != TOKEN_VERSION:
+        raise InvalidStateToken(f"Unsupported game state token version: {version}")
+    if not hmac.compare_digest(signature, _sign(body, _secret(secret))):
+        raise InvalidStateToken("Game state token signature mismatch")
+
+    try:
+        payload = json.loads(zlib.decompress(_b64decode(body)))
+    except (ValueError, zlib.error):
+        raise InvalidStateToken("Corrupt game state token")
+
+    if payload.get("sid") != session_id:
+        raise InvalidStateToken("Game state token belongs to another session")
+    ttl = GameConfig.STATE_TOKEN_TTL if ttl is None else ttl
+    if ttl and time.time() - payload.get("iat", 0) > ttl:
+        raise InvalidStateToken("Game state token expired")
+
+    return GameState.model_validate(payload["state"])
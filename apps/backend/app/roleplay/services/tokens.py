@@ -0,0 +1,36 @@
+"""Fast local token estimates for budgeting prompts"""
+
+
+def _is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (0x3400 <= code <= 0x9FFF or 0xF900 <= code <= 0xFAFF
+            or 0x3000 <= code <= 0x303F or 0xFF00 <= code <= 0xFFEF)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without loading a tokenizer
+
+    CJK characters are roughly one token each; other text averages about four
+    characters per token. Good enough for budgets and limits; use tiktoken
+    where exact counts matter.
+    """
+    if not text:
+        return 0
+    cjk = sum(1 for char in text if _is_cjk(char))
+    other = len(text) - cjk
+    return cjk + (other + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text whose estimate_tokens() fits within max_tokens"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cjk = other = 0
+    for index, char in enumerate(text):
+        if _is_cjk(char):
+            cjk += 1
+        else:
+            other += 1
+        if cjk + (other + 3) // 4 > max_tokens:
+            return text[:index]
+    return text
@@ -0,0 +1,126 @@
+"""Append-only roleplay transcripts and their streaming export
+
+Every parent turn is written as one roleplay_transcripts row once the game
+state has been updated, so transcripts outlive /game/end and container
+recycling. Exports read through a server-side cursor in fixed-size batches,
+so memory stays flat however many rows match.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.models.roleplay_transcript import RoleplayTranscript
+from ..config import GameConfig
+from ..models.game_state import GameState
+from .analytics import add_round
+
+logger = logging.getLogger(__name__)
+
+
+def transcript_row(session_id: str, state: GameState) -> Optional[dict]:
+    """Column values for the turn just played, or None before the first turn"""
+    if not state.conversation:
+        return None
+    turn = state.conversation[-1]
+    provisional = state.provisional_evaluation.total_score if state.provisional_evaluation else None
+    row = {
+        "session_id": session_id,
+        "scenario": state.scenario_name,
+        "language": state.language,
+        "round_number": turn.round,
+        "parent_response": turn.parent,
+        "teen_response": turn.teen,
+        "emotion": turn.emotion or None,
+        "provisional_score": provisional,
+        "game_completed": state.game_completed,
+    }
+
+    if state.is_multi_round:
+        # A finished round has moved its evaluation into round_history (and the game may have advanced)
+        last = state.round_history[-1] if state.round_history else None
+        if last and last.round_number == turn.round and last.parent_response == turn.parent:
+            evaluation, attempt, completed = last.evaluation, last.attempts_used, True
+        else:
+            evaluation, attempt, completed = state.multi_round_evaluation, state.round_attempts, False
+        if evaluation:
+            row.update(total_score=evaluation.total_score, max_score=evaluation.max_possible_score,
+                       passed=evaluation.passed, criteria_scores=evaluation.criteria_scores)
+    else:
+        evaluation, attempt = state.evaluation, state.attempts
+        completed = state.game_completed
+        if evaluation:
+            row.update(total_score=evaluation.total_score, max_score=10, passed=evaluation.passed,
+                       criteria_scores={"tone": evaluation.tone_score, "approach": evaluation.approach_score,
+                                        "respect": evaluation.respect_score})
+
+    row.update(attempt=attempt, round_completed=completed)
+    return row
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Timezone-aware UTC, for timestamptz comparisons; naive values are taken to be UTC already
+    if value is None:
+        return value
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class TranscriptStore:
+    """Writes turns (and finished rounds' rollups) and streams them back out"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, batch_size: Optional[int] = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or GameConfig.TRANSCRIPT_EXPORT_BATCH
+
+    def record(self, session_id: str, state: GameState) -> bool:
+        """Append the latest turn; failures are logged so gameplay never breaks"""
+        if not GameConfig.TRANSCRIPTS_ENABLED:
+            return False
+        row = transcript_row(session_id, state)
+        if row is None:
+            return False
+        db = self.session_factory()
+        try:
+            db.add(RoleplayTranscript(**row))
+            if row["round_completed"]:
+                # Same transaction, so the rollups never count a turn the transcript lacks
+                add_round(db, row)
+            db.commit()
+            return True
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Failed to record transcript for {session_id}: {e}")
+            return False
+        finally:
+            db.close()
+
+    def export(
+        self,
+        scenario: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Iterator[dict]:
+        """Matching turns oldest first, fetched batch by batch from a server-side cursor"""
+        query = select(RoleplayTranscript.__table__).order_by(RoleplayTranscript.id)
+        if scenario:
+            query = query.where(RoleplayTranscript.scenario == scenario)
+        if since:
+            query = query.where(RoleplayTranscript.created_at >= _utc(since))
+        if until:
+            query = query.where(RoleplayTranscript.created_at < _utc(until))
+
+        db = self.session_factory()
+        try:
+            result = db.execute(query.execution_options(stream_results=True, yield_per=self.batch_size))
+            for row in result.mappings():
+                line = dict(row)
+                created_at = _utc(line["created_at"])  # SQLite hands back naive UTC
+                line["created_at"] = created_at.isoformat() if created_at else None
+                yield line
+        finally:
+            db.close()
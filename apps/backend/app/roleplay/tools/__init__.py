@@ -0,0 +1 @@
+"""Offline roleplay tools (reports, benchmarks, content builds)"""
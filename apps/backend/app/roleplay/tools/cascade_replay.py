@@ -0,0 +1,131 @@
+"""Replay recorded parent responses through the evaluation cascade
+
+Usage:
+    python -m app.roleplay.tools.cascade_replay responses.jsonl
+    FAST_EVALUATION_MODEL=openai:gpt-4o-mini EVALUATION_MODEL=openai:gpt-4o \\
+        python -m app.roleplay.tools.cascade_replay responses.jsonl --scenario messy_room --language en
+
+Input lines carry the parent response and, optionally, a cached strong-model
+evaluation (same shapes as prescore_agreement). Rows without one are scored
+by EVALUATION_MODEL first. The report compares cascade verdicts and estimated
+cost with always using the strong model.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import List, Optional
+from ..agents.evaluator import EvaluationAgent
+from ..models.evaluation import EvaluationResult
+from ..scenarios.loader import ScenarioLoader
+from ..services.cascade import CascadeStats, EvaluationCascade, estimate_call_cost
+from ..services.prescorer import RuleBasedPreScorer
+from ..agents.prompts import build_evaluation_prompt
+from ..config import GameConfig
+
+
+class _RecordedStrong:
+    """Strong tier that answers from the recorded evaluation instead of calling the model"""
+
+    def __init__(self, model_name: str, evaluation: EvaluationResult):
+        self.model_name = model_name
+        self._evaluation = evaluation
+
+    async def evaluate(self, *args, **kwargs) -> EvaluationResult:
+        return self._evaluation
+
+
+def load_rows(lines) -> List[dict]:
+    """Parse {"parent_response", optional "total_score"/"passed" or "evaluation"} rows"""
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        data = json.loads(line)
+        evaluation = data.get("evaluation", data)
+        row = {"parent_response": data["parent_response"]}
+        if "total_score" in evaluation:
+            row["total_score"] = evaluation["total_score"]
+            row["passed"] = evaluation.get("passed", evaluation["total_score"] >= GameConfig.PASS_THRESHOLD)
+        rows.append(row)
+    return rows
+
+
+def _recorded_evaluation(row: dict) -> EvaluationResult:
+    # Only the total and verdict matter for the comparison
+    return EvaluationResult(tone_score=0, approach_score=0, respect_score=0, total_score=row["total_score"],
+                            feedback="", passed=row["passed"])
+
+
+async def replay(
+    rows: List[dict],
+    teen_opening: str,
+    language: str = "en",
+    scenario: str = "",
+    strong: Optional[EvaluationAgent] = None,
+    fast: Optional[EvaluationAgent] = None
+) -> dict:
+    """Cascade vs always-strong accuracy and estimated cost"""
+    strong = strong or EvaluationAgent()
+    prescorer = RuleBasedPreScorer()
+    stats = CascadeStats()
+    agree = 0
+    abs_errors = []
+    strong_cost = cascade_cost = 0.0
+
+    for row in rows:
+        parent_response = row["parent_response"]
+        if "total_score" not in row:
+            scored = await strong.evaluate(parent_response, teen_opening, language, scenario)
+            row = {**row, "total_score": scored.total_score, "passed": scored.passed}
+        reference = _recorded_evaluation(row)
+
+        cascade = EvaluationCascade(_RecordedStrong(strong.model_name, reference), prescorer, fast, stats)
+        evaluation, decision = await cascade.evaluate(
+            parent_response, teen_opening, prescorer.score(parent_response), language, scenario
+        )
+
+        agree += evaluation.passed == reference.passed
+        abs_errors.append(abs(evaluation.total_score - reference.total_score))
+        always_strong = estimate_call_cost(strong.model_name, build_evaluation_prompt(parent_response, teen_opening, language).text)
+        strong_cost += always_strong
+        cascade_cost += always_strong - decision.estimated_saving_usd
+
+    count = len(rows)
+    if count == 0:
+        return {"count": 0}
+    return {
+        "count": count,
+        "routing": stats.snapshot(),
+        "pass_fail_agreement_with_strong": round(agree / count, 3),
+        "mean_absolute_error": round(sum(abs_errors) / count, 2),
+        "estimated_cost_always_strong_usd": round(strong_cost, 6),
+        "estimated_cost_cascade_usd": round(cascade_cost, 6),
+        "estimated_saving_ratio": round(1 - cascade_cost / strong_cost, 3) if strong_cost else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay responses through the evaluation cascade")
+    parser.add_argument("path", help="JSONL file of parent responses ('-' for stdin)")
+    parser.add_argument("--scenario", default="messy_room")
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args(argv)
+
+    if args.path == "-":
+        rows = load_rows(sys.stdin)
+    else:
+        with open(args.path, encoding="utf-8") as f:
+            rows = load_rows(f)
+
+    scenario = ScenarioLoader().load_scenario(args.scenario)
+    teen_opening = scenario.get_teen_opening(args.language) if scenario else ""
+    cascade = EvaluationCascade(EvaluationAgent())
+    report = asyncio.run(replay(rows, teen_opening, args.language, args.scenario, cascade.strong, cascade.fast))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Validate every scenario and compile them into one scenario pack
+
+Usage:
+    python -m app.roleplay.tools.compile_scenarios                      # validate and write the pack
+    python -m app.roleplay.tools.compile_scenarios --check              # validate only
+    python -m app.roleplay.tools.compile_scenarios --output build/scenarios.pack
+
+Point SCENARIO_PACK at the output to have the server load the pack instead of
+the YAML files. Exits non-zero when any scenario is invalid, so it can gate a
+build.
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+from ..config import GameConfig
+from ..scenarios.loader import Scenario, parse_scenario_file
+from ..scenarios.pack import content_version, write_pack
+
+DEFAULT_PACK_PATH = "app/roleplay/scenarios/scenarios.pack"
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+def validate_scenario(scenario: Scenario) -> List[str]:
+    """Problems that would break a game or leave a language without text"""
+    problems = []
+    if not scenario.case_name_zh:
+        problems.append("missing case_name_zh")
+    if not scenario.background_and_instructions_zh:
+        problems.append("missing background_and_instructions_zh")
+    if scenario.difficulty not in DIFFICULTIES:
+        problems.append(f"difficulty '{scenario.difficulty}' is not one of {', '.join(DIFFICULTIES)}")
+    if scenario.age_min > scenario.age_max:
+        problems.append(f"age_min {scenario.age_min} is above age_max {scenario.age_max}")
+
+    if not scenario.multi_round:
+        if len(scenario.child_prompts) < 2:
+            problems.append("child_prompts needs an English and a Cantonese opening")
+    elif not scenario.rounds:
+        problems.append("multi_round is set but no rounds are defined")
+
+    # Rounds are checked whenever they are defined: tools and forced multi-round play use them too
+    for expected, round_data in enumerate(scenario.rounds or [], start=1):
+        label = f"round {round_data.round}"
+        if round_data.round != expected:
+            problems.append(f"{label} is out of sequence, expected round {expected}")
+        if not round_data.child_prompt_zh:
+            problems.append(f"{label}: missing child_prompt_zh")
+        if not round_data.evaluation_criteria:
+            problems.append(f"{label}: no evaluation_criteria")
+
+        max_possible = 0
+        for criterion in round_data.evaluation_criteria:
+            definition = scenario.criteria.get(criterion)
+            if definition is None:
+                problems.append(f"{label}: criterion '{criterion}' is not declared under criteria")
+                continue
+            max_possible += definition.max_score
+        if max_possible and round_data.pass_threshold > max_possible:
+            problems.append(f"{label}: pass_threshold {round_data.pass_threshold} exceeds max score {max_possible}")
+
+    # Criteria are checked for every scenario, single-round ones included
+    used = {criterion for round_data in scenario.rounds or [] for criterion in round_data.evaluation_criteria}
+    for name, definition in scenario.criteria.items():
+        if scenario.rounds and name not in used:
+            problems.append(f"criterion '{name}' is declared but no round uses it")
+        if "max_score" not in definition.model_fields_set:
+            problems.append(f"criterion '{name}': missing max_score")
+        elif definition.max_score <= 0:
+            problems.append(f"criterion '{name}': max_score {definition.max_score} must be positive")
+        if not definition.description_zh:
+            problems.append(f"criterion '{name}': missing description_zh")
+    return problems
+
+
+def compile_directory(scenarios_dir: str) -> Tuple[Dict[str, Scenario], Dict[str, List[str]], str]:
+    """Parse and validate every scenario file: (scenarios, problems by name, content version)"""
+    scenarios, problems, sources = {}, {}, {}
+    for filename in sorted(os.listdir(scenarios_dir)):
+        if not filename.endswith((".yaml", ".yml")):
+            continue
+        name = os.path.splitext(filename)[0]
+        path = os.path.join(scenarios_dir, filename)
+        with open(path, "rb") as f:
+            sources[filename] = f.read()
+        try:
+            scenario = parse_scenario_file(path, name)
+        except Exception as e:
+            problems[name] = [f"invalid scenario: {e}"]
+            continue
+        scenario_problems = validate_scenario(scenario)
+        if scenario_problems:
+            problems[name] = scenario_problems
+        scenarios[name] = scenario
+    return scenarios, problems, content_version(sources)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate scenarios and compile a scenario pack")
+    parser.add_argument("--scenarios-dir", default=GameConfig.SCENARIOS_DIR)
+    parser.add_argument("--output", default=GameConfig.SCENARIO_PACK or DEFAULT_PACK_PATH)
+    parser.add_argument("--check", action="store_true", help="Validate only, do not write a pack")
+    args = parser.parse_args(argv)
+
+    scenarios, problems, version = compile_directory(args.scenarios_dir)
+    for name, messages in sorted(problems.items()):
+        for message in messages:
+            print(f"{name}: {message}", file=sys.stderr)
+    if problems:
+        total = len(set(scenarios) | set(problems))
+        print(f"{len(problems)} of {total} scenarios failed validation", file=sys.stderr)
+        return 1
+
+    if not args.check:
+        write_pack(args.output, scenarios, version)
+        print(f"Wrote {len(scenarios)} scenarios to {args.output} (version {version})")
+    else:
+        print(f"{len(scenarios)} scenarios valid (version {version})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
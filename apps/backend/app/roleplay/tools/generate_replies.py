@@ -0,0 +1,132 @@
+"""Fill the teen reply bank with model-generated candidates
+
+Usage:
+    python -m app.roleplay.tools.generate_replies                        # every scenario, 12 per cell
+    python -m app.roleplay.tools.generate_replies --scenario messy_room --per-cell 20
+
+A cell is one (scenario, round, language, score bucket). The configured
+TEEN_RESPONSE_MODEL is asked for replies at scores spread across the bucket
+until the cell holds --per-cell distinct candidates or --max-attempts calls
+were made. Existing bank entries are kept and new replies are merged in.
+"""
+
+import argparse
+import asyncio
+import os
+from typing import Dict, List, Optional
+import yaml
+from ..agents.teen_responder import TeenResponderAgent
+from ..models.evaluation import TeenResponse
+from ..scenarios.compiler import compile_round
+from ..scenarios.loader import Scenario, ScenarioLoader
+from ..services.reply_bank import SCORE_BUCKETS, ReplyBank
+
+LANGUAGES = ("en", "zh-HK")
+
+
+def _bucket_scores(label: str) -> List[int]:
+    low, high = (int(part) for part in label.split("-"))
+    return list(range(low, high + 1))
+
+
+def _round_contexts(scenario: Scenario, language: str) -> Dict[int, str]:
+    """Teen prompt context per round, as the game engine builds it"""
+    if not scenario.is_multi_round:
+        return {1: scenario.get_background(language)}
+    return {
+        round_data.round: compile_round(scenario, round_data.round, language).teen_context
+        for round_data in scenario.rounds
+    }
+
+
+async def generate_cell(
+    responder: TeenResponderAgent,
+    scenario: str,
+    round_number: int,
+    language: str,
+    bucket: str,
+    context: str,
+    existing: List[TeenResponse],
+    per_cell: int,
+    max_attempts: int
+) -> List[TeenResponse]:
+    """Existing replies plus new distinct ones, up to per_cell"""
+    replies = list(existing)
+    seen = {reply.response for reply in replies}
+    scores = _bucket_scores(bucket)
+    attempts = 0
+    while len(replies) < per_cell and attempts < max_attempts:
+        score = scores[attempts % len(scores)]
+        attempts += 1
+        try:
+            reply = await responder.generate(score, context, language, scenario, round_number)
+        except Exception as e:
+            print(f"{scenario}/{round_number}/{language}/{bucket}: {e}")
+            continue
+        if reply.response and reply.response not in seen:
+            seen.add(reply.response)
+            replies.append(reply)
+    return replies
+
+
+async def generate_bank(
+    scenario: Scenario,
+    bank: ReplyBank,
+    responder: TeenResponderAgent,
+    per_cell: int,
+    max_attempts: int
+) -> dict:
+    """Bank file contents for one scenario"""
+    existing = bank.load(scenario.name)
+    rounds: Dict[int, dict] = {}
+    for language in LANGUAGES:
+        for round_number, context in _round_contexts(scenario, language).items():
+            cell = existing.get((round_number, language), {})
+            buckets = rounds.setdefault(round_number, {}).setdefault(language, {})
+            for bucket, _ in SCORE_BUCKETS:
+                replies = await generate_cell(
+                    responder, scenario.name, round_number, language, bucket, context,
+                    cell.get(bucket, []), per_cell, max_attempts
+                )
+                buckets[bucket] = [reply.model_dump() for reply in replies]
+    return {"scenario": scenario.name, "rounds": rounds}
+
+
+def write_bank(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Teen reply bank; regenerate with python -m app.roleplay.tools.generate_replies\n")
+        yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False, width=1000)
+
+
+async def run(scenario_names: List[str], bank: ReplyBank, per_cell: int, max_attempts: int,
+              loader: Optional[ScenarioLoader] = None) -> None:
+    loader = loader or ScenarioLoader()
+    responder = TeenResponderAgent(bank)
+    for name in scenario_names:
+        scenario = loader.load_scenario(name)
+        if not scenario:
+            print(f"{name}: scenario not found")
+            continue
+        data = await generate_bank(scenario, bank, responder, per_cell, max_attempts)
+        write_bank(bank.path_for(name), data)
+        total = sum(len(replies) for languages in data["rounds"].values()
+                    for buckets in languages.values() for replies in buckets.values())
+        print(f"{name}: {total} replies in {bank.path_for(name)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the teen reply bank")
+    parser.add_argument("--scenario", action="append", help="Scenario to generate for (repeatable; default all)")
+    parser.add_argument("--per-cell", type=int, default=12, help="Distinct replies wanted per cell")
+    parser.add_argument("--max-attempts", type=int, default=40, help="Model calls allowed per cell")
+    parser.add_argument("--bank-dir", default=None, help="Bank directory (default REPLY_BANK_DIR)")
+    args = parser.parse_args(argv)
+
+    loader = ScenarioLoader()
+    names = args.scenario or loader.list_scenario_files()
+    asyncio.run(run(names, ReplyBank(args.bank_dir), args.per_cell, args.max_attempts, loader))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Teen prompt tokens per turn with and without the conversation memory cap
+
+Usage:
+    python -m app.roleplay.tools.history_benchmark
+    python -m app.roleplay.tools.history_benchmark --turns 20 --language zh-HK
+
+Plays a scripted session and counts the input tokens of every teen call under
+three policies: no history, the full history verbatim, and the bounded window
+(TEEN_HISTORY_* settings). Counts use the local token estimate.
+"""
+
+import argparse
+import json
+from typing import Callable, List
+from ..agents.prompts import TEEN_SYSTEM_PROMPT, build_teen_prompt
+from ..models.game_state import ConversationTurn
+from ..scenarios.loader import ScenarioLoader
+from ..services.conversation import build_history
+from ..services.tokens import estimate_tokens
+
+SCRIPT = {
+    "en": [
+        ("Why is your room such a mess again? I told you yesterday.", "I said I'd do it later!", "defensive"),
+        ("Okay, I'm sorry for snapping. I'm just tired after work.", "Fine... I'm tired too.", "reluctant"),
+        ("What's making it hard to keep the room tidy this week?", "I've had three tests and no time.", "reluctant"),
+        ("That sounds like a lot. Which test was the hardest?", "Maths. I think I failed it.", "upset"),
+        ("I'm sure you tried your best. We can look at it together.", "Really? You won't be mad?", "reluctant"),
+        ("No, I won't. How about ten minutes of tidying now, then rest?", "Ten minutes is okay I guess.", "cooperative"),
+        ("Thanks. Want me to take the books while you do the clothes?", "Yeah, that would help.", "cooperative"),
+        ("Great teamwork. Maybe a laundry basket by the door would help?", "Can it be the blue one?", "cooperative"),
+        ("Sure, we'll get the blue one this weekend.", "Cool. Thanks, Mum.", "cooperative"),
+        ("I'm proud of how you handled this tonight.", "Me too. Sorry about the mess.", "cooperative"),
+    ],
+    "zh-HK": [
+        ("點解你間房又咁亂？我尋日咪講咗囉。", "我咪話遲啲執囉！", "defensive"),
+        ("好啦，頭先我語氣差咗，我返工返到好攰。", "唉……我都好攰。", "reluctant"),
+        ("呢個星期有咩令你好難執好間房？", "我考咗三個測驗，完全冇時間。", "reluctant"),
+        ("聽落真係好辛苦。邊個測驗最難？", "數學，我覺得我肥咗。", "upset"),
+        ("我相信你已經盡咗力，我哋可以一齊睇下。", "真㗎？你唔會嬲？", "reluctant"),
+        ("唔會。不如而家執十分鐘，之後休息？", "十分鐘……都得嘅。", "cooperative"),
+        ("多謝你。我幫你執書，你執衫好唔好？", "好呀，噉會快啲。", "cooperative"),
+        ("合作得好好。喺門口放個洗衫籃會唔會方便啲？", "可唔可以要藍色嗰個？", "cooperative"),
+        ("得，我哋今個週末去買藍色嗰個。", "好呀，多謝媽咪。", "cooperative"),
+        ("今晚你處理得好好，我好欣賞你。", "我都係，對唔住整得咁亂。", "cooperative"),
+    ],
+}
+
+
+def _call_tokens(history, prompt: str, count: Callable[[str], int]) -> int:
+    """Input tokens of one teen call: system prompt, history messages and the new prompt"""
+    if not history:
+        return count(TEEN_SYSTEM_PROMPT) + count(prompt)
+    total = count(prompt)
+    for message in history:
+        for part in message.parts:
+            content = getattr(part, "content", "")
+            total += count(content) if isinstance(content, str) else 0
+    return total
+
+
+def benchmark(turns: int = 10, language: str = "en", count: Callable[[str], int] = estimate_tokens) -> List[dict]:
+    """Tokens per turn under each history policy"""
+    scenario = ScenarioLoader().load_scenario("messy_room")
+    context = scenario.get_background(language) if scenario else ""
+    script = SCRIPT[language]
+
+    rows, conversation = [], []
+    for index in range(turns):
+        parent, teen, emotion = script[index % len(script)]
+        prompt = build_teen_prompt(6, context, language, parent).text
+
+        bounded = build_history(conversation, TEEN_SYSTEM_PROMPT, language)
+        full = build_history(conversation, TEEN_SYSTEM_PROMPT, language, max_tokens=10 ** 9, summary_max_tokens=0,
+                             max_message_chars=10 ** 9)
+        rows.append({
+            "turn": index + 1,
+            "no_history": _call_tokens([], prompt, count),
+            "full_history": _call_tokens(full.messages, prompt, count),
+            "bounded_history": _call_tokens(bounded.messages, prompt, count),
+            "bounded_kept_turns": bounded.kept_turns,
+            "bounded_summarized_turns": bounded.summarized_turns,
+        })
+        conversation.append(ConversationTurn(parent=parent, teen=teen, emotion=emotion))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teen prompt tokens per turn by history policy")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--language", choices=sorted(SCRIPT), default="en")
+    args = parser.parse_args(argv)
+    print(json.dumps(benchmark(args.turns, args.language), indent=2))
+
+
+if __name__ == "__main__":
+    main()
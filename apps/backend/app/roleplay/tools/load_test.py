@@ -0,0 +1,168 @@
+"""Concurrent roleplay load test: start -> respond x N -> end
+
+Runs in-process against the ASGI app by default, with the offline fake model
+unless EVALUATION_MODEL / TEEN_RESPONSE_MODEL are already set:
+
+    python -m app.roleplay.tools.load_test --sessions 200 --concurrency 50 --turns 3
+    EVALUATION_MODEL="fake:latency=lognormal,latency_ms=800" python -m app.roleplay.tools.load_test
+
+Pass --base-url to drive a running server instead.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+SAMPLE_RESPONSES = {
+    "en": [
+        "I can see you're exhausted. How about we pick up the clothes together for five minutes?",
+        "Clean it up right now, I'm not asking again!",
+        "I understand you're tired. Could you tidy up before bed so we both have a calm morning?",
+    ],
+    "zh-HK": [
+        "我知你今日好攰，不如我哋一齊執十分鐘先？",
+        "即刻同我執返好間房！",
+        "我明白你好攰，瞓覺前執好佢，聽朝大家都舒服啲，好唔好？",
+    ],
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+class LoadTestResult:
+    """Latency samples and error counts per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.sessions_completed = 0
+        self.elapsed = 0.0
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self) -> dict:
+        """p50/p95/p99 per endpoint (ms) plus overall throughput"""
+        total_requests = sum(len(samples) for samples in self.latencies.values())
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors.get(endpoint, 0),
+                "p50_ms": round(percentile(samples, 50) * 1000, 1),
+                "p95_ms": round(percentile(samples, 95) * 1000, 1),
+                "p99_ms": round(percentile(samples, 99) * 1000, 1),
+            }
+        return {
+            "sessions_completed": self.sessions_completed,
+            "elapsed_s": round(self.elapsed, 2),
+            "requests_per_s": round(total_requests / self.elapsed, 1) if self.elapsed else 0.0,
+            "sessions_per_s": round(self.sessions_completed / self.elapsed, 2) if self.elapsed else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def _timed(client, result: LoadTestResult, endpoint: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except Exception:
+        response, ok = None, False
+    result.record(endpoint, time.perf_counter() - start, ok)
+    return response if ok else None
+
+
+async def run_session(client, result: LoadTestResult, turns: int, scenario: Optional[str], language: str, index: int):
+    """Drive one full game session"""
+    params = {"language": language}
+    if scenario:
+        params["scenario_name"] = scenario
+
+    started = await _timed(client, result, "start", "POST", "/api/roleplay/game/start", params=params)
+    if started is None:
+        return
+    session_id = started.json()["session_id"]
+
+    responses = SAMPLE_RESPONSES.get(language, SAMPLE_RESPONSES["en"])
+    for turn in range(turns):
+        body = {"parent_response": responses[(index + turn) % len(responses)]}
+        reply = await _timed(client, result, "respond", "POST", f"/api/roleplay/game/respond/{session_id}", json=body)
+        if reply is None or reply.json().get("game_completed"):
+            break
+
+    await _timed(client, result, "end", "DELETE", f"/api/roleplay/game/end/{session_id}")
+    result.sessions_completed += 1
+
+
+async def run_load_test(
+    sessions: int,
+    concurrency: int,
+    turns: int,
+    scenario: Optional[str] = None,
+    language: str = "en",
+    base_url: Optional[str] = None,
+    asgi_app=None,
+) -> LoadTestResult:
+    """Run `sessions` game sessions with at most `concurrency` in flight"""
+    import httpx
+
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        if asgi_app is None:
+            from app.main import app as asgi_app
+        transport = httpx.ASGITransport(app=asgi_app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60)
+
+    result = LoadTestResult()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int):
+        async with semaphore:
+            await run_session(client, result, turns, scenario, language, index)
+
+    start = time.perf_counter()
+    async with client:
+        await asyncio.gather(*(bounded(i) for i in range(sessions)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent roleplay load test")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--scenario", default=None)
+    parser.add_argument("--language", default="en", choices=["en", "zh-HK"])
+    parser.add_argument("--base-url", default=None, help="Target a running server instead of the in-process app")
+    args = parser.parse_args(argv)
+
+    if not args.base_url:
+        # Never spend real tokens unless a model was chosen explicitly
+        os.environ.setdefault("EVALUATION_MODEL", "fake:latency=lognormal,latency_ms=300")
+        os.environ.setdefault("TEEN_RESPONSE_MODEL", "fake:latency=lognormal,latency_ms=200")
+
+    result = asyncio.run(run_load_test(
+        args.sessions, args.concurrency, args.turns, args.scenario, args.language, args.base_url
+    ))
+    print(json.dumps(result.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Teen reply latency and throughput: remote provider vs the in-process CPU model
+
+Usage:
+    python -m app.roleplay.tools.local_model_benchmark --models openai:gpt-4o-mini local:path=/models/teen.gguf
+    python -m app.roleplay.tools.local_model_benchmark --requests 100 --concurrency 8
+
+Builds a teen responder per model id (timing the build, which includes the
+local model's warm load), then sends the same parent responses to each one
+with the given concurrency. Reports p50/p95/p99 latency, replies per second
+and how many replies failed to parse. Defaults to TEEN_RESPONSE_MODEL
+against local (LOCAL_MODEL_* settings).
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+from ..agents.teen_responder import TeenResponderAgent
+from ..config import ModelConfig
+from .load_test import SAMPLE_RESPONSES, percentile
+
+
+async def _run(agent: TeenResponderAgent, requests: int, concurrency: int, language: str) -> dict:
+    responses = SAMPLE_RESPONSES.get(language, SAMPLE_RESPONSES["en"])
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await agent.generate(
+                    score=index % 11,
+                    language=language,
+                    scenario="messy_room",
+                    parent_response=responses[index % len(responses)],
+                )
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "replies_per_s": round(requests / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def benchmark(models: List[str], requests: int = 20, concurrency: int = 4, language: str = "en") -> dict:
+    """Latency and throughput per model id"""
+    results = {}
+    for model_name in models:
+        start = time.perf_counter()
+        agent = TeenResponderAgent(model_name=model_name)
+        load_ms = round((time.perf_counter() - start) * 1000, 1)
+        results[model_name] = {"load_ms": load_ms, **asyncio.run(_run(agent, requests, concurrency, language))}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teen reply latency: remote provider vs local CPU model")
+    parser.add_argument("--models", nargs="+", default=[ModelConfig.TEEN_RESPONSE_MODEL, "local"])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--language", choices=sorted(SAMPLE_RESPONSES), default="en")
+    args = parser.parse_args(argv)
+    print(json.dumps(benchmark(args.models, args.requests, args.concurrency, args.language), indent=2))
+
+
+if __name__ == "__main__":
+    main()
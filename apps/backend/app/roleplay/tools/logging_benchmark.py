@@ -0,0 +1,115 @@
+"""Logging time per evaluated turn, as seen by the request thread
+
+Usage:
+    python -m app.roleplay.tools.logging_benchmark
+    python -m app.roleplay.tools.logging_benchmark --turns 20000
+
+Replays the log statements of one cascade-evaluated turn into a temporary
+file under three setups:
+
+  legacy         basicConfig at INFO: the evaluation start line, the raw and the
+                 cleaned model output, and the routing line, written synchronously
+  structured     configure_logging defaults: evaluation output at DEBUG (off) and
+                 the routing line as a sampled JSON event behind the queue handler
+  structured_debug  the same with the evaluator at DEBUG, output lines sampled too
+
+Times cover the calling thread only; the listener thread's formatting and I/O
+run off the request path.
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from ...services.logging_service import configure_logging, shutdown_logging
+from ..config import LoggingConfig
+
+EVALUATOR = "app.roleplay.agents.evaluator"
+CASCADE = "app.roleplay.services.cascade"
+MODEL = "openai:gpt-4o-mini"
+OUTPUT = json.dumps({
+    "tone_score": 3, "approach_score": 2, "respect_score": 2, "total_score": 7, "passed": True,
+    "feedback": "You acknowledged how tired your child is and offered to help, which keeps the door open. "
+                "Next time, try naming the feeling before asking for the task.",
+})
+DECISION = {"tier": "fast", "reason": "confident", "fast_score": 8, "final_score": 8, "threshold": 7,
+            "estimated_saving_usd": 0.000123}
+
+
+def _legacy_turn(evaluator: logging.Logger, cascade: logging.Logger) -> None:
+    evaluator.info(f"Starting evaluation with model: {MODEL}, language: en")
+    evaluator.info(f"Raw AI response: ```json\n{OUTPUT}\n```")
+    evaluator.info(f"Cleaned JSON output: {OUTPUT}")
+    cascade.info(
+        f"Evaluation routed to fast (confident): fast=8 final=8 threshold=7 saving=${DECISION['estimated_saving_usd']:.6f}"
+    )
+
+
+def _structured_turn(evaluator: logging.Logger, cascade: logging.Logger) -> None:
+    if evaluator.isEnabledFor(logging.DEBUG):
+        evaluator.debug("Evaluation output", extra={
+            "event": "evaluation.output", "model": MODEL, "scenario": "messy_room",
+            "language": "en", "round": None, "output": OUTPUT,
+        })
+    cascade.info("Evaluation routed to fast", extra={"event": "cascade.routed", **DECISION})
+
+
+def _time_turns(turn, turns: int) -> float:
+    evaluator, cascade = logging.getLogger(EVALUATOR), logging.getLogger(CASCADE)
+    start = time.perf_counter()
+    for _ in range(turns):
+        turn(evaluator, cascade)
+    return (time.perf_counter() - start) / turns * 1e6
+
+
+def benchmark(turns: int = 5000) -> dict:
+    """Microseconds of logging per turn, per setup"""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    saved_levels = {name: logging.getLogger(name).level for name in (EVALUATOR, CASCADE)}
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            for handler in saved_handlers:
+                root.removeHandler(handler)
+
+            with open(os.path.join(directory, "legacy.log"), "w") as stream:
+                handler = logging.StreamHandler(stream)
+                root.addHandler(handler)
+                root.setLevel(logging.INFO)
+                results["legacy"] = _time_turns(_legacy_turn, turns)
+                root.removeHandler(handler)
+
+            for name, evaluator_level in (("structured", logging.INFO), ("structured_debug", logging.DEBUG)):
+                with open(os.path.join(directory, f"{name}.log"), "w") as stream:
+                    handler = configure_logging(stream)
+                    logging.getLogger(EVALUATOR).setLevel(evaluator_level)
+                    results[name] = _time_turns(_structured_turn, turns)
+                    shutdown_logging()
+                    results[f"{name}_dropped"] = getattr(handler, "dropped", 0)
+        finally:
+            for handler in saved_handlers:
+                root.addHandler(handler)
+            root.setLevel(saved_level)
+            for name, level in saved_levels.items():
+                logging.getLogger(name).setLevel(level)
+
+    return {
+        "turns": turns,
+        "sample_rates": LoggingConfig.SAMPLE_RATES,
+        **{key: round(value, 2) if isinstance(value, float) else value for key, value in results.items()},
+        "removed_us_per_turn": round(results["legacy"] - results["structured"], 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Request-thread logging time per turn, legacy vs structured")
+    parser.add_argument("--turns", type=int, default=5000)
+    args = parser.parse_args(argv)
+    print(json.dumps(benchmark(args.turns), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Agreement report between the local pre-scorer and cached LLM evaluations
+
+Usage:
+    python -m app.roleplay.tools.prescore_agreement evaluations.jsonl
+
+Each input line is a JSON object with the parent response and the cached
+LLM evaluation, either flat or nested under "evaluation":
+    {"parent_response": "...", "total_score": 8, "passed": true}
+    {"parent_response": "...", "evaluation": {"total_score": 8, "passed": true}}
+"""
+
+import argparse
+import json
+import sys
+from typing import Iterable, List, Optional, Tuple
+from ..config import GameConfig
+from ..services.prescorer import RuleBasedPreScorer
+
+
+def load_cached_evaluations(lines: Iterable[str]) -> List[Tuple[str, int, bool]]:
+    """Parse (parent_response, llm_total_score, llm_passed) rows"""
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        data = json.loads(line)
+        evaluation = data.get("evaluation", data)
+        total = evaluation["total_score"]
+        rows.append((data["parent_response"], total, evaluation.get("passed", total >= GameConfig.PASS_THRESHOLD)))
+    return rows
+
+
+def agreement_report(rows: List[Tuple[str, int, bool]], scorer: Optional[RuleBasedPreScorer] = None) -> dict:
+    """Compare provisional scores with LLM scores on the same responses"""
+    scorer = scorer or RuleBasedPreScorer()
+    confusion = {"pass/pass": 0, "pass/fail": 0, "fail/pass": 0, "fail/fail": 0}
+    abs_errors = []
+    decisive = decisive_correct = 0
+
+    for parent_response, llm_total, llm_passed in rows:
+        provisional = scorer.score(parent_response)
+        local_passed = provisional.total_score >= GameConfig.PASS_THRESHOLD
+        key = f"{'pass' if local_passed else 'fail'}/{'pass' if llm_passed else 'fail'}"
+        confusion[key] += 1
+        abs_errors.append(abs(provisional.total_score - llm_total))
+
+        if provisional.verdict != "uncertain":
+            decisive += 1
+            decisive_correct += (provisional.verdict == "pass") == llm_passed
+
+    count = len(rows)
+    if count == 0:
+        return {"count": 0}
+
+    return {
+        "count": count,
+        "pass_fail_agreement": round((confusion["pass/pass"] + confusion["fail/fail"]) / count, 3),
+        "mean_absolute_error": round(sum(abs_errors) / count, 2),
+        "within_one_point": round(sum(1 for e in abs_errors if e <= 1) / count, 3),
+        "confusion_local_vs_llm": confusion,
+        # How often short-circuiting would fire, and how often it would be right
+        "short_circuit_rate": round(decisive / count, 3),
+        "short_circuit_precision": round(decisive_correct / decisive, 3) if decisive else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="JSONL file of cached LLM evaluations ('-' for stdin)")
+    args = parser.parse_args(argv)
+
+    if args.path == "-":
+        rows = load_cached_evaluations(sys.stdin)
+    else:
+        with open(args.path, encoding="utf-8") as f:
+            rows = load_cached_evaluations(f)
+
+    print(json.dumps(agreement_report(rows), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Prompt token budget per scenario round
+
+Shows how many input tokens each agent call costs and how much of it is a
+stable, provider-cacheable prefix:
+
+    python -m app.roleplay.tools.prompt_budget
+    python -m app.roleplay.tools.prompt_budget --tiktoken          # exact counts (needs tiktoken)
+    python -m app.roleplay.tools.prompt_budget --live 5            # also run the configured models
+
+--live calls the configured EVALUATION_MODEL / TEEN_RESPONSE_MODEL N times per
+round and reports latency and provider-reported input and cache-read tokens.
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Callable, List
+from ..agents.prompts import (
+    EVALUATION_SYSTEM_PROMPT, MULTI_ROUND_SYSTEM_PROMPT, TEEN_SYSTEM_PROMPT,
+    build_evaluation_prompt, build_teen_prompt,
+)
+from ..scenarios.compiler import compile_round
+from ..scenarios.loader import ScenarioLoader
+from ..services.tokens import estimate_tokens
+
+SAMPLE_PARENT_RESPONSE = {
+    "en": "I can see you're really tired. How about we tidy up together for ten minutes?",
+    "zh-HK": "我知你好攰，不如我哋一齊執十分鐘先？",
+}
+
+
+def _row(label: str, system: str, prefix: str, suffix: str, count: Callable[[str], int]) -> dict:
+    system_tokens, prefix_tokens, suffix_tokens = count(system), count(prefix), count(suffix)
+    total = system_tokens + prefix_tokens + suffix_tokens
+    return {
+        "call": label,
+        "system_tokens": system_tokens,
+        "prefix_tokens": prefix_tokens,
+        "suffix_tokens": suffix_tokens,
+        "total_tokens": total,
+        "cacheable_share": round((system_tokens + prefix_tokens) / total, 3) if total else 0.0,
+    }
+
+
+def budget_report(loader: ScenarioLoader, count: Callable[[str], int] = estimate_tokens) -> List[dict]:
+    """Token budget for every agent call of every scenario round and language"""
+    rows = []
+    for name in loader.list_scenario_files():
+        scenario = loader.load_scenario(name)
+        if not scenario:
+            continue
+        for language in ("en", "zh-HK"):
+            sample = SAMPLE_PARENT_RESPONSE[language]
+            if scenario.is_multi_round:
+                for round_data in scenario.rounds:
+                    compiled = compile_round(scenario, round_data.round, language)
+                    prompt = compiled.render(sample)
+                    rows.append(_row(f"{name}/{round_data.round}/{language}/evaluation",
+                                     MULTI_ROUND_SYSTEM_PROMPT, prompt.prefix, prompt.suffix, count))
+                    teen = build_teen_prompt(7, compiled.teen_context, language)
+                    rows.append(_row(f"{name}/{round_data.round}/{language}/teen",
+                                     TEEN_SYSTEM_PROMPT, teen.prefix, teen.suffix, count))
+            else:
+                prompt = build_evaluation_prompt(sample, scenario.get_teen_opening(language), language)
+                rows.append(_row(f"{name}/1/{language}/evaluation",
+                                 EVALUATION_SYSTEM_PROMPT, prompt.prefix, prompt.suffix, count))
+                teen = build_teen_prompt(7, scenario.get_background(language), language)
+                rows.append(_row(f"{name}/1/{language}/teen", TEEN_SYSTEM_PROMPT, teen.prefix, teen.suffix, count))
+    return rows
+
+
+async def live_report(loader: ScenarioLoader, repeats: int) -> dict:
+    """Run real games against the configured models and read back agent metrics"""
+    from ..services.game_engine import RoleplayGameEngine
+    from ..services.metrics import agent_metrics
+
+    engine = RoleplayGameEngine()
+    agent_metrics.reset()
+    for name in loader.list_scenarios():
+        for language in ("en", "zh-HK"):
+            for _ in range(repeats):
+                state = engine.create_game_state(name, language)
+                while state and not state.game_completed:
+                    state = await engine.process_parent_response(state, SAMPLE_PARENT_RESPONSE[language])
+    snapshot = agent_metrics.snapshot()
+    return {"by_scenario_round": snapshot["by_scenario_round"], "by_role": snapshot["by_role"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prompt token budget per scenario round")
+    parser.add_argument("--tiktoken", action="store_true", help="Count with tiktoken (o200k_base) instead of the local estimate")
+    parser.add_argument("--live", type=int, default=0, metavar="N", help="Also play each scenario N times against the configured models")
+    args = parser.parse_args(argv)
+
+    count = estimate_tokens
+    if args.tiktoken:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        count = lambda text: len(encoding.encode(text))  # noqa: E731
+
+    loader = ScenarioLoader()
+    report = {"prompts": budget_report(loader, count)}
+    if args.live:
+        report["live"] = asyncio.run(live_report(loader, args.live))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
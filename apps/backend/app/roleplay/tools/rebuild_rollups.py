@@ -0,0 +1,65 @@
+"""Rebuild the analytics rollups from the recorded transcripts
+
+Usage:
+    python -m app.roleplay.tools.rebuild_rollups
+    python -m app.roleplay.tools.rebuild_rollups --batch 5000
+
+Rollups are normally kept up to date as rounds finish; this backfills them
+for transcripts recorded before they existed, or repairs them after a manual
+data fix. Transcripts are streamed and folded into cells as they arrive, so
+memory grows with the number of cells, not the number of turns.
+"""
+
+import argparse
+import json
+from datetime import datetime
+from typing import Callable, Dict
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.models.roleplay_rollup import RoleplayRollup
+from ..services.analytics import ROLLUP_KEY, round_cells
+from ..services.transcripts import TranscriptStore
+
+
+def rebuild(session_factory: Callable[[], Session] = SessionLocal, batch: int = 1000) -> dict:
+    """Replace all rollups with ones recomputed from every finished round"""
+    cells: Dict[tuple, dict] = {}
+    rounds = 0
+    for row in TranscriptStore(session_factory, batch_size=batch).export():
+        if not row["round_completed"]:
+            continue
+        rounds += 1
+        for cell in round_cells(row, datetime.fromisoformat(row["created_at"]).date()):
+            key = tuple(cell[name] for name in ROLLUP_KEY)
+            total = cells.get(key)
+            if total is None:
+                cells[key] = cell
+            else:
+                total["count"] += cell["count"]
+                total["value_sum"] += cell["value_sum"]
+                total["value_sq_sum"] += cell["value_sq_sum"]
+
+    db = session_factory()
+    try:
+        db.execute(delete(RoleplayRollup))
+        if cells:
+            db.execute(insert(RoleplayRollup), list(cells.values()))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return {"rounds": rounds, "cells": len(cells)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups from transcripts")
+    parser.add_argument("--batch", type=int, default=1000, help="Transcript rows fetched per round trip")
+    args = parser.parse_args(argv)
+    print(json.dumps(rebuild(batch=args.batch), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Recommendation latency over a synthetic scenario library
+
+Usage:
+    python -m app.roleplay.tools.recommender_benchmark
+    python -m app.roleplay.tools.recommender_benchmark --scenarios 50000 --criteria 120 --runs 2000
+
+Builds a library of multi-round scenarios with random criteria, precomputes
+its matrix once, then times recommend() for a cached user with random
+weaknesses. Database access is not part of the timing: cached users never
+touch it.
+"""
+
+import argparse
+import json
+import random
+import time
+import numpy as np
+from ..scenarios.loader import CriterionDefinition, RoundData, Scenario
+from ..services.recommender import ScenarioRecommender, ScenarioVectors, _UserSkills
+
+
+def synthetic_library(scenarios: int, criteria: int, seed: int = 0):
+    """Multi-round scenarios drawing 2-4 criteria per round from a shared pool"""
+    rng = random.Random(seed)
+    pool = {f"criterion_{i}": CriterionDefinition(max_score=rng.randint(2, 5), description=f"criterion {i}")
+            for i in range(criteria)}
+    names = list(pool)
+    library = []
+    for i in range(scenarios):
+        rounds = [
+            RoundData(round=r + 1, child_state="", child_prompt="...", evaluation_criteria=rng.sample(names, rng.randint(2, 4)))
+            for r in range(rng.randint(1, 4))
+        ]
+        used = {c for round_data in rounds for c in round_data.evaluation_criteria}
+        library.append(Scenario(
+            name=f"scenario_{i}",
+            case_name=f"Scenario {i}",
+            case_name_zh=f"情境 {i}" if i % 2 else None,
+            background_and_instructions="...",
+            background_and_instructions_zh="..." if i % 2 else None,
+            multi_round=True,
+            rounds=rounds,
+            criteria={c: pool[c] for c in used},
+            difficulty=rng.choice(["easy", "medium", "hard"]),
+        ))
+    return library
+
+
+def run(scenarios: int, criteria: int, runs: int, limit: int) -> dict:
+    library = synthetic_library(scenarios, criteria)
+    started = time.perf_counter()
+    vectors = ScenarioVectors(library)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    recommender = ScenarioRecommender(loader=None, session_factory=None)
+    recommender._vectors = vectors
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 20, len(vectors.vocabulary)).astype(np.float32)
+    recommender._users["benchmark"] = _UserSkills(
+        float("inf"),  # Loaded "in the future": never expires
+        counts,
+        counts * rng.random(len(vectors.vocabulary), dtype=np.float32),
+        {vectors.names[0]}
+    )
+
+    timings = []
+    for i in range(runs):
+        language = "zh-HK" if i % 2 else None
+        started = time.perf_counter()
+        recommender.recommend("benchmark", language, limit)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        "scenarios": scenarios,
+        "criteria": len(vectors.vocabulary),
+        "matrix_bytes": vectors.matrix.nbytes,
+        "build_ms": round(build_ms, 1),
+        "recommend_us": {
+            "p50": round(timings[len(timings) // 2], 1),
+            "p95": round(timings[int(len(timings) * 0.95)], 1),
+            "max": round(timings[-1], 1),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time scenario recommendations over a synthetic library")
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--criteria", type=int, default=60, help="Size of the shared criterion pool")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=3)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.scenarios, args.criteria, args.runs, args.limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
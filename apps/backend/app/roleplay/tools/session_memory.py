@@ -0,0 +1,118 @@
+"""Memory per active session and bytes saved per turn, full vs compact game state
+
+Usage:
+    EVALUATION_MODEL=fake TEEN_RESPONSE_MODEL=fake python -m app.roleplay.tools.session_memory
+    EVALUATION_MODEL=fake TEEN_RESPONSE_MODEL=fake python -m app.roleplay.tools.session_memory \\
+        --sessions 500 --turns 9 --scenario school_dropoff_anxiety --multi-round --language zh-HK
+
+Plays scripted sessions through the game engine, then restores every final
+state from JSON twice under tracemalloc: once as GameState models, once in the
+compact form the session store keeps. Per-turn persistence is compared as the
+full state JSON against the delta the database session store journals.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import tracemalloc
+from typing import List
+from ..models.game_state import GameState
+from ..services.game_engine import RoleplayGameEngine
+from ..services.session_store import SessionStore, diff, pack
+from .history_benchmark import SCRIPT
+
+
+def _force_multi_round(engine: RoleplayGameEngine) -> None:
+    """Play the scenario's rounds even when the YAML switches them off"""
+    load = engine.scenario_loader.load_scenario
+
+    def load_multi_round(name):
+        scenario = load(name)
+        return scenario.model_copy(update={"multi_round": True}) if scenario and scenario.rounds else scenario
+
+    engine.scenario_loader.load_scenario = load_multi_round
+
+
+async def play(sessions: int, turns: int, scenario: str, language: str, multi_round: bool = False):
+    """Final state JSON of every session plus full and delta bytes of every save"""
+    engine = RoleplayGameEngine()
+    if multi_round:
+        _force_multi_round(engine)
+    store = SessionStore()
+    script = SCRIPT[language]
+    dumps: List[str] = []
+    full_bytes: List[int] = []
+    delta_bytes: List[int] = []
+
+    for index in range(sessions):
+        session_id = f"session_{index}"
+        state = engine.create_game_state(scenario, language)
+        store.save(session_id, state)
+        previous = pack(state)
+        for turn in range(turns):
+            if state.game_completed:
+                break
+            # Distinct text per session, as real parents would write
+            parent = f"{script[turn % len(script)][0]} ({index})"
+            state = await engine.process_parent_response(store.get(session_id), parent)
+            store.save(session_id, state)
+            compact = pack(state)
+            delta, previous = diff(previous, compact), compact
+            full_bytes.append(len(state.model_dump_json().encode("utf-8")))
+            delta_bytes.append(len(json.dumps(delta, ensure_ascii=False).encode("utf-8")))
+        dumps.append(state.model_dump_json())
+    return dumps, full_bytes, delta_bytes
+
+
+def _held_bytes(build) -> int:
+    """Bytes still allocated by the objects build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        held = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del held
+    return after - before
+
+
+def benchmark(sessions: int = 200, turns: int = 6, scenario: str = "messy_room", language: str = "en",
+              multi_round: bool = False) -> dict:
+    dumps, full_bytes, delta_bytes = asyncio.run(play(sessions, turns, scenario, language, multi_round))
+    full_memory = _held_bytes(lambda: [GameState.model_validate_json(dump) for dump in dumps])
+    compact_memory = _held_bytes(lambda: [pack(GameState.model_validate_json(dump)) for dump in dumps])
+    saves = len(full_bytes) or 1
+    return {
+        "sessions": sessions,
+        "turns_played": len(full_bytes),
+        "memory_per_session_bytes": {
+            "game_state": round(full_memory / sessions),
+            "compact": round(compact_memory / sessions),
+            "ratio": round(compact_memory / full_memory, 3) if full_memory else None,
+        },
+        "bytes_per_save": {
+            "full_state_json": round(sum(full_bytes) / saves),
+            "delta_json": round(sum(delta_bytes) / saves),
+            "ratio": round(sum(delta_bytes) / sum(full_bytes), 3) if full_bytes else None,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Session memory and per-turn save size, full vs compact")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--scenario", default="messy_room")
+    parser.add_argument("--language", choices=sorted(SCRIPT), default="en")
+    parser.add_argument("--multi-round", action="store_true", help="Play the scenario's rounds")
+    args = parser.parse_args(argv)
+    report = benchmark(args.sessions, args.turns, args.scenario, args.language, args.multi_round)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
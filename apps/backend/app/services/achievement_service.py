@@ -0,0 +1,219 @@
+"""Badges and achievements, updated incrementally from user events
+
+Badges are declared as thresholds on per-user counters, and counters as what
+each kind of event adds to them. An event loads and updates only the counters
+it feeds, and only badge rules on counters that actually moved are checked,
+so earning a badge never reads a user's history.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal
+from app.models.achievement import UserBadge, UserCounter, UserCounterMember
+
+logger = logging.getLogger(__name__)
+
+STREAK_COUNTER = "streak_days"
+LAST_ACTIVE_COUNTER = "last_active_day"  # date.toordinal() of the latest active UTC day
+MASTERED_COUNTER = "scenarios_mastered"  # Distinct: its members are the mastered scenario names
+
+
+class AchievementEvent(BaseModel):
+    """Something a user did that may count towards badges"""
+
+    kind: str  # scenario_completed, card_completed, stack_completed
+    scenario: Optional[str] = None
+    mastered: bool = False
+    score: Optional[float] = None
+    stack_id: Optional[str] = None
+    card_id: Optional[str] = None
+    day: Optional[date] = None  # UTC day of the activity; today when omitted
+
+
+class CounterRule(BaseModel):
+    """How one kind of event adds to a counter"""
+
+    counter: str
+    event: str
+    when: Optional[str] = None  # Event field that must be truthy
+    min_score: Optional[float] = None
+    distinct: Tuple[str, ...] = ()  # Event fields identifying an item counted at most once
+
+
+class BadgeRule(BaseModel):
+    """A badge earned when a counter reaches a threshold"""
+
+    id: str
+    counter: str
+    threshold: int
+    description: str
+
+
+COUNTER_RULES = [
+    CounterRule(counter="scenarios_completed", event="scenario_completed"),
+    CounterRule(counter=MASTERED_COUNTER, event="scenario_completed", when="mastered", distinct=("scenario",)),
+    CounterRule(counter="expert_completions", event="scenario_completed", min_score=9),
+    CounterRule(counter="cards_completed", event="card_completed", distinct=("stack_id", "card_id")),
+    CounterRule(counter="stacks_completed", event="stack_completed", distinct=("stack_id",)),
+]
+
+BADGE_RULES = [
+    BadgeRule(id="scenario_mastery", counter=MASTERED_COUNTER, threshold=1,
+              description="Passed every round of a roleplay scenario"),
+    BadgeRule(id="expert_communicator", counter="expert_completions", threshold=1,
+              description="Finished a roleplay scenario averaging 9 or more"),
+    BadgeRule(id="mastery_collector", counter=MASTERED_COUNTER, threshold=5,
+              description="Mastered five different roleplay scenarios"),
+    BadgeRule(id="roleplay_regular", counter="scenarios_completed", threshold=10,
+              description="Finished ten roleplay games"),
+    BadgeRule(id="first_card", counter="cards_completed", threshold=1,
+              description="Completed a first learning card"),
+    BadgeRule(id="avid_reader", counter="cards_completed", threshold=50,
+              description="Completed fifty different learning cards"),
+    BadgeRule(id="stack_finisher", counter="stacks_completed", threshold=1,
+              description="Completed a whole card stack"),
+    BadgeRule(id="three_day_streak", counter=STREAK_COUNTER, threshold=3,
+              description="Practised three days in a row"),
+    BadgeRule(id="week_streak", counter=STREAK_COUNTER, threshold=7,
+              description="Practised seven days in a row"),
+]
+
+
+class BadgeEngine:
+    """Applies events to counter values and reports the badge thresholds they cross"""
+
+    def __init__(self, badge_rules: List[BadgeRule] = BADGE_RULES, counter_rules: List[CounterRule] = COUNTER_RULES):
+        self.badge_rules = {rule.id: rule for rule in badge_rules}
+        self._counters_by_event: Dict[str, List[CounterRule]] = defaultdict(list)
+        for rule in counter_rules:
+            self._counters_by_event[rule.event].append(rule)
+        self._badges_by_counter: Dict[str, List[BadgeRule]] = defaultdict(list)
+        for rule in sorted(badge_rules, key=lambda rule: rule.threshold):
+            self._badges_by_counter[rule.counter].append(rule)
+
+    def touched_counters(self, event: AchievementEvent) -> List[str]:
+        """Counters an event can change; the only ones that need loading"""
+        return [rule.counter for rule in self._counters_by_event[event.kind]] + [STREAK_COUNTER, LAST_ACTIVE_COUNTER]
+
+    def apply(
+        self,
+        counters: Dict[str, int],
+        event: AchievementEvent,
+        is_new_member: Callable[[str, str], bool] = lambda counter, member: True
+    ) -> Tuple[Dict[str, int], List[str]]:
+        """Changed counter values and the badges whose thresholds they crossed"""
+        changed: Dict[str, int] = {}
+
+        for rule in self._counters_by_event[event.kind]:
+            if rule.when and not getattr(event, rule.when):
+                continue
+            if rule.min_score is not None and (event.score is None or event.score < rule.min_score):
+                continue
+            if rule.distinct:
+                member = "/".join(str(getattr(event, field)) for field in rule.distinct)
+                if not is_new_member(rule.counter, member):
+                    continue
+            changed[rule.counter] = counters.get(rule.counter, 0) + 1
+
+        day = (event.day or datetime.now(timezone.utc).date()).toordinal()
+        last = counters.get(LAST_ACTIVE_COUNTER, 0)
+        if day > last:
+            streak = counters.get(STREAK_COUNTER, 0)
+            changed[STREAK_COUNTER] = streak + 1 if day == last + 1 else 1
+            changed[LAST_ACTIVE_COUNTER] = day
+
+        crossed = []
+        for counter, value in changed.items():
+            before = counters.get(counter, 0)
+            for rule in self._badges_by_counter.get(counter, []):
+                if rule.threshold > value:
+                    break
+                if before < rule.threshold:
+                    crossed.append(rule.id)
+        return changed, crossed
+
+    def preview(self, event: AchievementEvent) -> List[str]:
+        """Badges this event alone would earn, for players without an account"""
+        return self.apply({}, event)[1]
+
+
+class AchievementService:
+    """Per-user counters and earned badges in the database"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, engine: Optional[BadgeEngine] = None):
+        self.session_factory = session_factory
+        self.engine = engine or BadgeEngine()
+
+    def record(self, user_id: str, event: AchievementEvent) -> List[str]:
+        """Apply an event for a user and return the badges newly earned; failures are logged"""
+        db = self.session_factory()
+        try:
+            names = self.engine.touched_counters(event)
+            rows = {
+                row.counter: row for row in db.scalars(
+                    select(UserCounter)
+                    .where(UserCounter.user_id == user_id, UserCounter.counter.in_(names))
+                    .with_for_update()
+                )
+            }
+
+            def is_new_member(counter: str, member: str) -> bool:
+                if db.get(UserCounterMember, (user_id, counter, member)) is not None:
+                    return False
+                db.add(UserCounterMember(user_id=user_id, counter=counter, member=member))
+                return True
+
+            changed, crossed = self.engine.apply({name: row.value for name, row in rows.items()}, event, is_new_member)
+            for counter, value in changed.items():
+                if counter in rows:
+                    rows[counter].value = value
+                else:
+                    db.add(UserCounter(user_id=user_id, counter=counter, value=value))
+
+            earned = []
+            if crossed:
+                # A streak can cross a threshold again after it resets
+                already = set(db.scalars(
+                    select(UserBadge.badge_id).where(UserBadge.user_id == user_id, UserBadge.badge_id.in_(crossed))
+                ))
+                earned = [badge for badge in crossed if badge not in already]
+                db.add_all(UserBadge(user_id=user_id, badge_id=badge) for badge in earned)
+            db.commit()
+            return earned
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"Failed to record {event.kind} achievement event for {user_id}: {e}")
+            return []
+        finally:
+            db.close()
+
+    def summary(self, user_id: str) -> dict:
+        """Earned badges and current counters of one user"""
+        db = self.session_factory()
+        try:
+            badges = db.scalars(select(UserBadge).where(UserBadge.user_id == user_id).order_by(UserBadge.earned_at))
+            counters = db.scalars(select(UserCounter).where(UserCounter.user_id == user_id))
+            return {
+                "user_id": user_id,
+                "badges": [
+                    {
+                        "id": badge.badge_id,
+                        "description": rule.description if (rule := self.engine.badge_rules.get(badge.badge_id)) else "",
+                        "earned_at": badge.earned_at.isoformat() if badge.earned_at else None,
+                    }
+                    for badge in badges
+                ],
+                "counters": {row.counter: row.value for row in counters if row.counter != LAST_ACTIVE_COUNTER},
+            }
+        finally:
+            db.close()
+
+
+# Shared by the roleplay and card stack endpoints
+achievement_service = AchievementService()
@@ -0,0 +1,151 @@
+"""Structured, sampled logging that never blocks request threads
+
+Records are filtered in the calling thread (logger levels first, then
+sampling of verbose events) and put on a bounded queue without waiting; a
+background listener thread formats them as JSON lines and does the I/O. When
+the queue is full the record is dropped and counted instead. With
+LOG_SYNCHRONOUS (the default on Lambda, where nothing would drain the queue
+of a frozen container) records are written in the calling thread instead.
+
+Verbose events name themselves with extra={"event": ...}; their sample rate
+comes from LOG_SAMPLE_RATES. Other extra fields end up in the JSON line.
+"""
+
+import json
+import logging
+import math
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, TextIO
+from app.roleplay.config import LoggingConfig
+
+# LogRecord attributes that are not user-supplied extra fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps the given fraction of each sampled event's records, evenly spaced (the first is kept);
+    warnings and errors always pass"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        rate = self.rates.get(event) if event else None
+        if rate is None or rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        if rate <= 0:
+            return False
+        with self._lock:
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+        # Kept whenever seen * rate crosses a whole number, so any rate is honoured exactly
+        return math.floor(seen * rate) != math.floor((seen - 1) * rate)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full rather than waiting"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StderrHandler(logging.StreamHandler):
+    """Writes to whatever sys.stderr is when a record is emitted (servers and test runners swap it)"""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self) -> TextIO:
+        return sys.stderr
+
+
+# Installed by configure_logging
+_handler: Optional[logging.Handler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(stream: Optional[TextIO] = None) -> logging.Handler:
+    """Route the root logger through the sampled queue handler, replacing whatever handlers it
+    had (an earlier call's, basicConfig's, the Lambda runtime's) so lines are not written twice"""
+    global _handler, _listener
+    shutdown_logging()
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.setLevel(LoggingConfig.LEVEL.upper())
+    for name, level in LoggingConfig.LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    output = logging.StreamHandler(stream) if stream is not None else StderrHandler()
+    if LoggingConfig.FORMAT == "text":
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    if LoggingConfig.SYNCHRONOUS:
+        output.addFilter(SamplingFilter(LoggingConfig.SAMPLE_RATES))
+        root.addHandler(output)
+        _handler = output
+        return output
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LoggingConfig.QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(LoggingConfig.SAMPLE_RATES))
+    root.addHandler(handler)
+
+    # Arguments are merged into the message here; JSON formatting and I/O run on the listener thread
+    _handler = handler
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and remove the handler (on shutdown, or before reconfiguring)"""
+    global _handler, _listener
+    if _listener is not None:
+        _listener.stop()
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+    _handler = _listener = None
+
+
+def dropped_records() -> int:
+    """Records dropped because the queue was full"""
+    return getattr(_handler, "dropped", 0)
@@ -6,5 +6,6 @@ from app.models.user import User  # Import to register with Base
 # Create tables on Lambda initialization
 Base.metadata.create_all(bind=engine)
 
-# Lambda handler
+# Lambda handler; without lifespan events no shutdown hook runs, so logs are written
+# synchronously here (LOG_SYNCHRONOUS defaults to true on Lambda)
 handler = Mangum(app, lifespan="off")
\ No newline at end of file
@@ -18,6 +18,12 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 from app.db.database import Base
 from app.models.user import User  # Import your models
+from app.models.roleplay_transcript import RoleplayTranscript
+from app.models.roleplay_rollup import RoleplayRollup
+from app.models.achievement import UserBadge, UserCounter, UserCounterMember
+from app.models.user_skill import UserCriterionStat
+from app.models.roleplay_session import RoleplaySession, RoleplaySessionDelta
+from app.models.llm_usage import UserLLMUsage
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
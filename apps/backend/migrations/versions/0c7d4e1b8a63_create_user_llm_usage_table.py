@@ -0,0 +1,39 @@
+"""Create user LLM usage table
+
+Revision ID: 0c7d4e1b8a63
+Revises: f3a8c2d6e914
+Create Date: 2026-10-18 20:14:38.905521
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c7d4e1b8a63'
+down_revision: Union[str, Sequence[str], None] = 'f3a8c2d6e914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_llm_usage',
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('calls', sa.Integer(), nullable=False),
+    sa.Column('input_tokens', sa.Integer(), nullable=False),
+    sa.Column('output_tokens', sa.Integer(), nullable=False),
+    sa.Column('cost_usd', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_index('ix_user_llm_usage_day', 'user_llm_usage', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_llm_usage_day', table_name='user_llm_usage')
+    op.drop_table('user_llm_usage')
@@ -0,0 +1,53 @@
+"""Create roleplay transcripts table
+
+Revision ID: 5c1e9b7d2f40
+Revises: a2f6164d03fe
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9b7d2f40'
+down_revision: Union[str, Sequence[str], None] = 'a2f6164d03fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('roleplay_transcripts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(length=64), nullable=False),
+    sa.Column('scenario', sa.String(length=100), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=False),
+    sa.Column('round_number', sa.Integer(), nullable=False),
+    sa.Column('attempt', sa.Integer(), nullable=False),
+    sa.Column('parent_response', sa.Text(), nullable=False),
+    sa.Column('teen_response', sa.Text(), nullable=True),
+    sa.Column('emotion', sa.String(length=20), nullable=True),
+    sa.Column('total_score', sa.Integer(), nullable=True),
+    sa.Column('max_score', sa.Integer(), nullable=True),
+    sa.Column('passed', sa.Boolean(), nullable=True),
+    sa.Column('criteria_scores', sa.JSON(), nullable=True),
+    sa.Column('provisional_score', sa.Integer(), nullable=True),
+    sa.Column('round_completed', sa.Boolean(), nullable=True),
+    sa.Column('game_completed', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_roleplay_transcripts_session_id'), 'roleplay_transcripts', ['session_id'], unique=False)
+    op.create_index('ix_roleplay_transcripts_scenario_created_at', 'roleplay_transcripts', ['scenario', 'created_at'], unique=False)
+    op.create_index('ix_roleplay_transcripts_created_at', 'roleplay_transcripts', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_roleplay_transcripts_created_at', table_name='roleplay_transcripts')
+    op.drop_index('ix_roleplay_transcripts_scenario_created_at', table_name='roleplay_transcripts')
+    op.drop_index(op.f('ix_roleplay_transcripts_session_id'), table_name='roleplay_transcripts')
+    op.drop_table('roleplay_transcripts')
@@ -0,0 +1,39 @@
+"""Create roleplay rollups table
+
+Revision ID: 8d3a6f0b9e12
+Revises: 5c1e9b7d2f40
+Create Date: 2026-10-18 14:03:27.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3a6f0b9e12'
+down_revision: Union[str, Sequence[str], None] = '5c1e9b7d2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('roleplay_rollups',
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('scenario', sa.String(length=100), nullable=False),
+    sa.Column('round_number', sa.Integer(), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=False),
+    sa.Column('metric', sa.String(length=80), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('value_sum', sa.Float(), nullable=False),
+    sa.Column('value_sq_sum', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('period', 'scenario', 'round_number', 'language', 'metric')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('roleplay_rollups')
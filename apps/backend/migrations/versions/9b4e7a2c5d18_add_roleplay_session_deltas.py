@@ -0,0 +1,38 @@
+"""Add roleplay session deltas table
+
+Revision ID: 9b4e7a2c5d18
+Revises: 0c7d4e1b8a63
+Create Date: 2026-10-18 23:12:04.318940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e7a2c5d18'
+down_revision: Union[str, Sequence[str], None] = '0c7d4e1b8a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('roleplay_sessions', sa.Column('snapshot_version', sa.Integer(), server_default='1', nullable=False))
+    # Existing rows hold their full state at their current version
+    op.execute('UPDATE roleplay_sessions SET snapshot_version = version')
+    op.create_table('roleplay_session_deltas',
+    sa.Column('session_id', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('delta', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('session_id', 'version')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Turns saved since a session's last snapshot are lost with the deltas
+    op.drop_table('roleplay_session_deltas')
+    op.drop_column('roleplay_sessions', 'snapshot_version')
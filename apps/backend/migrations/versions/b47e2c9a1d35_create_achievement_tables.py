@@ -0,0 +1,48 @@
+"""Create achievement tables
+
+Revision ID: b47e2c9a1d35
+Revises: 8d3a6f0b9e12
+Create Date: 2026-10-18 16:41:09.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b47e2c9a1d35'
+down_revision: Union[str, Sequence[str], None] = '8d3a6f0b9e12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_counters',
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('counter', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('user_id', 'counter')
+    )
+    op.create_table('user_counter_members',
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('counter', sa.String(length=64), nullable=False),
+    sa.Column('member', sa.String(length=200), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'counter', 'member')
+    )
+    op.create_table('user_badges',
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('badge_id', sa.String(length=64), nullable=False),
+    sa.Column('earned_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('user_id', 'badge_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_badges')
+    op.drop_table('user_counter_members')
+    op.drop_table('user_counters')
@@ -0,0 +1,35 @@
+"""Create user criterion stats table
+
+Revision ID: e6f1d8c3a527
+Revises: b47e2c9a1d35
+Create Date: 2026-10-18 18:22:54.870316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f1d8c3a527'
+down_revision: Union[str, Sequence[str], None] = 'b47e2c9a1d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_criterion_stats',
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('criterion', sa.String(length=80), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('ratio_sum', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('user_id', 'criterion')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_criterion_stats')
@@ -0,0 +1,45 @@
+"""Create roleplay sessions table
+
+Revision ID: f3a8c2d6e914
+Revises: e6f1d8c3a527
+Create Date: 2026-10-18 19:05:27.612083
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c2d6e914'
+down_revision: Union[str, Sequence[str], None] = 'e6f1d8c3a527'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('roleplay_sessions',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('scenario', sa.String(length=100), nullable=False),
+    sa.Column('scenario_title', sa.String(length=255), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=False),
+    sa.Column('is_multi_round', sa.Boolean(), nullable=True),
+    sa.Column('current_round', sa.Integer(), nullable=False),
+    sa.Column('max_rounds', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Boolean(), nullable=False),
+    sa.Column('state', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_roleplay_sessions_user_active', 'roleplay_sessions', ['user_id', 'completed', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_roleplay_sessions_user_active', table_name='roleplay_sessions')
+    op.drop_table('roleplay_sessions')
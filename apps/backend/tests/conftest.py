@@ -0,0 +1,10 @@
+import os
+
+# Run the roleplay agents against the offline fake model so the suite needs no API keys
+os.environ.setdefault("EVALUATION_MODEL", "fake")
+os.environ.setdefault("TEEN_RESPONSE_MODEL", "fake")
+
+# No daily model budgets unless a test sets its own: the suite's turns would otherwise add up
+# across runs in the shared SQLite database
+os.environ.setdefault("QUOTA_DAILY_CALLS", "0")
+os.environ.setdefault("QUOTA_DAILY_TOKENS", "0")
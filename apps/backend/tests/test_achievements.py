@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api.users import get_current_user, get_optional_user
+from app.db.database import Base
+from app.main import app
+from app.models.achievement import UserBadge, UserCounter, UserCounterMember
+from app.roleplay.config import GameConfig
+from app.services import achievement_service as achievements
+from app.services.achievement_service import AchievementEvent, AchievementService, BadgeEngine
+
+client = TestClient(app)
+DAY = date(2026, 3, 2)
+
+
+def _service():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[UserCounter.__table__, UserCounterMember.__table__, UserBadge.__table__])
+    return AchievementService(sessionmaker(bind=engine))
+
+
+def _mastered(scenario, day=DAY, score=8):
+    return AchievementEvent(kind="scenario_completed", scenario=scenario, mastered=True, score=score, day=day)
+
+
+def test_events_only_touch_their_counters():
+    engine = BadgeEngine()
+    card = AchievementEvent(kind="card_completed", stack_id="s", card_id="c", day=DAY)
+    assert "scenarios_mastered" not in engine.touched_counters(card)
+
+    changed, crossed = engine.apply({"cards_completed": 49, "last_active_day": DAY.toordinal()}, card)
+    assert changed == {"cards_completed": 50}
+    assert crossed == ["avid_reader"]
+
+
+def test_badges_are_earned_once_and_distinct_items_count_once():
+    service = _service()
+    assert set(service.record("u1", _mastered("messy_room", score=9.5))) == {
+        "scenario_mastery", "expert_communicator"
+    }
+    # Mastering the same scenario again neither counts nor re-awards
+    assert service.record("u1", _mastered("messy_room")) == []
+    for index in range(4):
+        earned = service.record("u1", _mastered(f"scenario_{index}"))
+    assert earned == ["mastery_collector"]
+
+    summary = service.summary("u1")
+    assert summary["counters"]["scenarios_mastered"] == 5
+    assert summary["counters"]["scenarios_completed"] == 6
+    assert {badge["id"] for badge in summary["badges"]} == {
+        "scenario_mastery", "expert_communicator", "mastery_collector"
+    }
+    assert service.summary("someone_else")["badges"] == []
+
+
+def test_streaks_grow_on_consecutive_days_and_reset_after_a_gap():
+    service = _service()
+    card = lambda index, day: AchievementEvent(kind="card_completed", stack_id="s", card_id=str(index), day=day)
+
+    earned = [service.record("u1", card(index, DAY + timedelta(days=index))) for index in range(3)]
+    assert earned[0] == ["first_card"] and earned[2] == ["three_day_streak"]
+    service.record("u1", card(3, DAY + timedelta(days=3)))  # Same-day repeats do not extend it
+    service.record("u1", card(4, DAY + timedelta(days=3)))
+    assert service.summary("u1")["counters"]["streak_days"] == 4
+
+    service.record("u1", card(5, DAY + timedelta(days=10)))
+    assert service.summary("u1")["counters"]["streak_days"] == 1
+
+
+def test_roleplay_completion_awards_badges_to_known_players(monkeypatch):
+    monkeypatch.setattr(achievements.achievement_service, "session_factory", _service().session_factory)
+    monkeypatch.setattr(GameConfig, "PERSISTENT_SESSIONS", False)
+    # Only a signed-in player can be named; anonymous games cannot claim someone's badges
+    start = client.post("/api/roleplay/game/start?scenario_name=messy_room&language=en&user_id=parent_1")
+    assert start.status_code == 401
+
+    def play(parent_response):
+        start = client.post("/api/roleplay/game/start?scenario_name=messy_room&language=en").json()
+        while True:
+            turn = client.post(f"/api/roleplay/game/respond/{start['session_id']}",
+                               json={"parent_response": parent_response}).json()
+            if turn["game_completed"]:
+                return turn
+
+    # The fake evaluator scores by text: this one passes first time, the other never does
+    app.dependency_overrides[get_optional_user] = lambda: SimpleNamespace(id="parent_1")
+    try:
+        first = play("I understand, let's do it together.")
+        assert first["evaluation"]["passed"]
+        assert "scenario_mastery" in first["badges_earned"]
+        assert play("Let's talk.")["badges_earned"] == []
+        assert "scenario_mastery" not in play("I understand, let's do it together.")["badges_earned"]
+        other = client.post("/api/roleplay/game/start?scenario_name=messy_room&language=en&user_id=parent_2")
+        assert other.status_code == 403
+    finally:
+        app.dependency_overrides.clear()
+
+    assert client.get("/api/achievements/parent_1").status_code == 404  # Nobody else's summary is readable
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="parent_1")
+    try:
+        counters = client.get("/api/achievements/me").json()["counters"]
+    finally:
+        app.dependency_overrides.clear()
+    assert counters["scenarios_completed"] == 3 and counters["scenarios_mastered"] == 1
+    assert {rule["id"] for rule in client.get("/api/achievements/rules").json()["badges"]} >= {"scenario_mastery"}
+
+
+def test_card_badges_go_to_the_signed_in_user_only(monkeypatch):
+    service = _service()
+    monkeypatch.setattr(achievements.achievement_service, "session_factory", service.session_factory)
+    progress = "/api/card-stacks/emotion_labeling/progress"
+    card = {"completed_card_id": "amygdala_basics"}
+
+    anonymous = client.post(progress, params={"user_id": "parent_1", **card}).json()
+    assert anonymous["badges_earned"] == [] and service.summary("parent_1")["counters"] == {}
+
+    app.dependency_overrides[get_optional_user] = lambda: SimpleNamespace(id="parent_2")
+    try:
+        signed_in = client.post(progress, params={"user_id": "parent_1", **card}).json()
+    finally:
+        app.dependency_overrides.clear()
+    assert signed_in["badges_earned"] == ["first_card"]
+    assert service.summary("parent_1")["counters"] == {}
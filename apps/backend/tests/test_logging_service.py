@@ -0,0 +1,87 @@
+import io
+import json
+import logging
+import queue
+import pytest
+from app.roleplay.config import LoggingConfig, _log_level, _log_levels, _sample_rates
+from app.services.logging_service import (
+    JsonFormatter, NonBlockingQueueHandler, SamplingFilter, configure_logging, shutdown_logging,
+)
+
+
+def _record(level=logging.INFO, **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, "Routed to %s", ("fast",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def restore_logging():
+    """Put the application's logging back once a test has reconfigured it"""
+    yield
+    shutdown_logging()
+    logging.getLogger("app.noisy").setLevel(logging.NOTSET)
+    configure_logging()
+
+
+def test_json_lines_carry_extra_fields():
+    entry = json.loads(JsonFormatter().format(_record(event="cascade.routed", final_score=8)))
+    assert (entry["level"], entry["logger"], entry["message"]) == ("INFO", "app.test", "Routed to fast")
+    assert (entry["event"], entry["final_score"]) == ("cascade.routed", 8)
+    assert "args" not in entry and entry["ts"].endswith("+00:00")
+
+
+def test_verbose_events_are_sampled_but_warnings_never_are():
+    sampler = SamplingFilter({"cascade.routed": 0.25, "evaluation.output": 0})
+    kept = [sampler.filter(_record(event="cascade.routed")) for _ in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+    # Rates that are not 1/n are kept in proportion, not rounded to the nearest 1/n
+    for rate in (0.3, 0.4, 0.7):
+        fractional = SamplingFilter({"cascade.routed": rate})
+        assert sum(fractional.filter(_record(event="cascade.routed")) for _ in range(1000)) == round(rate * 1000)
+    assert not sampler.filter(_record(event="evaluation.output"))
+    assert sampler.filter(_record(logging.WARNING, event="evaluation.output"))
+    assert sampler.filter(_record())
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(_record())
+    assert handler.dropped == 3
+
+
+def test_configured_logging_writes_json_from_the_listener(monkeypatch, restore_logging):
+    monkeypatch.setattr(LoggingConfig, "LEVELS", {"app.noisy": "WARNING"})
+    monkeypatch.setattr(LoggingConfig, "SAMPLE_RATES", {"cascade.routed": 0.5})
+    stream = io.StringIO()
+    configure_logging(stream)
+
+    logging.getLogger("app.noisy").info("hidden")
+    for score in range(4):
+        logging.getLogger("app.roleplay.services.cascade").info("routed", extra={"event": "cascade.routed", "score": score})
+    logging.getLogger("app.noisy").error("shown")
+    shutdown_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(line["message"], line.get("score")) for line in lines] == [("routed", 0), ("routed", 2), ("shown", None)]
+
+
+def test_synchronous_logging_replaces_existing_root_handlers(monkeypatch, restore_logging):
+    """On Lambda records are written before the handler returns, and only once"""
+    monkeypatch.setattr(LoggingConfig, "SYNCHRONOUS", True)
+    earlier = io.StringIO()
+    logging.getLogger().addHandler(logging.StreamHandler(earlier))
+    stream = io.StringIO()
+    configure_logging(stream)
+
+    logging.getLogger("app.test").warning("written now")
+    assert json.loads(stream.getvalue())["message"] == "written now"
+    assert earlier.getvalue() == ""
+
+
+def test_bad_logging_settings_are_skipped_not_fatal():
+    assert _log_level("loud") == "INFO" and _log_level("debug") == "DEBUG"
+    assert _log_levels("app=debug, broken,httpx=NOPE,=INFO") == {"app": "DEBUG"}
+    assert _sample_rates('{"a": "x", "b": 0.5, "c": null}') == {"b": 0.5}
+    assert _sample_rates("[1") == {} and _sample_rates("[1]") == {}
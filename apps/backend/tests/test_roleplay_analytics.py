@@ -0,0 +1,96 @@
+import statistics
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.database import Base
+from app.main import app
+from app.api import roleplay as roleplay_api
+from app.models.roleplay_rollup import RoleplayRollup
+from app.models.roleplay_transcript import RoleplayTranscript
+from app.roleplay.config import GameConfig
+from app.roleplay.services.analytics import RollupStore, add_round, round_metrics
+from app.roleplay.services.transcripts import TranscriptStore
+from app.roleplay.tools.rebuild_rollups import rebuild
+
+client = TestClient(app)
+
+
+def _session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[RoleplayTranscript.__table__, RoleplayRollup.__table__])
+    return sessionmaker(bind=engine)
+
+
+def _finish_round(factory, session_id, round_number, language, attempt, scores):
+    """Write a turn that finished a round the way TranscriptStore.record does"""
+    row = {
+        "session_id": session_id, "scenario": "school_dropoff_anxiety", "language": language,
+        "round_number": round_number, "attempt": attempt, "parent_response": "I'm here.", "teen_response": "Okay.",
+        "total_score": sum(scores.values()), "max_score": 10, "passed": sum(scores.values()) >= 7,
+        "criteria_scores": scores, "round_completed": True,
+    }
+    db = factory()
+    db.add(RoleplayTranscript(**row))
+    add_round(db, row)
+    db.commit()
+    db.close()
+
+
+ROUNDS = [
+    ("a", 1, "en", 1, {"empathy": 4, "tone": 4}),
+    ("b", 1, "en", 3, {"empathy": 2, "tone": 3}),
+    ("c", 1, "zh-HK", 2, {"empathy": 3, "tone": 5}),
+    ("a", 2, "en", 2, {"empathy": 1, "tone": 2}),
+]
+
+
+def test_rollups_match_a_full_scan_and_a_rebuild():
+    factory = _session_factory()
+    for args in ROUNDS:
+        _finish_round(factory, *args)
+
+    summary = RollupStore(factory).summary("school_dropoff_anxiety")
+    first = summary["rounds"][0]
+    round_one = [scores for _, n, _, _, scores in ROUNDS if n == 1]
+    totals = [sum(scores.values()) for scores in round_one]
+    assert first["rounds_finished"] == 3
+    assert first["pass_rate"] == round(sum(total >= 7 for total in totals) / 3, 3)
+    assert first["total_score"]["mean"] == round(statistics.mean(totals), 3)
+    assert first["total_score"]["stddev"] == round(statistics.pstdev(totals), 3)
+    assert first["criteria"]["empathy"]["mean"] == 3.0
+    assert first["attempts"]["distribution"] == {"1": 1, "2": 1, "3": 1}
+
+    english = RollupStore(factory).summary("school_dropoff_anxiety", language="en")
+    assert english["rounds"][0]["rounds_finished"] == 2
+
+    assert rebuild(factory) == {"rounds": 4, "cells": len(factory().query(RoleplayRollup).all())}
+    assert RollupStore(factory).summary("school_dropoff_anxiety") == summary
+
+
+def test_unknown_criteria_are_not_metrics():
+    row = {"attempt": 1, "passed": True, "criteria_scores": {"empathy": 3, "x" * 200: 4, "tone": "high"}}
+    assert [metric for metric, _ in round_metrics(row)] == ["passed", "attempts", "attempts=1", "criterion:empathy"]
+
+
+def test_analytics_endpoint(monkeypatch):
+    factory = _session_factory()
+    monkeypatch.setattr(roleplay_api, "transcripts", TranscriptStore(factory))
+    monkeypatch.setattr(roleplay_api, "rollups", RollupStore(factory))
+
+    start = client.post("/api/roleplay/game/start?scenario_name=messy_room&language=en").json()
+    for _ in range(3):
+        turn = client.post(f"/api/roleplay/game/respond/{start['session_id']}", json={"parent_response": "Hi"}).json()
+        if turn["game_completed"]:
+            break
+
+    assert client.get("/api/roleplay/analytics/messy_room").status_code == 403
+    monkeypatch.setattr(GameConfig, "TRANSCRIPT_EXPORT_TOKEN", "export-secret")
+    headers = {"X-Export-Token": "export-secret"}
+    assert client.get("/api/roleplay/analytics/messy_room", headers={"X-Export-Token": "wrong"}).status_code == 401
+
+    data = client.get("/api/roleplay/analytics/messy_room", headers=headers).json()
+    assert data["period"] == "all"
+    assert data["rounds"][0]["rounds_finished"] == 1
+    assert set(data["rounds"][0]["criteria"]) == {"tone", "approach", "respect"}
+    assert client.get("/api/roleplay/analytics/messy_room?day=2000-01-01", headers=headers).json()["rounds"] == []
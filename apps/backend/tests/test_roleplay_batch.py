@@ -0,0 +1,133 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api.users import get_current_user
+from app.db.database import Base
+from app.main import app
+from app.models.llm_usage import UserLLMUsage
+from app.roleplay.agents.evaluator import EvaluationAgent
+from app.roleplay.models.evaluation import BatchEvaluationItem
+from app.roleplay.scenarios.compiler import ScenarioCompiler
+from app.roleplay.scenarios.loader import ScenarioLoader
+from app.roleplay.services.batch_evaluation import BatchEvaluator
+from app.roleplay.services.metrics import agent_metrics
+from app.roleplay.services.quota import QuotaLedger
+
+client = TestClient(app)
+
+
+class CountingEvaluator(EvaluationAgent):
+    """Real fake-model evaluator that tracks how many calls run at once"""
+
+    def __init__(self):
+        super().__init__()
+        self.active = self.peak = 0
+
+    async def score(self, *args, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        try:
+            return await super().score(*args, **kwargs)
+        finally:
+            self.active -= 1
+
+
+def _collect(batch, items):
+    async def run():
+        return [line async for line in batch.run(items)]
+    return asyncio.run(run())
+
+
+def test_duplicates_share_one_call_and_concurrency_is_bounded():
+    """Identical items are evaluated once, and no more than the limit run at once"""
+    evaluator = CountingEvaluator()
+    batch = BatchEvaluator(evaluator, ScenarioLoader(), ScenarioCompiler(), concurrency=3)
+    items = [BatchEvaluationItem(scenario="messy_room", language="en", parent_response=f"Response {i % 10}")
+             for i in range(30)]
+
+    agent_metrics.reset()
+    lines = _collect(batch, items)
+    assert agent_metrics.snapshot()["total"]["calls"] == 10
+    assert evaluator.peak <= 3
+    assert lines[-1]["summary"] == {"items": 30, "unique": 10, "cache_hits": 0, "errors": 0}
+    assert sorted(line["index"] for line in lines[:-1]) == list(range(30))
+
+    # A later batch reuses remembered results without calling the model
+    again = _collect(batch, items[:5])
+    assert all(line["cached"] for line in again[:-1])
+    assert agent_metrics.snapshot()["total"]["calls"] == 10
+
+
+def test_shared_call_outlives_the_batch_that_started_it():
+    """Cancelling the first batch leaves the joined call running; a cancelled call fails per item"""
+    evaluator = CountingEvaluator()
+    batch = BatchEvaluator(evaluator, ScenarioLoader(), ScenarioCompiler())
+    items = [BatchEvaluationItem(scenario="messy_room", language="en", parent_response="Let's tidy together")]
+
+    async def _lines(lines):
+        return [line async for line in lines]
+
+    async def scenario():
+        started = asyncio.ensure_future(_lines(batch.run(items)))
+        await asyncio.sleep(0.001)
+        joined = asyncio.ensure_future(_lines(batch.run(items)))
+        await asyncio.sleep(0.001)
+        started.cancel()
+        lines = await joined
+        assert lines[0]["status"] == "ok" and lines[-1]["summary"]["errors"] == 0
+        assert started.cancelled()
+
+        # The call itself being cancelled is reported like any other failed evaluation
+        other = [BatchEvaluationItem(scenario="messy_room", language="en", parent_response="Something else")]
+        waiting = asyncio.ensure_future(_lines(batch.run(other)))
+        await asyncio.sleep(0.001)
+        next(iter(batch._inflight.values())).cancel()
+        lines = await waiting
+        assert lines[0]["status"] == "error" and "cancelled" in lines[0]["error"]
+
+    asyncio.run(scenario())
+    assert len(batch._cache) == 1 and not batch._inflight
+
+
+def test_bad_items_report_errors():
+    """Unknown scenarios and rounds fail per item without failing the batch"""
+    batch = BatchEvaluator(EvaluationAgent(), ScenarioLoader(), ScenarioCompiler())
+    lines = _collect(batch, [
+        BatchEvaluationItem(scenario="nope", parent_response="Hi"),
+        BatchEvaluationItem(scenario="messy_room", round=2, parent_response="Hi"),
+    ])
+    assert [line["status"] for line in lines[:-1]] == ["error", "error"]
+    assert lines[-1]["summary"]["errors"] == 2
+
+
+def test_batch_endpoint_streams_ndjson(monkeypatch):
+    """The endpoint streams one JSON object per line, ending with a summary, for signed-in users"""
+    items = [{"scenario": "messy_room", "language": "en", "parent_response": "Let's tidy together", "id": "a"},
+             {"scenario": "messy_room", "language": "en", "parent_response": "Let's  tidy together", "id": "b"}]
+    assert client.post("/api/roleplay/evaluate/batch", json={"items": items}).status_code in (401, 403)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[UserLLMUsage.__table__])
+    ledger = QuotaLedger(sessionmaker(bind=engine), daily_calls=1, daily_tokens=0)
+    monkeypatch.setattr("app.api.roleplay.quota_ledger", ledger)
+    monkeypatch.setattr("app.roleplay.services.quota.quota_ledger", ledger)
+    monkeypatch.setattr("app.api.roleplay.batch_evaluator", BatchEvaluator(EvaluationAgent(), ScenarioLoader(), ScenarioCompiler()))
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=42)
+    try:
+        response = client.post("/api/roleplay/evaluate/batch", json={"items": items})
+        # The one evaluation used up the budget, so the next batch is refused
+        refused = client.post("/api/roleplay/evaluate/batch", json={"items": items})
+    finally:
+        app.dependency_overrides.clear()
+    assert ledger.usage("42").calls == 1
+    assert refused.status_code == 429
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert {line["id"] for line in lines[:-1]} == {"a", "b"}
+    assert lines[-1]["summary"]["unique"] == 1
@@ -0,0 +1,91 @@
+import asyncio
+from app.roleplay.config import GameConfig
+from app.roleplay.models.evaluation import EvaluationResult
+from app.roleplay.services.cascade import CascadeStats, EvaluationCascade
+from app.roleplay.services.prescorer import RuleBasedPreScorer
+from app.roleplay.tools.cascade_replay import load_rows, replay
+
+prescorer = RuleBasedPreScorer()
+UNCERTAIN = "I understand you're tired, but you're so lazy."
+
+
+class ScriptedAgent:
+    """Evaluation agent double returning a fixed total"""
+
+    def __init__(self, model_name, total=None, error=None):
+        self.model_name = model_name
+        self.total = total
+        self.error = error
+        self.calls = 0
+
+    def _result(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return EvaluationResult(tone_score=0, approach_score=0, respect_score=0, total_score=self.total,
+                                feedback="", passed=self.total >= 7)
+
+    async def score(self, *args, **kwargs):
+        return self._result()
+
+    async def evaluate(self, *args, **kwargs):
+        return self._result()
+
+
+def _run(cascade, response=UNCERTAIN):
+    return asyncio.run(cascade.evaluate(response, "I'm tired", prescorer.score(response), "en", "messy_room"))
+
+
+def test_clear_fast_score_skips_the_strong_model():
+    """A fast score far from the threshold is accepted and saves the strong call"""
+    strong = ScriptedAgent("openai:gpt-4o", total=3)
+    cascade = EvaluationCascade(strong, prescorer, ScriptedAgent("openai:gpt-4o-mini", total=2), CascadeStats())
+    evaluation, decision = _run(cascade)
+    assert decision.tier == "fast"
+    assert evaluation.total_score == 2
+    assert strong.calls == 0
+    assert decision.estimated_saving_usd > 0
+
+
+def test_borderline_and_failed_fast_scores_escalate():
+    """Scores near the pass threshold, and fast-tier errors, go to the strong model"""
+    stats = CascadeStats()
+    strong = ScriptedAgent("openai:gpt-4o", total=8)
+
+    _, near = _run(EvaluationCascade(strong, prescorer, ScriptedAgent("openai:gpt-4o-mini", total=6), stats))
+    _, failed = _run(EvaluationCascade(strong, prescorer, ScriptedAgent("openai:gpt-4o-mini", error=ValueError("bad json")), stats))
+
+    assert (near.tier, near.reason, near.final_score) == ("strong", "near_threshold", 8)
+    assert (failed.tier, failed.reason) == ("strong", "fast_error")
+    assert near.estimated_saving_usd < 0
+    assert stats.snapshot()["by_tier"] == {"strong": 2}
+
+
+def test_decisive_prescore_is_the_first_tier(monkeypatch):
+    """With short-circuiting on, a decisive local score never reaches a model"""
+    monkeypatch.setattr(GameConfig, "PRESCORE_SHORT_CIRCUIT", True)
+    fast = ScriptedAgent("openai:gpt-4o-mini", total=2)
+    cascade = EvaluationCascade(ScriptedAgent("openai:gpt-4o", total=2), prescorer, fast, CascadeStats())
+    _, decision = _run(cascade, "Shut up, you're lazy. Clean it up right now!!")
+    assert decision.tier == "prescore"
+    assert fast.calls == 0
+
+
+def test_replay_reports_accuracy_and_cost():
+    """Replay compares cascade verdicts and cost with always-strong evaluation"""
+    rows = [
+        {"parent_response": UNCERTAIN, "total_score": 2, "passed": False},
+        {"parent_response": "Let's do it together, I understand.", "total_score": 8, "passed": True},
+    ]
+    report = asyncio.run(replay(rows, "I'm tired", "en", "messy_room",
+                                ScriptedAgent("openai:gpt-4o"), ScriptedAgent("openai:gpt-4o-mini", total=2)))
+    assert report["count"] == 2
+    assert report["routing"]["evaluations"] == 2
+    assert report["pass_fail_agreement_with_strong"] == 0.5
+    assert report["estimated_cost_cascade_usd"] < report["estimated_cost_always_strong_usd"]
+
+
+def test_recorded_scores_without_a_verdict_pass_by_the_threshold(monkeypatch):
+    monkeypatch.setattr(GameConfig, "PASS_THRESHOLD", 9)
+    assert [row["passed"] for row in load_rows(['{"parent_response": "a", "total_score": 8}',
+                                                '{"parent_response": "b", "evaluation": {"total_score": 9}}'])] == [False, True]
@@ -0,0 +1,136 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import yaml
+from fastapi.testclient import TestClient
+from app.main import app
+from app.roleplay.scenarios import catalog as catalog_module, loader as loader_module
+from app.roleplay.scenarios.catalog import ScenarioCatalog
+from app.roleplay.scenarios.loader import ScenarioLoader
+
+client = TestClient(app)
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def _library(tmp_path, count):
+    """Write a synthetic scenario library to disk"""
+    for i in range(count):
+        data = {
+            "case_name": f"Scenario {i} bedtime" if i % 10 == 0 else f"Scenario {i}",
+            "background_and_instructions": "Background",
+            "child_prompts": ["Hello"],
+            "tags": ["sleep"] if i % 2 else ["screens", "sleep"],
+            "age_min": i % 15,
+            "age_max": i % 15 + 2,
+            "difficulty": DIFFICULTIES[i % 3],
+            "techniques": ["validation"],
+            "visible": i % 100 != 0,
+        }
+        if i % 4 == 0:
+            data["case_name_zh"] = f"情境{i}"
+            data["background_and_instructions_zh"] = "背景"
+        (tmp_path / f"scenario_{i:04d}.yaml").write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+    return ScenarioCatalog(ScenarioLoader(str(tmp_path)))
+
+
+def test_filters_intersect(tmp_path):
+    """Each filter narrows the result, and hidden scenarios are left out"""
+    catalog = _library(tmp_path, 2000)
+    total, page = catalog.search(tags=["screens"], age=4, difficulty="easy", language="zh-HK", limit=5)
+
+    expected = [
+        i for i in range(2000)
+        if i % 2 == 0 and i % 15 <= 4 <= i % 15 + 2 and i % 3 == 0 and i % 4 == 0 and i % 100 != 0
+    ]
+    assert total == len(expected)
+    assert [summary.name for summary in page] == [f"scenario_{i:04d}" for i in expected[:5]]
+
+
+def test_free_text_and_pagination(tmp_path):
+    """Title words are searchable and pages are stable slices of the match list"""
+    catalog = _library(tmp_path, 300)
+    total, first = catalog.search(query="Bedtime", limit=10)
+    _, second = catalog.search(query="bedtime", offset=10, limit=10)
+    assert total == 27  # every 10th title, minus the 3 hidden ones
+    assert len(first) == 10 and len(second) == 10
+    assert first[-1].name < second[0].name
+    assert catalog.search(query="情境")[0] == 72  # every 4th has a Cantonese title, minus the hidden ones
+
+
+def test_hidden_scenarios_are_not_listed():
+    """Scenarios marked visible: false stay loadable but are not listed"""
+    catalog = ScenarioCatalog(ScenarioLoader())
+    assert "school_dropoff_anxiety" not in catalog.names()
+    assert catalog.get("school_dropoff_anxiety").age_max == 5
+    assert ScenarioLoader().load_scenario("school_dropoff_anxiety") is not None
+
+
+def test_catalog_endpoint():
+    """Catalog endpoint returns paginated summaries"""
+    response = client.get("/api/roleplay/catalog", params={"tag": "chores", "age": 14, "language": "zh-HK"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1
+    assert body["scenarios"][0]["name"] == "messy_room"
+    assert client.get("/api/roleplay/catalog", params={"limit": 1000}).status_code == 422
+
+
+def test_yaml_scenarios_are_parsed_once_until_the_file_changes(tmp_path, monkeypatch):
+    """Listing and default lookups reuse parsed scenarios; an edited file is re-read"""
+    from app.roleplay.scenarios import loader as loader_module
+
+    parses = []
+    parse = loader_module.parse_scenario_file
+    monkeypatch.setattr(loader_module, "parse_scenario_file", lambda path, name: parses.append(name) or parse(path, name))
+    catalog = _library(tmp_path, 3)
+    scenarios = catalog.loader
+
+    assert scenarios.list_scenarios() == ["scenario_0001", "scenario_0002"]
+    assert scenarios.get_default_scenario().name == "scenario_0001"
+    scenarios.load_scenario("scenario_0002")
+    assert sorted(parses) == ["scenario_0000", "scenario_0001", "scenario_0002"]
+
+    path = tmp_path / "scenario_0002.yaml"
+    path.write_text(path.read_text(encoding="utf-8").replace("Scenario 2", "Scenario 2 edited"), encoding="utf-8")
+    assert scenarios.load_scenario("scenario_0002").case_name == "Scenario 2 edited"
+    assert parses.count("scenario_0002") == 2
+
+    path.unlink()
+    assert scenarios.load_scenario("scenario_0002") is None
+
+
+def test_catalog_picks_up_added_removed_and_hidden_files(tmp_path, monkeypatch):
+    """Directory changes show up after the refresh interval without a restart"""
+    catalog = _library(tmp_path, 3)
+    catalog.refresh_seconds = 60
+    assert catalog.names() == ["scenario_0001", "scenario_0002"]
+
+    (tmp_path / "scenario_0001.yaml").unlink()
+    hidden = tmp_path / "scenario_0002.yaml"
+    hidden.write_text(hidden.read_text(encoding="utf-8").replace("visible: true", "visible: false"), encoding="utf-8")
+    (tmp_path / "scenario_0003.yaml").write_text(yaml.safe_dump({
+        "case_name": "Added", "background_and_instructions": "Background", "child_prompts": ["Hi"],
+    }), encoding="utf-8")
+    assert catalog.names() == ["scenario_0001", "scenario_0002"]  # Not checked again yet
+
+    now = time.monotonic()
+    monkeypatch.setattr(catalog_module.time, "monotonic", lambda: now + 61)
+    assert catalog.names() == ["scenario_0003"]
+    assert catalog.get("scenario_0002").visible is False and catalog.get("scenario_0001") is None
+
+    # Unchanged files are not parsed again on the next check
+    parses = []
+    parse = loader_module.parse_scenario_file
+    monkeypatch.setattr(loader_module, "parse_scenario_file", lambda path, name: parses.append(name) or parse(path, name))
+    monkeypatch.setattr(catalog_module.time, "monotonic", lambda: now + 200)
+    assert catalog.names() == ["scenario_0003"] and parses == []
+
+
+def test_first_build_runs_once_for_concurrent_queries(tmp_path):
+    catalog = _library(tmp_path, 50)
+    builds = []
+    build = catalog._build
+    catalog._build = lambda fingerprint: builds.append(fingerprint) or build(fingerprint)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: catalog.search(limit=1)[0], range(16)))
+    assert len(builds) == 1 and set(results) == {49}
@@ -0,0 +1,51 @@
+from app.roleplay.scenarios.compiler import ScenarioCompiler, compile_round
+from app.roleplay.scenarios.loader import ScenarioLoader
+
+loader = ScenarioLoader()
+
+
+def _dropoff():
+    scenario = loader.load_scenario("school_dropoff_anxiety")
+    # The shipped file keeps the scenario single-round; compile it as multi-round
+    return scenario.model_copy(update={"multi_round": True})
+
+
+def test_score_table_comes_from_yaml():
+    """Max points per criterion are declared in the scenario file"""
+    compiled = compile_round(_dropoff(), 2, "en")
+    assert compiled.max_scores == {"fear_validation": 4, "concrete_reassurance": 3, "collaborative_approach": 3}
+    assert compiled.max_possible_score == 10
+    assert "fear_validation (0-4): Acknowledges and validates specific fears" in compiled.prompt_prefix
+
+
+def test_rendering_only_fills_the_suffix():
+    """Rendering reuses the compiled prefix and injects the parent's words"""
+    compiled = compile_round(_dropoff(), 1, "zh-HK")
+    parts = compiled.render("我喺度陪你 {唔使驚}")
+    assert parts.prefix is compiled.prompt_prefix
+    assert "我喺度陪你 {唔使驚}" in parts.suffix
+    assert "察覺並認同小朋友嘅情緒" in parts.prefix
+
+
+def test_compiler_caches_per_scenario():
+    """Scenarios are compiled once, then served from memory"""
+    compiler = ScenarioCompiler()
+    scenario = _dropoff()
+    first = compiler.get_round(scenario, 3, "en")
+    assert compiler.get_round(scenario, 3, "en") is first
+    assert compiler.get_round(scenario, 4, "en") is None
+
+
+def test_edited_scenario_is_compiled_again():
+    """A scenario re-read from an edited file does not keep its old rubric or threshold"""
+    compiler = ScenarioCompiler()
+    scenario = _dropoff()
+    first = compiler.get_round(scenario, 2, "en")
+    edited = scenario.model_copy(deep=True)
+    edited.rounds[1].pass_threshold = 9
+    edited.criteria["fear_validation"].max_score = 5
+
+    compiled = compiler.get_round(edited, 2, "en")
+    assert (compiled.pass_threshold, compiled.max_possible_score) == (9, 11)
+    assert compiler.get_round(edited.model_copy(deep=True), 2, "en") is compiled  # Equal content is not recompiled
+    assert compiler.get_round(scenario, 2, "en") == first
@@ -0,0 +1,58 @@
+import asyncio
+from pydantic_ai.messages import SystemPromptPart
+from app.roleplay.agents.prompts import TEEN_SYSTEM_PROMPT
+from app.roleplay.agents.teen_responder import TeenResponderAgent
+from app.roleplay.models.game_state import ConversationTurn
+from app.roleplay.services.conversation import build_history
+from app.roleplay.services.game_engine import RoleplayGameEngine
+from app.roleplay.services.metrics import agent_metrics
+from app.roleplay.tools.history_benchmark import benchmark
+
+
+def _turns(count):
+    return [
+        ConversationTurn(parent=f"Parent message number {i} about the messy room", teen=f"Teen reply {i}", emotion="defensive")
+        for i in range(count)
+    ]
+
+
+def test_history_stays_within_budget():
+    """Old turns are summarised and the window never exceeds the cap"""
+    window = build_history(_turns(30), TEEN_SYSTEM_PROMPT, "en", max_tokens=200, summary_max_tokens=60)
+    assert window.tokens <= 200
+    assert window.kept_turns + window.summarized_turns == 30
+    assert window.summarized_turns > 0
+    assert "Earlier in this conversation" in window.summary
+    # The agent skips its own system prompt when history is given
+    assert isinstance(window.messages[0].parts[0], SystemPromptPart)
+
+
+def test_teen_sees_earlier_turns():
+    """Earlier turns are sent to the model as message history"""
+    responder = TeenResponderAgent()
+    agent_metrics.reset()
+    asyncio.run(responder.respond(5, language="en", scenario="messy_room", parent_response="Tidy up please"))
+    without = agent_metrics.snapshot()["total"]["input_tokens"]
+
+    agent_metrics.reset()
+    asyncio.run(responder.respond(5, language="en", scenario="messy_room", parent_response="Tidy up please",
+                                  history=_turns(3)))
+    assert agent_metrics.snapshot()["total"]["input_tokens"] > without
+
+
+def test_engine_records_each_exchange():
+    """Every processed response is added to the session's conversation"""
+    engine = RoleplayGameEngine()
+    state = engine.create_game_state("messy_room", "en")
+    state = asyncio.run(engine.process_parent_response(state, "Why is it so messy?"))
+    if not state.game_completed:
+        state = asyncio.run(engine.process_parent_response(state, "Sorry, let's do it together."))
+    assert state.conversation[0].parent == "Why is it so messy?"
+    assert state.conversation[-1].teen == state.teen_response
+
+
+def test_benchmark_levels_off():
+    """Bounded history grows at first, then stays flat while full history keeps growing"""
+    rows = benchmark(10, "en")
+    assert rows[-1]["full_history"] > rows[-1]["bounded_history"]
+    assert abs(rows[-1]["bounded_history"] - rows[6]["bounded_history"]) < 30
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.roleplay.agents.evaluator import EvaluationAgent
+from app.roleplay.agents.fake_model import parse_fake_model_options
+from app.roleplay.tools.load_test import percentile, run_load_test
+
+client = TestClient(app)
+
+
+def test_fake_model_options_override_defaults():
+    """Inline options override FAKE_MODEL_* defaults"""
+    options = parse_fake_model_options("fake:latency=uniform,latency_ms=250")
+    assert options["latency"] == "uniform"
+    assert options["latency_ms"] == "250"
+    with pytest.raises(ValueError):
+        parse_fake_model_options("fake:bogus=1")
+
+
+def test_fake_model_is_deterministic():
+    """Same prompt gives the same evaluation on every run"""
+    agent = EvaluationAgent()
+    first = asyncio.run(agent.evaluate("Let's clean up together", "I'm tired!", language="en"))
+    second = asyncio.run(agent.evaluate("Let's clean up together", "I'm tired!", language="en"))
+    assert first == second
+    assert 0 <= first.total_score <= 10
+
+
+def test_full_game_flow_offline():
+    """start -> respond -> end works without any provider key"""
+    started = client.post("/api/roleplay/game/start", params={"language": "en"})
+    assert started.status_code == 200
+    session_id = started.json()["session_id"]
+
+    reply = client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's do it together"})
+    assert reply.status_code == 200
+    assert reply.json()["teen_response"]
+
+    assert client.delete(f"/api/roleplay/game/end/{session_id}").status_code == 200
+
+
+def test_load_test_harness_reports_percentiles():
+    """Load harness drives concurrent sessions and reports latency percentiles"""
+    result = asyncio.run(run_load_test(sessions=6, concurrency=3, turns=2, asgi_app=app))
+    summary = result.summary()
+    assert summary["sessions_completed"] == 6
+    assert summary["endpoints"]["start"]["errors"] == 0
+    assert {"p50_ms", "p95_ms", "p99_ms"} <= set(summary["endpoints"]["respond"])
+    assert percentile([1, 2, 3, 4], 50) == 2
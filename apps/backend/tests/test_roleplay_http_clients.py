@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.roleplay.agents import http_clients
+from app.roleplay.agents.http_clients import HttpClientPool, http_client_pool
+from app.roleplay.config import HttpClientConfig
+from app.roleplay.agents.model_factory import build_model
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_agents_share_one_client_per_provider(monkeypatch):
+    """Every OpenAI model is built on the same pooled HTTP client"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    evaluation = build_model("openai:gpt-4o-mini", "evaluation")
+    teen = build_model("openai:gpt-4o", "teen_response")
+    assert evaluation.client._client is teen.client._client is http_client_pool.get_client("openai")
+
+
+def test_connection_reuse_is_counted():
+    """Sequential requests reuse one keep-alive connection"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    pool = HttpClientPool()
+
+    async def run():
+        client = pool.get_client("local")
+        for _ in range(3):
+            response = await client.get(f"http://127.0.0.1:{server.server_port}/")
+            assert response.text == "ok"
+        await pool.aclose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    counters = pool.snapshot()["providers"]["local"]
+    assert counters["requests"] == 3
+    assert counters["new_connections"] == 1
+    assert counters["reused_connections"] == 2
+
+
+def test_http2_without_h2_is_reported_and_not_used(monkeypatch, caplog):
+    monkeypatch.setattr(HttpClientConfig, "HTTP2", True)
+    monkeypatch.setattr(http_clients, "HTTP2_AVAILABLE", False)
+    http_clients.check_configuration()
+    assert "h2 package is not installed" in caplog.text
+    assert HttpClientPool().snapshot()["http2"] is False
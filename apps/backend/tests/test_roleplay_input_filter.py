@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+from app.api import roleplay as roleplay_api
+from app.main import app
+from app.roleplay.services.input_filter import AhoCorasick, InputFilter, InputFilterStats
+
+client = TestClient(app)
+
+
+def _filter(**kwargs):
+    return InputFilter(stats=InputFilterStats(), **kwargs)
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+    assert sorted(pattern for _, pattern in matcher.find("ushers")) == ["he", "hers", "she"]
+    assert list(AhoCorasick(["仆街"]).find("你個仆街仔")) == [(3, "仆街")]
+
+
+def test_reasonable_replies_pass_in_both_languages():
+    screen = _filter()
+    for text in ["Hi", "Let's talk.", "That's a classic move, but can we tidy up?",
+                 "你今日好攰呀，我哋一齊執好唔好？", "I know 你好攰, let's rest first.",
+                 "strengths matter", "Psst", "Sssh, quiet", "ok ok ok ok ok", "No no no no no"]:
+        assert screen.check(text).allowed, text
+
+
+def test_rejections_carry_a_reason_and_a_localised_message():
+    screen = _filter()
+    cases = {
+        "   ": "empty",
+        "Clean it up, you little shit": "blocked",
+        "你個仆街仔": "blocked",
+        "asdf": "gibberish",
+        "asdfgh qwerty": "gibberish",
+        "hahaha hahahahaha": "gibberish",
+        "hahahahahahaha": "gibberish",
+        "?????": "gibberish",
+    }
+    for text, reason in cases.items():
+        verdict = screen.check(text, "zh-HK")
+        assert (verdict.allowed, verdict.reason) == (False, reason), text
+        assert verdict.message and not verdict.message.isascii()
+
+    snapshot = screen.stats.snapshot()
+    assert snapshot["checked"] == len(cases)
+    assert snapshot["by_reason"] == {"empty": 1, "blocked": 2, "gibberish": 5}
+    assert snapshot["rejection_rate"]["gibberish"] == 0.625
+
+
+def test_rejected_input_reaches_no_model_and_costs_no_attempt(monkeypatch):
+    start = client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()
+    session_id = start["session_id"]
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("The model path must not run for rejected input")
+
+    monkeypatch.setattr(roleplay_api.game_engine, "process_parent_response", fail)
+    response = client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "asdf"})
+    assert response.status_code == 422
+    assert response.json()["detail"]["reason"] == "gibberish"
+
+    status = client.get(f"/api/roleplay/game/status/{session_id}").json()
+    assert status["attempts_used"] == 0
+    assert roleplay_api.input_filter_stats.snapshot()["by_reason"]["gibberish"] >= 1
@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.roleplay.config import GameConfig
+from app.roleplay.models.evaluation import EvaluateRequest, GameResponseRequest
+from app.roleplay.services.tokens import estimate_tokens, truncate_to_tokens
+
+client = TestClient(app)
+
+
+def test_truncation_fits_the_token_estimate():
+    for text in ["word " * 200, "你好" * 300, "mixed 混合 text " * 50]:
+        cut = truncate_to_tokens(text, 40)
+        assert estimate_tokens(cut) <= 40 and text.startswith(cut)
+        assert estimate_tokens(text[:len(cut) + 1]) > 40
+    assert truncate_to_tokens("short", 40) == "short"
+
+
+def test_requests_carry_their_token_estimate():
+    request = EvaluateRequest(parent_response="Can we tidy up?", teen_opening="唔想執")
+    assert request.estimated_tokens == estimate_tokens("Can we tidy up?") + estimate_tokens("唔想執")
+
+
+def test_oversized_prompt_text_is_rejected_or_truncated(monkeypatch):
+    monkeypatch.setattr(GameConfig, "INPUT_MAX_TOKENS", 20)
+    start = client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()
+    response = client.post(f"/api/roleplay/game/respond/{start['session_id']}",
+                           json={"parent_response": "Let's tidy up together. " * 10})
+    assert response.status_code == 422
+    assert client.get(f"/api/roleplay/game/status/{start['session_id']}").json()["attempts_used"] == 0
+
+    monkeypatch.setattr(GameConfig, "INPUT_OVERSIZE", "truncate")
+    request = GameResponseRequest(parent_response="Let's tidy up together. " * 10)
+    assert request.estimated_tokens <= 20
+    assert request.parent_response.startswith("Let's tidy up together.")
+
+
+def test_bodies_over_the_limit_are_refused_while_read():
+    huge = "x" * (GameConfig.MAX_BODY_BYTES + 1)
+    response = client.post("/api/roleplay/evaluate/prescore", content=f'{{"parent_response": "{huge}", "teen_opening": "hi"}}',
+                           headers={"content-type": "application/json"})
+    assert response.status_code == 413
+
+    def chunks():
+        for _ in range(GameConfig.MAX_BODY_BYTES // 1024 + 2):
+            yield b" " * 1024
+
+    # No Content-Length: the limit applies to the bytes actually received
+    response = client.post("/api/roleplay/evaluate/prescore", content=chunks(),
+                           headers={"content-type": "application/json"})
+    assert response.status_code == 413
+    assert client.get("/health").status_code == 200
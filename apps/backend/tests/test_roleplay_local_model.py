@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+import threading
+import pytest
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart
+from app.roleplay.agents import local_model
+from app.roleplay.agents.local_model import (
+    LocalChatModel, close_local_models, get_local_model, is_local_model, parse_local_model_options, to_chat_messages,
+)
+from app.roleplay.agents.teen_responder import TeenResponderAgent
+
+
+class TinyLlama:
+    """Smallest stand-in for a llama_cpp.Llama: answers every chat with a fixed JSON reply"""
+
+    loads = 0
+
+    def __init__(self, path, context_tokens, threads, gate=None):
+        TinyLlama.loads += 1
+        self.calls = []
+        self.gate = gate
+
+    def create_chat_completion(self, messages, max_tokens, **kwargs):
+        self.calls.append(messages)
+        if self.gate is not None and max_tokens > 1:
+            self.gate.wait()
+        reply = json.dumps({"response": "Fine, I'll do it.", "emotion": "reluctant"})
+        return {"choices": [{"message": {"content": reply}}], "usage": {"prompt_tokens": 50, "completion_tokens": 12}}
+
+
+@pytest.fixture(autouse=True)
+def _unload():
+    yield
+    close_local_models()
+
+
+def test_options_come_from_config_and_the_model_id(monkeypatch):
+    assert is_local_model("local") and is_local_model("local:path=/m.gguf")
+    assert not is_local_model("localhost:model")
+
+    monkeypatch.setattr(local_model.LocalModelConfig, "PATH", "")
+    with pytest.raises(ValueError, match="LOCAL_MODEL_PATH"):
+        parse_local_model_options("local")
+    with pytest.raises(ValueError, match="Unknown local model option"):
+        parse_local_model_options("local:path=/m.gguf,gpu=1")
+    options = parse_local_model_options("local:path=/models/teen.gguf,workers=2")
+    assert (options["path"], options["workers"]) == ("/models/teen.gguf", "2")
+
+
+def test_message_history_becomes_chat_messages():
+    messages = [
+        ModelRequest(parts=[SystemPromptPart("You are a teen."), UserPromptPart("Tidy up, please.")]),
+        ModelResponse(parts=[TextPart('{"response": "Later."}')]),
+        ModelRequest(parts=[UserPromptPart(["Stable prefix", "new turn"])]),
+    ]
+    assert to_chat_messages(messages) == [
+        {"role": "system", "content": "You are a teen."},
+        {"role": "user", "content": "Tidy up, please."},
+        {"role": "assistant", "content": '{"response": "Later."}'},
+        {"role": "user", "content": "Stable prefix\n\nnew turn"},
+    ]
+
+
+def test_teen_responder_runs_on_the_warm_local_model():
+    TinyLlama.loads = 0
+    model = get_local_model("local:path=/models/tiny.gguf,workers=2", loader=TinyLlama)
+    assert TinyLlama.loads == 2  # Loaded and warmed up before any request
+
+    agent = TeenResponderAgent(model_name="local:path=/models/tiny.gguf,workers=2")
+    reply = asyncio.run(agent.generate(score=6, language="en", parent_response="Let's tidy up together."))
+    assert (reply.response, reply.emotion) == ("Fine, I'll do it.", "reluctant")
+    assert TinyLlama.loads == 2 and model.in_flight == 0
+
+
+def test_requests_beyond_the_queue_fail_fast():
+    gate = threading.Event()
+    model = LocalChatModel("/models/tiny.gguf", workers=1, max_queue=1,
+                           loader=lambda *args: TinyLlama(*args, gate=gate))
+    messages = [ModelRequest(parts=[UserPromptPart("Hi")])]
+
+    async def run():
+        first = asyncio.create_task(model(messages, _info()))
+        second = asyncio.create_task(model(messages, _info()))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ModelHTTPError):
+            await model(messages, _info())
+        gate.set()
+        return await asyncio.gather(first, second)
+
+    responses = asyncio.run(run())
+    assert [response.usage.output_tokens for response in responses] == [12, 12]
+    model.close()
+
+
+def test_missing_llama_cpp_is_reported(monkeypatch):
+    monkeypatch.setattr(local_model, "LLAMA_CPP_AVAILABLE", False)
+    with pytest.raises(RuntimeError, match="llama-cpp-python"):
+        local_model.load_llama("/models/tiny.gguf", 512, 1)
+
+
+@pytest.mark.skipif(
+    not (local_model.LLAMA_CPP_AVAILABLE and os.getenv("LOCAL_MODEL_TEST_PATH")),
+    reason="needs llama-cpp-python and a tiny GGUF model in LOCAL_MODEL_TEST_PATH",
+)
+def test_real_tiny_model_answers_offline():
+    model = LocalChatModel(os.environ["LOCAL_MODEL_TEST_PATH"], context_tokens=256, max_tokens=16)
+    text, input_tokens, output_tokens = model.complete([{"role": "user", "content": "Say hi as JSON."}], 16, 0.0)
+    assert text and input_tokens > 0 and 0 < output_tokens <= 16
+
+
+def _info():
+    return local_model.AgentInfo(
+        function_tools=[], allow_text_output=True, output_tools=[], model_settings=None,
+        model_request_parameters=None, instructions=None,
+    )
@@ -0,0 +1,43 @@
+import asyncio
+from fastapi.testclient import TestClient
+from app.main import app
+from app.roleplay.agents.evaluator import EvaluationAgent
+from app.roleplay.config import GameConfig, _model_prices
+from app.roleplay.services.metrics import AgentMetrics, agent_metrics
+
+client = TestClient(app)
+
+
+def test_agent_runs_are_recorded_with_tokens():
+    """Each evaluation records model, tokens and scenario/language breakdowns"""
+    agent_metrics.reset()
+    asyncio.run(EvaluationAgent().evaluate("Let's talk", "I'm tired", language="en", scenario="messy_room"))
+
+    snapshot = agent_metrics.snapshot()
+    assert snapshot["total"]["calls"] == 1
+    assert snapshot["total"]["input_tokens"] > 0
+    assert snapshot["by_scenario"]["messy_room"]["calls"] == 1
+    assert snapshot["by_language"]["en"]["calls"] == 1
+
+
+def test_fallback_outcome_is_counted():
+    """Calls that end in the fallback path are counted separately"""
+    metrics = AgentMetrics()
+    with metrics.track("evaluation", "openai:gpt-4o-mini", "messy_room", "en") as call:
+        call.mark_fallback("boom")
+    assert metrics.snapshot()["by_model"]["openai:gpt-4o-mini"]["fallbacks"] == 1
+
+
+def test_metrics_endpoint(monkeypatch):
+    """Metrics endpoint exposes per-scenario and per-language breakdowns to operators only"""
+    assert client.get("/api/roleplay/metrics").status_code == 403
+    monkeypatch.setattr(GameConfig, "TRANSCRIPT_EXPORT_TOKEN", "export-secret")
+    assert client.get("/api/roleplay/metrics").status_code == 401
+    response = client.get("/api/roleplay/metrics", headers={"X-Export-Token": "export-secret"})
+    assert response.status_code == 200
+    assert {"total", "by_scenario", "by_language", "by_model"} <= set(response.json())
+
+
+def test_malformed_model_prices_are_skipped_not_fatal():
+    assert _model_prices('{"a": [1, 2], "b": [1], "c": "xy", "d": ["0.5", 4]}') == {"a": (1.0, 2.0), "d": (0.5, 4.0)}
+    assert _model_prices("[1") == {} and _model_prices("[]") == {}
@@ -0,0 +1,158 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api import roleplay as roleplay_api
+from app.api.users import get_current_user, get_optional_user
+from app.db.database import Base
+from app.main import app
+from app.models.llm_usage import UserLLMUsage
+from app.models.roleplay_rollup import RoleplayRollup
+from app.models.roleplay_session import RoleplaySession, RoleplaySessionDelta
+from app.models.roleplay_transcript import RoleplayTranscript
+from app.roleplay.models.evaluation import GameResponseRequest
+from app.roleplay.models.game_state import ConversationTurn
+from app.roleplay.services.game_engine import RoleplayGameEngine
+from app.roleplay.services.metrics import agent_metrics
+from app.roleplay.services.persistent_sessions import DatabaseSessionStore, SessionConflict
+from app.roleplay.services.quota import QuotaLedger
+from app.roleplay.services.transcripts import TranscriptStore
+
+client = TestClient(app)
+PASSING = "I understand, let's do it together."
+
+
+def _store(**options):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[RoleplaySession.__table__, RoleplaySessionDelta.__table__])
+    return DatabaseSessionStore(sessionmaker(bind=engine), **options)
+
+
+@pytest.fixture
+def signed_in(monkeypatch):
+    """Requests authenticated as whichever user the returned namespace holds"""
+    monkeypatch.setattr(roleplay_api, "persistent_sessions", _store())
+    current = SimpleNamespace(user=SimpleNamespace(id=7))
+    app.dependency_overrides[get_optional_user] = lambda: current.user
+    app.dependency_overrides[get_current_user] = lambda: current.user
+    yield current
+    app.dependency_overrides.clear()
+
+
+def test_saves_are_versioned_and_stale_writers_rejected():
+    store = _store()
+    state = RoleplayGameEngine().create_game_state("messy_room", "en")
+    assert store.create("s1", "7", state) == 1
+
+    loaded, version = store.load("s1", "7")
+    assert loaded == state and version == 1
+    assert store.load("s1", "8") is None  # Other users cannot see it
+
+    loaded.attempts = 1
+    assert store.save("s1", "7", loaded, 1) == 2
+    with pytest.raises(SessionConflict):
+        store.save("s1", "7", loaded, 1)
+    assert store.load("s1", "7")[0].attempts == 1
+
+    assert [session.session_id for session in store.active("7")] == ["s1"]
+    assert store.delete("s1", "7") and store.active("7") == []
+
+
+def test_turns_append_deltas_between_snapshots():
+    """Saves write only the turn's changes, a full snapshot every few saves, and loads replay them"""
+    store = _store(snapshot_every=2)
+    engine = RoleplayGameEngine()
+    state = engine.create_game_state("messy_room", "en")
+    store.create("s1", "7", state)
+
+    def journal():
+        db = store.session_factory()
+        try:
+            row = db.get(RoleplaySession, "s1")
+            return row.snapshot_version, [delta.version for delta in db.query(RoleplaySessionDelta).order_by("version")]
+        finally:
+            db.close()
+
+    for version, expected in ((1, (1, [2])), (2, (1, [2, 3])), (3, (4, [])), (4, (4, [5]))):
+        state.attempts = version
+        state.remember_turn(ConversationTurn(round=1, parent=f"turn {version}", teen="..."), 12)
+        assert store.save("s1", "7", state, version) == version + 1
+        assert journal() == expected
+        assert store.load("s1", "7") == (state, version + 1)
+    assert store.snapshot()["deltas"] == 3 and store.snapshot()["snapshots"] == 1
+    assert "turn 1" not in store.session_factory().get(RoleplaySessionDelta, ("s1", 5)).delta
+
+    # Another container has no base for the session until it loads it, so its first save is a snapshot
+    other = DatabaseSessionStore(store.session_factory, snapshot_every=2)
+    state.attempts = 5
+    assert other.save("s1", "7", state, 5) == 6 and journal() == (6, [])
+    assert other.load("s1", "7") == (state, 6)
+    assert other.save("s1", "7", state, 6) == 7 and journal() == (6, [7])
+    assert other.delete("s1", "7") and other.load("s1", "7") is None
+    assert store.session_factory().query(RoleplaySessionDelta).count() == 0
+
+
+def test_signed_in_session_resumes_on_another_container(signed_in):
+    roleplay_api.game_sessions.clear()
+    start = client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()
+    session_id = start["session_id"]
+    assert start["version"] == 1
+    assert len(roleplay_api.game_sessions) == 0  # Nothing held in this process
+
+    active = client.get("/api/roleplay/sessions/active").json()["sessions"]
+    assert [(session["session_id"], session["version"]) for session in active] == [(session_id, 1)]
+
+    turn = client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's talk.", "version": 1})
+    assert turn.status_code == 200
+    assert turn.json()["version"] == 2
+
+    # The other device still holds version 1
+    stale = client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": PASSING, "version": 1})
+    assert stale.status_code == 409
+
+    status = client.get(f"/api/roleplay/game/status/{session_id}").json()
+    assert status["version"] == 2
+    assert status["attempts_used"] == 1
+    assert [turn["parent"] for turn in status["conversation"]] == ["Let's talk."]
+
+    signed_in.user = SimpleNamespace(id=8)
+    assert client.get(f"/api/roleplay/game/status/{session_id}").status_code == 404
+    assert client.get("/api/roleplay/sessions/active").json()["sessions"] == []
+
+    signed_in.user = SimpleNamespace(id=7)
+    finished = client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": PASSING})
+    assert finished.json()["game_completed"]
+    assert client.get("/api/roleplay/sessions/active").json()["sessions"] == []
+
+
+def test_active_sessions_need_a_signed_in_player():
+    assert client.get("/api/roleplay/sessions/active").status_code in (401, 403)
+
+
+def test_concurrent_turns_leave_one_transcript_and_one_charge(signed_in, monkeypatch):
+    """The turn that loses the versioned save records nothing and is not charged"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[RoleplayTranscript.__table__, RoleplayRollup.__table__, UserLLMUsage.__table__])
+    store = TranscriptStore(sessionmaker(bind=engine))
+    ledger = QuotaLedger(sessionmaker(bind=engine), daily_calls=0, daily_tokens=0)
+    monkeypatch.setattr(roleplay_api, "transcripts", store)
+    monkeypatch.setattr(roleplay_api, "quota_ledger", ledger)
+    monkeypatch.setattr("app.roleplay.services.quota.quota_ledger", ledger)
+    session_id = client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()["session_id"]
+
+    async def two_devices():
+        loaded = [await roleplay_api._load_session(session_id, None, signed_in.user) for _ in range(2)]
+        return await asyncio.gather(*(
+            roleplay_api._play_turn(session_id, state, version, GameResponseRequest(parent_response="Let's talk."), signed_in.user)
+            for state, version in loaded
+        ), return_exceptions=True)
+
+    agent_metrics.reset()
+    results = asyncio.run(two_devices())
+    assert sorted(isinstance(result, HTTPException) and result.status_code for result in results) == [False, 409]
+    assert len(list(store.export())) == 1
+    assert ledger.usage("7").calls * 2 == agent_metrics.snapshot()["total"]["calls"]
@@ -0,0 +1,74 @@
+import pytest
+from app.roleplay.config import GameConfig
+from app.roleplay.services.prescorer import RuleBasedPreScorer
+from app.roleplay.tools.prescore_agreement import agreement_report, load_cached_evaluations
+
+scorer = RuleBasedPreScorer()
+
+
+def test_validating_english_response_scores_high():
+    """Validation plus collaboration should score as a clear pass"""
+    result = scorer.score(
+        "I understand, it sounds like you had a long day. "
+        "How about we tidy up together for ten minutes?"
+    )
+    assert result.total_score >= 8
+    assert result.verdict == "pass"
+
+
+def test_dismissive_cantonese_response_scores_low():
+    """Dismissive and imperative Cantonese should score as a clear fail"""
+    result = scorer.score("又搵藉口！你咁懶，即刻同我執返好間房！")
+    assert result.total_score <= 3
+    assert result.verdict == "fail"
+
+
+def test_mixed_signals_are_uncertain():
+    """Mixed praise and blame should never be decided locally"""
+    result = scorer.score("I understand you're tired, but you're so lazy.")
+    assert result.verdict == "uncertain"
+
+
+def test_short_circuit_requires_flag(monkeypatch):
+    """Decisive scores only skip the model when the config flag is on"""
+    result = scorer.score("Shut up, you're lazy. Clean it up right now!!")
+    monkeypatch.setattr(GameConfig, "PRESCORE_SHORT_CIRCUIT", False)
+    assert not scorer.should_short_circuit(result)
+    monkeypatch.setattr(GameConfig, "PRESCORE_SHORT_CIRCUIT", True)
+    assert scorer.should_short_circuit(result)
+
+    evaluation = scorer.to_evaluation(result, "en")
+    assert evaluation.passed is False
+    assert evaluation.total_score == result.total_score
+
+
+def test_agreement_report():
+    """Agreement report counts matching pass/fail verdicts"""
+    rows = [
+        ("I understand how you feel. Let's do it together.", 9, True),
+        ("Shut up and clean it up right now!!", 1, False),
+    ]
+    report = agreement_report(rows)
+    assert report["count"] == 2
+    assert report["pass_fail_agreement"] == pytest.approx(1.0)
+
+
+def test_agreement_uses_the_configured_pass_threshold(monkeypatch):
+    """Rows without a recorded verdict, and local verdicts, pass as production would"""
+    monkeypatch.setattr(GameConfig, "PASS_THRESHOLD", 10)
+    assert load_cached_evaluations(['{"parent_response": "ok", "total_score": 9}']) == [("ok", 9, False)]
+    report = agreement_report([("I understand how you feel. Let's do it together.", 9, False)])
+    assert report["pass_fail_agreement"] == pytest.approx(1.0)
+
+
+def test_short_circuited_results_pass_by_the_threshold():
+    """passed follows total >= threshold, not the pre-score's own verdict"""
+    result = scorer.score("I understand how you feel. How about we do it together?")
+    assert result.verdict == "pass"
+    assert scorer.to_evaluation(result, "en", threshold=result.total_score + 1).passed is False
+    assert scorer.to_evaluation(result, "en", threshold=result.total_score).passed is True
+
+    evaluation = scorer.to_multi_round_evaluation(result, ["empathy", "boundaries"], {"empathy": 3, "boundaries": 3}, 1,
+                                                  "en", pass_threshold=7)
+    assert evaluation.max_possible_score == 6
+    assert evaluation.passed is False and evaluation.total_score < 7
@@ -0,0 +1,33 @@
+from app.roleplay.agents.prompts import (
+    CachePoint, build_multi_round_prompt, cache_settings, to_user_prompt,
+)
+from app.roleplay.services.tokens import estimate_tokens
+
+
+def test_prefix_is_stable_across_parent_responses():
+    """Only the suffix changes between calls on the same round"""
+    rubric = [("emotion_acknowledgment", 3, "Validates emotions"), ("tone_empathy", 2, "Calm tone")]
+    first = build_multi_round_prompt("I hear you", "Don't leave me!", rubric, 7, 1, "en")
+    second = build_multi_round_prompt("Stop crying", "Don't leave me!", rubric, 7, 1, "en")
+    assert first.prefix == second.prefix
+    assert "Stop crying" in second.suffix
+    assert "emotion_acknowledgment (0-3)" in first.prefix
+    assert "fear_validation" not in first.prefix
+
+
+def test_cache_hints_by_provider():
+    """Cache points for Anthropic/Bedrock, cache keys for OpenAI"""
+    parts = build_multi_round_prompt("hi", "hey", [("tone_empathy", 2, "Calm tone")], 1, 1, "en")
+    assert to_user_prompt(parts, "openai:gpt-4o-mini") == parts.text
+    assert cache_settings("openai:gpt-4o-mini", "k") == {"openai_prompt_cache_key": "k"}
+    assert cache_settings("fake", "k") is None
+    if CachePoint is not None:
+        content = to_user_prompt(parts, "bedrock:deepseek.v3-v1:0")
+        assert content[0] == parts.prefix and content[-1] == parts.suffix
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+    """Cantonese text counts roughly one token per character"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("我明白") == 3
+    assert estimate_tokens("abcdefgh") == 2
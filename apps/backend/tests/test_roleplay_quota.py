@@ -0,0 +1,181 @@
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api import roleplay as roleplay_api
+from app.api.users import get_current_user, get_optional_user
+from app.db.database import Base
+from app.main import app
+from app.models.llm_usage import UserLLMUsage
+from app.roleplay.config import GameConfig
+from app.roleplay.agents.teen_responder import TEEN_RESPONSE_ROLE
+from app.roleplay.services.metrics import AgentMetrics, agent_metrics
+from app.roleplay.services.quota import QuotaExceeded, QuotaLedger, charged_to, metered, quota_ledger
+
+client = TestClient(app)
+
+
+def _sessions():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[UserLLMUsage.__table__])
+    return sessionmaker(bind=engine)
+
+
+def test_budgets_are_checked_locally_and_flushed_as_increments():
+    sessions = _sessions()
+    day = SimpleNamespace(value=date(2026, 3, 1))
+    ledger = QuotaLedger(sessions, daily_calls=3, daily_tokens=1000, flush_interval=0, today=lambda: day.value)
+
+    ledger.check("u1")
+    ledger.charge("u1", 300, 100, 0.01)
+    ledger.charge("u1", 300, 100, 0.01)
+    assert ledger.usage("u1").to_dict() == {"calls": 2, "input_tokens": 600, "output_tokens": 200, "cost_usd": 0.02}
+    with pytest.raises(QuotaExceeded):
+        ledger.check("u1", expected_tokens=300)
+    assert ledger.flush() == 1
+
+    # Another container starts from the flushed totals and adds its own
+    other = QuotaLedger(sessions, daily_calls=3, daily_tokens=1000, today=lambda: day.value)
+    assert other.usage("u1").calls == 2
+    other.charge("u1", 10, 10)
+    with pytest.raises(QuotaExceeded, match="3 model calls"):
+        other.check("u1")
+    other.flush()
+
+    ledger.charge("u2", 50, 50)
+    top = ledger.top(limit=5)
+    assert [(row["user_id"], row["calls"], row["tokens"]) for row in top] == [("u1", 3, 820), ("u2", 1, 100)]
+
+    # A new UTC day starts from zero
+    day.value = date(2026, 3, 2)
+    ledger.check("u1")
+    assert ledger.usage("u1").calls == 0
+    assert ledger.top(date(2026, 3, 1))[0]["user_id"] == "u1"
+    assert ledger.top() == []
+
+
+def test_ledgers_see_usage_flushed_by_other_containers():
+    """A cached total is read again after a flush, or once it is a flush interval old"""
+    sessions = _sessions()
+    first = QuotaLedger(sessions, daily_calls=3, daily_tokens=0, flush_interval=3600)
+    second = QuotaLedger(sessions, daily_calls=3, daily_tokens=0, flush_interval=0)
+    first.check("u1")
+    second.check("u1")
+
+    for ledger in (first, second):
+        ledger.charge("u1")
+    second.charge("u1")
+    second.flush()
+    assert second.usage("u1").calls == 2  # Its own stored calls; first's call is not written yet
+    assert first.usage("u1").calls == 1  # Cached for up to its flush interval
+
+    first.flush()
+    assert first.usage("u1").calls == 3
+    with pytest.raises(QuotaExceeded):
+        second.check("u1")
+
+
+def test_agent_runs_are_charged_to_the_current_user(monkeypatch):
+    ledger = QuotaLedger(_sessions(), daily_calls=1, daily_tokens=0)
+    monkeypatch.setattr("app.roleplay.services.quota.quota_ledger", ledger)
+    metrics = AgentMetrics()
+
+    with metered("evaluator", "fake", metrics=metrics) as call:
+        call.input_tokens = 40
+    assert ledger.flush() == 0  # Anonymous runs are not charged
+
+    with charged_to("u1"):
+        with metered("evaluator", "fake", metrics=metrics) as call:
+            call.input_tokens = 40
+        with pytest.raises(QuotaExceeded):
+            with metered("evaluator", "fake", metrics=metrics):
+                pass
+    assert ledger.usage("u1").input_tokens == 40
+    assert metrics.snapshot()["total"]["calls"] == 2  # The refused run never started
+
+    # Metrics alone record calls without touching any budget
+    with charged_to("u1"):
+        with metrics.track("evaluator", "fake"):
+            pass
+    assert ledger.usage("u1").calls == 1
+
+
+@pytest.fixture
+def signed_in(monkeypatch):
+    monkeypatch.setattr(quota_ledger, "session_factory", _sessions())
+    monkeypatch.setattr(quota_ledger, "_usage", {})
+    monkeypatch.setattr(quota_ledger, "_pending", {})
+    monkeypatch.setattr(GameConfig, "PERSISTENT_SESSIONS", False)
+    user = SimpleNamespace(id=42)
+    app.dependency_overrides[get_optional_user] = lambda: user
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    app.dependency_overrides.clear()
+
+
+def test_spent_budget_refuses_turns_before_any_model_call(signed_in, monkeypatch):
+    monkeypatch.setattr(quota_ledger, "daily_calls", 2)
+    session_id = client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()["session_id"]
+
+    assert client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's talk."}).status_code == 200
+    usage = client.get("/api/roleplay/quota").json()
+    assert usage["usage"]["calls"] >= 2 and usage["limits"]["calls"] == 2
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("The model path must not run once the budget is spent")
+
+    monkeypatch.setattr(roleplay_api.game_engine, "process_parent_response", fail)
+    refused = client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's talk."})
+    assert refused.status_code == 429
+    assert client.get(f"/api/roleplay/game/status/{session_id}").json()["attempts_used"] == 1
+
+
+def test_turns_are_charged_to_the_signed_in_user_or_the_callers_address(signed_in, monkeypatch):
+    monkeypatch.setattr(quota_ledger, "daily_calls", 2)
+    # Started signed in, then played without the token: the caller's address pays
+    session_id = client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()["session_id"]
+    app.dependency_overrides[get_optional_user] = lambda: None
+    assert client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's talk."}).status_code == 200
+    assert quota_ledger.usage("ip:testclient").calls >= 2 and quota_ledger.usage("42").calls == 0
+
+    anonymous = client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()["session_id"]
+    assert client.post(f"/api/roleplay/game/respond/{anonymous}", json={"parent_response": "Let's talk."}).status_code == 429
+
+
+def test_budget_spent_mid_turn_does_not_cut_the_turn_short(signed_in, monkeypatch):
+    """Checked once per turn: usage landing between the evaluation and the teen reply
+    must not turn the reply into a fallback"""
+    monkeypatch.setattr(quota_ledger, "daily_calls", 3)
+    session_id = client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()["session_id"]
+    teen_responder = roleplay_api.game_engine.teen_responder
+    respond = teen_responder.respond
+
+    async def respond_after_other_usage(*args, **kwargs):
+        for _ in range(3):
+            quota_ledger.charge("42")  # Another request of the same player spends the rest
+        return await respond(*args, **kwargs)
+
+    monkeypatch.setattr(teen_responder, "respond", respond_after_other_usage)
+    agent_metrics.reset()
+    turn = client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's talk."})
+    assert turn.status_code == 200
+    teen_calls = agent_metrics.snapshot()["by_role"][TEEN_RESPONSE_ROLE]
+    assert (teen_calls["calls"], teen_calls["fallbacks"]) == (1, 0)
+
+    # The next turn is refused up front, without using an attempt
+    assert client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's talk."}).status_code == 429
+    assert client.get(f"/api/roleplay/game/status/{session_id}").json()["attempts_used"] == 1
+
+
+def test_top_consumers_report_needs_the_export_token(signed_in, monkeypatch):
+    monkeypatch.setattr(GameConfig, "TRANSCRIPT_EXPORT_TOKEN", "export-secret")
+    quota_ledger.charge("42", 120, 30)
+    quota_ledger.charge("43", 10, 5)
+
+    assert client.get("/api/roleplay/quota/top").status_code == 401
+    report = client.get("/api/roleplay/quota/top", params={"limit": 1}, headers={"X-Export-Token": "export-secret"})
+    assert report.status_code == 200
+    assert [(row["user_id"], row["tokens"]) for row in report.json()["consumers"]] == [("42", 150)]
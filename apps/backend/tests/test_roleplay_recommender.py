@@ -0,0 +1,145 @@
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api import roleplay as roleplay_api
+from app.api.users import get_optional_user
+from app.db.database import Base
+from app.main import app
+from app.models.achievement import UserCounterMember
+from app.models.user_skill import UserCriterionStat
+from app.roleplay.config import GameConfig
+from app.roleplay.models.evaluation import MultiRoundEvaluationResult
+from app.roleplay.models.game_state import ConversationTurn, GameState
+from app.roleplay.scenarios.loader import CriterionDefinition, RoundData, Scenario
+from app.roleplay.services.recommender import ScenarioRecommender, ScenarioVectors
+
+client = TestClient(app)
+
+
+def _scenario(name, criteria, zh=True, difficulty="medium"):
+    return Scenario(
+        name=name,
+        case_name=name,
+        case_name_zh=name if zh else None,
+        background_and_instructions="...",
+        background_and_instructions_zh="..." if zh else None,
+        multi_round=True,
+        rounds=[RoundData(round=1, child_state="", child_prompt="...", evaluation_criteria=criteria)],
+        criteria={criterion: CriterionDefinition(description=criterion) for criterion in criteria},
+        difficulty=difficulty,
+    )
+
+
+LIBRARY = [
+    _scenario("listening", ["empathy", "listening"]),
+    _scenario("limits", ["boundaries", "consistency"]),
+    _scenario("mixed", ["empathy", "boundaries"], zh=False),
+]
+
+
+class _Loader:
+    def load_all_scenarios(self):
+        return LIBRARY
+
+
+def _recommender():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[UserCriterionStat.__table__, UserCounterMember.__table__])
+    return ScenarioRecommender(_Loader(), sessionmaker(bind=engine))
+
+
+def _evaluated(scenario, scores, user_id="u1"):
+    state = GameState(scenario_name=scenario, scenario_title=scenario, scenario_background="", teen_opening="",
+                      is_multi_round=True, user_id=user_id)
+    state.conversation.append(ConversationTurn(parent="...", teen="..."))
+    state.multi_round_evaluation = MultiRoundEvaluationResult(
+        criteria_scores=scores, total_score=sum(scores.values()), max_possible_score=3 * len(scores),
+        feedback="", detailed_feedback={}, passed=False, round_number=1
+    )
+    return state
+
+
+def test_scenario_vectors_are_normalised_and_indexed_by_language():
+    vectors = ScenarioVectors(LIBRARY)
+    assert vectors.vocabulary == ["boundaries", "consistency", "empathy", "listening"]
+    assert vectors.matrix.shape == (3, 4)
+    assert abs(float((vectors.matrix[0] ** 2).sum()) - 0.95 ** 2) < 1e-5  # Medium difficulty
+    assert list(vectors.language_bias["zh-HK"] == 0) == [True, True, False]
+
+
+def test_weak_criteria_steer_the_recommendation():
+    recommender = _recommender()
+    anonymous = recommender.recommend(limit=3)
+    assert len(anonymous) == 3
+    assert {pick.score for pick in anonymous} == {anonymous[0].score}  # Neutral prior: no preference
+
+    for _ in range(4):
+        recommender.observe("u1", _evaluated("listening", {"empathy": 3, "listening": 3}))
+        recommender.observe("u1", _evaluated("limits", {"boundaries": 0, "consistency": 1}))
+    picks = recommender.recommend("u1", limit=2)
+    assert picks[0].scenario == "limits"
+    assert picks[0].focus[0] == "boundaries"
+    assert picks[1].scenario == "mixed"
+
+    # Totals are persisted, so a fresh cache reaches the same answer
+    recommender.forget("u1")
+    assert recommender.recommend("u1", limit=1)[0].scenario == "limits"
+
+
+def test_cached_users_are_updated_in_place():
+    recommender = _recommender()
+    recommender.recommend("u1")
+    recommender.observe("u1", _evaluated("limits", {"boundaries": 0, "consistency": 0}))
+    cached = recommender._users["u1"]
+    column = recommender.vectors.column["boundaries"]
+    assert cached.counts[column] == 1 and cached.ratio_sums[column] == 0
+    assert recommender.recommend("u1", limit=1)[0].scenario == "limits"
+
+
+def test_language_mastery_and_exclusions_filter_the_catalog():
+    recommender = _recommender()
+    for _ in range(3):
+        recommender.observe("u1", _evaluated("limits", {"boundaries": 0, "consistency": 0}))
+    assert [pick.scenario for pick in recommender.recommend("u1", "zh-HK", limit=5)] == ["limits", "listening"]
+    assert recommender.recommend("u1", "fr") == []
+    assert recommender.recommend("u1", limit=1, exclude=["limits"])[0].scenario == "mixed"
+
+    db = recommender.session_factory()
+    db.add(UserCounterMember(user_id="u1", counter="scenarios_mastered", member="limits"))
+    db.commit()
+    db.close()
+    recommender.forget("u1")
+    assert recommender.recommend("u1", limit=1)[0].scenario == "mixed"
+
+
+def test_recommendation_endpoint_and_recommended_start(monkeypatch):
+    recommender = _recommender()
+    for _ in range(3):
+        recommender.observe("u1", _evaluated("limits", {"boundaries": 0, "consistency": 0}))
+    monkeypatch.setattr(roleplay_api.game_engine, "recommender", recommender)
+
+    # Only the signed-in player's weaknesses are used; a user_id in the query is ignored
+    app.dependency_overrides[get_optional_user] = lambda: SimpleNamespace(id="u1")
+    try:
+        response = client.get("/api/roleplay/recommendation", params={"limit": 2})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert [pick["scenario"] for pick in response.json()["recommendations"]] == ["limits", "mixed"]
+    signed_out = client.get("/api/roleplay/recommendation", params={"user_id": "u1", "limit": 2}).json()
+    assert signed_out["user_id"] is None
+    assert signed_out["recommendations"] == [pick.model_dump() for pick in recommender.recommend(None, limit=2)]
+
+    picked = []
+    monkeypatch.setattr(roleplay_api.game_engine.scenario_loader, "load_scenario",
+                        lambda name: picked.append(name) or LIBRARY[1])
+    monkeypatch.setattr(GameConfig, "PERSISTENT_SESSIONS", False)
+    app.dependency_overrides[get_optional_user] = lambda: SimpleNamespace(id="u1")
+    try:
+        response = client.post("/api/roleplay/game/start", params={"language": "en"})
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert picked == ["limits"]
@@ -0,0 +1,53 @@
+import asyncio
+import yaml
+from app.roleplay.agents.teen_responder import TeenResponderAgent
+from app.roleplay.config import GameConfig
+from app.roleplay.services.metrics import agent_metrics
+from app.roleplay.services.reply_bank import ReplyBank, score_bucket
+from app.roleplay.tools.generate_replies import run
+
+bank = ReplyBank()
+
+
+def test_score_buckets_follow_teen_prompt_ranges():
+    """Buckets match the score bands in the teen system prompt"""
+    assert [score_bucket(s) for s in (10, 8, 7, 6, 5, 4, 3, 0)] == ["8-10", "8-10", "6-7", "6-7", "4-5", "4-5", "0-3", "0-3"]
+
+
+def test_draws_do_not_repeat_within_a_session():
+    """A session sees every reply in a cell once, then the bank steps aside"""
+    used = []
+    replies = [bank.draw("messy_room", 1, "en", 9, used, seed=7) for _ in range(3)]
+    assert len({reply.response for reply in replies}) == 3
+    assert bank.draw("messy_room", 1, "en", 9, used, seed=7) is None
+
+    # Same seed, same draws
+    replay = []
+    assert bank.draw("messy_room", 1, "en", 9, replay, seed=7) == replies[0]
+
+
+def test_responder_skips_the_model_when_bank_has_a_reply(monkeypatch):
+    """Banked replies cost no model call; an empty cell falls through to the model"""
+    monkeypatch.setattr(GameConfig, "TEEN_REPLY_BANK", True)
+    responder = TeenResponderAgent(bank)
+    agent_metrics.reset()
+
+    used = []
+    reply = asyncio.run(responder.respond(2, language="zh-HK", scenario="messy_room", used_replies=used, seed=1))
+    assert reply.emotion == "upset"
+    assert agent_metrics.snapshot()["total"]["calls"] == 0
+
+    asyncio.run(responder.respond(2, language="zh-HK", scenario="unknown_scenario", used_replies=used, seed=1))
+    assert agent_metrics.snapshot()["total"]["calls"] == 1
+
+
+def test_generation_merges_into_bank_file(tmp_path):
+    """The offline job fills every cell of a scenario and writes one bank file"""
+    target = ReplyBank(str(tmp_path))
+    asyncio.run(run(["school_dropoff_anxiety"], target, per_cell=2, max_attempts=4))
+
+    data = yaml.safe_load((tmp_path / "school_dropoff_anxiety.yaml").read_text(encoding="utf-8"))
+    assert data["scenario"] == "school_dropoff_anxiety"
+    assert set(data["rounds"][1]) == {"en", "zh-HK"}
+    assert set(data["rounds"][1]["en"]) == {"8-10", "6-7", "4-5", "0-3"}
+    assert all(cell for cell in data["rounds"][1]["en"].values())
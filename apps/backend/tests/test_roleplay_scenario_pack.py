@@ -0,0 +1,67 @@
+import pytest
+from app.roleplay.scenarios.loader import ScenarioLoader
+from app.roleplay.scenarios.pack import PackFormatError, read_pack
+from app.roleplay.tools.compile_scenarios import compile_directory, main
+
+
+def test_shipped_scenarios_are_valid():
+    """Every scenario in the repo passes the build-time checks"""
+    scenarios, problems, _ = compile_directory(ScenarioLoader().scenarios_dir)
+    assert problems == {}
+    assert {"messy_room", "school_dropoff_anxiety"} <= set(scenarios)
+
+
+def test_undeclared_criterion_and_missing_cantonese_fail(tmp_path):
+    """Rounds may only use declared criteria, and both languages are required"""
+    (tmp_path / "broken.yaml").write_text(
+        "case_name: Broken\n"
+        "background_and_instructions: Test\n"
+        "multi_round: true\n"
+        "criteria:\n"
+        "  tone_empathy: {max_score: 2, description: Calm}\n"
+        "rounds:\n"
+        "  - {round: 1, child_state: upset, child_prompt: Hi, evaluation_criteria: [tone_empathy, made_up]}\n",
+        encoding="utf-8",
+    )
+    _, problems, _ = compile_directory(str(tmp_path))
+    messages = "\n".join(problems["broken"])
+    assert "criterion 'made_up' is not declared" in messages
+    assert "missing case_name_zh" in messages
+    assert "round 1: missing child_prompt_zh" in messages
+    assert main(["--scenarios-dir", str(tmp_path), "--check"]) == 1
+
+
+def test_single_round_criteria_need_a_positive_max_score(tmp_path):
+    """Criteria are validated even when the scenario is played as a single round"""
+    (tmp_path / "single.yaml").write_text(
+        "case_name: Single\n"
+        "case_name_zh: 單\n"
+        "background_and_instructions: Test\n"
+        "background_and_instructions_zh: 測試\n"
+        "child_prompts: [Hi, 你好]\n"
+        "criteria:\n"
+        "  calm: {description: Calm, description_zh: 冷靜}\n"
+        "  kind: {max_score: 0, description: Kind, description_zh: 友善}\n",
+        encoding="utf-8",
+    )
+    _, problems, _ = compile_directory(str(tmp_path))
+    assert problems["single"] == ["criterion 'calm': missing max_score", "criterion 'kind': max_score 0 must be positive"]
+
+
+def test_server_loads_from_pack(tmp_path):
+    """A compiled pack replaces the YAML files and carries its content version"""
+    pack_path = str(tmp_path / "scenarios.pack")
+    assert main(["--output", pack_path]) == 0
+
+    loader = ScenarioLoader(scenarios_dir=str(tmp_path / "missing"), pack_path=pack_path)
+    assert loader.pack_version == read_pack(pack_path).version
+    assert loader.list_scenarios() == ["messy_room"]
+    assert loader.load_scenario("school_dropoff_anxiety").get_criterion("fear_validation").max_score == 4
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    """Files without the pack header are refused rather than unpickled"""
+    path = tmp_path / "not.pack"
+    path.write_bytes(b"garbage" * 10)
+    with pytest.raises(PackFormatError):
+        read_pack(str(path))
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from fastapi.testclient import TestClient
+from app.api import roleplay as roleplay_api
+from app.main import app
+from app.roleplay.config import GameConfig
+from app.roleplay.services.game_engine import RoleplayGameEngine
+from app.roleplay.models.game_state import GameState
+from app.roleplay.services.session_store import _NUMBERS, _STRUCTURED, _TEXTS, SessionStore, diff, pack, replay, unpack
+from app.roleplay.tools.session_memory import _force_multi_round
+
+client = TestClient(app)
+
+
+def _play(language="en", turns=9):
+    """Every saved state of one multi-round session and its delta from the previous one, through JSON"""
+    engine = RoleplayGameEngine()
+    _force_multi_round(engine)
+    store = SessionStore()
+    state = engine.create_game_state("school_dropoff_anxiety", language)
+    store.save("s", state)
+    states, deltas = [state.model_copy(deep=True)], [diff(None, pack(state))]
+
+    async def run(state):
+        for turn in range(turns):
+            if state.game_completed:
+                break
+            state = await engine.process_parent_response(store.get("s"), f"I know it's scary, sweetie ({turn})")
+            store.save("s", state)
+            deltas.append(diff(pack(states[-1]), pack(state)))
+            states.append(state.model_copy(deep=True))
+
+    asyncio.run(run(state))
+    return states, [json.loads(json.dumps(delta)) for delta in deltas]
+
+
+def test_compact_round_trip_and_delta_replay():
+    """Unpacking restores every state, and replaying the JSON deltas rebuilds the session"""
+    states, deltas = _play()
+    assert states[-1].game_completed and len(states[-1].round_history) == states[-1].max_rounds
+
+    for index, state in enumerate(states):
+        assert unpack(pack(state)) == state
+        assert unpack(replay(deltas[:index + 1])) == state
+
+
+def test_deltas_only_carry_new_transcript():
+    """After the first save, the conversation is sent as its new tail, never in full"""
+    states, deltas = _play()
+    for delta in deltas[1:]:
+        assert "turns" not in delta and "rounds" not in delta
+        assert len(delta["turns+"]) == 1
+    # Round results point at the conversation instead of repeating its text
+    assert all(isinstance(result[1], int) for result in pack(states[-1]).rounds)
+
+
+def test_conversation_is_capped_and_still_round_trips(monkeypatch):
+    """Only the last CONVERSATION_MAX_TURNS exchanges are kept; deltas and unpacking still agree"""
+    monkeypatch.setattr(GameConfig, "CONVERSATION_MAX_TURNS", 2)
+    states, deltas = _play()
+    assert len(states[-1].conversation) == 2
+    assert states[-1].conversation[-1].parent.endswith(f"({len(states) - 2})")
+    for index, state in enumerate(states):
+        assert unpack(pack(state)) == state
+        assert unpack(replay(deltas[:index + 1])) == state
+
+
+def test_every_game_state_field_is_packed():
+    """A field added to GameState but not to the compact layout would be lost on every save"""
+    layout = _TEXTS + _NUMBERS + _STRUCTURED
+    assert len(layout) == len(set(layout))
+    assert set(layout) == set(GameState.model_fields)
+
+
+def test_sessions_share_scenario_and_criteria_strings():
+    """Two sessions of one scenario hold the same string and key objects"""
+    first, second = pack(_play()[0][-1]), pack(_play()[0][-1])
+    assert all(a is b for a, b in zip(first.texts, second.texts))
+    assert first.rounds[0][2][1] is second.rounds[0][2][1]
+
+
+def test_api_sessions_live_in_the_store():
+    start = client.post("/api/roleplay/game/start?scenario_name=messy_room&language=en").json()
+    session_id = start["session_id"]
+    client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Can we tidy up together?"})
+
+    status = client.get(f"/api/roleplay/game/status/{session_id}").json()
+    assert status["attempts_used"] == 1
+    assert roleplay_api.game_sessions.snapshot()["saves"] >= 2
+    assert client.delete(f"/api/roleplay/game/end/{session_id}").status_code == 200
+    assert client.get(f"/api/roleplay/game/status/{session_id}").status_code == 404
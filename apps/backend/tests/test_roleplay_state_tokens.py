@@ -0,0 +1,81 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import roleplay as roleplay_api
+from app.roleplay.config import GameConfig
+from app.roleplay.services.game_engine import RoleplayGameEngine
+from app.roleplay.services import state_tokens
+from app.roleplay.services.state_tokens import InvalidStateToken, decode_state, encode_state
+
+client = TestClient(app)
+SECRET = "test-secret"
+
+
+def _state():
+    return RoleplayGameEngine().create_game_state("messy_room", "en")
+
+
+def test_token_round_trip():
+    """A token restores the exact state it was made from"""
+    state = _state()
+    state.attempts = 2
+    token = encode_state(state, "session_a", SECRET)
+    assert decode_state(token, "session_a", SECRET) == state
+
+
+def test_tampered_foreign_and_expired_tokens_are_rejected(monkeypatch):
+    """Edited payloads, other sessions, other secrets and old tokens all fail"""
+    token = encode_state(_state(), "session_a", SECRET)
+    version, body, signature = token.split(".")
+    tampered = f"{version}.{body[:-2]}{'A' if body[-2] != 'A' else 'B'}{body[-1]}.{signature}"
+
+    for bad, session_id, secret in [
+        (tampered, "session_a", SECRET),
+        (token, "session_b", SECRET),
+        (token, "session_a", "other-secret"),
+        ("not-a-token", "session_a", SECRET),
+    ]:
+        with pytest.raises(InvalidStateToken):
+            decode_state(bad, session_id, secret)
+
+    now = time.time()
+    monkeypatch.setattr(state_tokens.time, "time", lambda: now + 3600)
+    with pytest.raises(InvalidStateToken):
+        decode_state(token, "session_a", SECRET, ttl=60)
+
+
+def test_missing_secret_fails_at_startup(monkeypatch):
+    """Stateless sessions refuse to start without a signing secret"""
+    monkeypatch.setattr(GameConfig, "STATE_TOKEN_SECRET", "")
+    monkeypatch.setattr(GameConfig, "STATELESS_SESSIONS", False)
+    state_tokens.check_configuration()  # Not needed without stateless sessions
+    monkeypatch.setattr(GameConfig, "STATELESS_SESSIONS", True)
+    with pytest.raises(RuntimeError, match="ROLEPLAY_STATE_SECRET"):
+        state_tokens.check_configuration()
+
+
+def test_stateless_game_needs_no_server_session(monkeypatch):
+    """Every turn is served from the token alone; nothing is kept in game_sessions"""
+    monkeypatch.setattr(GameConfig, "STATELESS_SESSIONS", True)
+    monkeypatch.setattr(GameConfig, "STATE_TOKEN_SECRET", SECRET)
+    roleplay_api.game_sessions.clear()
+
+    start = client.post("/api/roleplay/game/start?scenario_name=messy_room&language=en").json()
+    session_id, token = start["session_id"], start["state_token"]
+    assert len(roleplay_api.game_sessions) == 0
+
+    turn = client.post(f"/api/roleplay/game/respond/{session_id}",
+                       json={"parent_response": "I can see the room is a lot. Can we tidy it together?",
+                             "state_token": token})
+    assert turn.status_code == 200
+    assert turn.json()["state_token"] != token
+    assert len(roleplay_api.game_sessions) == 0
+
+    status = client.get(f"/api/roleplay/game/status/{session_id}",
+                        headers={"X-Game-State": turn.json()["state_token"]})
+    assert status.status_code == 200
+
+    assert client.get(f"/api/roleplay/game/status/{session_id}").status_code == 400
+    assert client.get(f"/api/roleplay/game/status/{session_id}",
+                      headers={"X-Game-State": token[:-4] + "AAAA"}).status_code == 401
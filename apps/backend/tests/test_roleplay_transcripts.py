@@ -0,0 +1,83 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.database import Base
+from app.main import app
+from app.api import roleplay as roleplay_api
+from app.models.roleplay_rollup import RoleplayRollup
+from app.models.roleplay_transcript import RoleplayTranscript
+from app.roleplay.config import GameConfig
+from app.roleplay.services.game_engine import RoleplayGameEngine
+from app.roleplay.services.transcripts import TranscriptStore
+from app.roleplay.tools.session_memory import _force_multi_round
+
+client = TestClient(app)
+
+
+def _store(batch_size=2):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[RoleplayTranscript.__table__, RoleplayRollup.__table__])
+    return TranscriptStore(sessionmaker(bind=engine), batch_size=batch_size)
+
+
+def test_multi_round_turns_record_round_outcomes():
+    """Each turn is one row; finishing a round is recorded against the round it finished"""
+    store = _store()
+    engine = RoleplayGameEngine()
+    _force_multi_round(engine)
+    state = engine.create_game_state("school_dropoff_anxiety", "en")
+
+    async def play(state):
+        while not state.game_completed:
+            state = await engine.process_parent_response(state, "I know it's scary, and I'll be back after lunch.")
+            assert store.record("s1", state)
+        return state
+
+    state = asyncio.run(play(state))
+    rows = list(store.export())
+    assert len(rows) == len(state.conversation)
+    completed = [row for row in rows if row["round_completed"]]
+    assert [row["round_number"] for row in completed] == list(range(1, state.max_rounds + 1))
+    assert all(row["criteria_scores"] and row["scenario"] == "school_dropoff_anxiety" for row in rows)
+    assert rows[-1]["game_completed"]
+
+
+def test_export_filters_by_scenario_and_time():
+    store = _store()
+    engine = RoleplayGameEngine()
+    for scenario in ["messy_room", "school_dropoff_anxiety"]:
+        state = asyncio.run(engine.process_parent_response(engine.create_game_state(scenario, "en"), "Let's talk."))
+        store.record(scenario, state)
+
+    now = datetime.now(timezone.utc)
+    assert [row["scenario"] for row in store.export(scenario="messy_room")] == ["messy_room"]
+    assert len(list(store.export(since=now - timedelta(minutes=5), until=now + timedelta(minutes=5)))) == 2
+    assert list(store.export(since=now + timedelta(minutes=5))) == []
+    # Other offsets and naive UTC mean the same instants, and exported times are UTC
+    hong_kong = timezone(timedelta(hours=8))
+    assert len(list(store.export(since=(now - timedelta(minutes=5)).astimezone(hong_kong)))) == 2
+    assert list(store.export(until=(now - timedelta(minutes=5)).replace(tzinfo=None))) == []
+    assert all(row["created_at"].endswith("+00:00") for row in store.export())
+
+
+def test_export_endpoint_streams_ndjson(monkeypatch):
+    store = _store()
+    monkeypatch.setattr(roleplay_api, "transcripts", store)
+
+    start = client.post("/api/roleplay/game/start?scenario_name=messy_room&language=en").json()
+    client.post(f"/api/roleplay/game/respond/{start['session_id']}", json={"parent_response": "Can we tidy up?"})
+
+    assert client.get("/api/roleplay/transcripts/export").status_code == 403
+    monkeypatch.setattr(GameConfig, "TRANSCRIPT_EXPORT_TOKEN", "export-secret")
+    assert client.get("/api/roleplay/transcripts/export", headers={"X-Export-Token": "wrong"}).status_code == 401
+
+    response = client.get("/api/roleplay/transcripts/export?scenario=messy_room",
+                          headers={"X-Export-Token": "export-secret"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["session_id"] for row in rows] == [start["session_id"]]
+    assert rows[0]["parent_response"] == "Can we tidy up?"
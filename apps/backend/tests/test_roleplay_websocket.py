@@ -0,0 +1,165 @@
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.websockets import WebSocketDisconnect
+from app.api import roleplay as roleplay_api
+from app.db.database import Base
+from app.main import app
+from app.models.roleplay_session import RoleplaySession, RoleplaySessionDelta
+from app.roleplay.config import GameConfig
+from app.roleplay.services.persistent_sessions import DatabaseSessionStore
+
+client = TestClient(app)
+PASSING = "I understand, let's do it together."
+
+
+def _start():
+    return client.post("/api/roleplay/game/start", params={"scenario_name": "messy_room", "language": "en"}).json()["session_id"]
+
+
+def _turn(websocket):
+    """Frames of one turn, up to turn_complete or an error"""
+    frames = []
+    while not frames or frames[-1]["type"] not in ("turn_complete", "error"):
+        frames.append(websocket.receive_json())
+    return frames
+
+
+def test_turns_stream_evaluation_then_teen_reply():
+    session_id = _start()
+    with client.websocket_connect(f"/api/roleplay/ws/{session_id}") as websocket:
+        ready = websocket.receive_json()
+        assert (ready["type"], ready["seq"]) == ("ready", 1)
+        assert ready["data"]["attempts_used"] == 0 and ready["data"]["teen_opening"]
+
+        websocket.send_json({"type": "respond", "parent_response": "Let's talk."})
+        frames = _turn(websocket)
+        assert [frame["type"] for frame in frames] == ["provisional", "evaluation", "teen_response", "turn_complete"]
+        assert [frame["seq"] for frame in frames] == [2, 3, 4, 5]
+        assert frames[1]["data"]["total_score"] == frames[3]["data"]["evaluation"]["total_score"]
+        assert frames[2]["data"]["response"] == frames[3]["data"]["teen_response"]
+
+        websocket.send_json({"type": "ping"})
+        assert websocket.receive_json() == {"type": "pong"}
+
+        websocket.send_json({"type": "respond", "parent_response": PASSING})
+        assert _turn(websocket)[-1]["data"]["game_completed"]
+        websocket.send_json({"type": "respond", "parent_response": PASSING})
+        assert _turn(websocket)[-1]["data"]["status"] == 400
+
+    # Saved after every turn, so HTTP clients see the same session
+    status = client.get(f"/api/roleplay/game/status/{session_id}").json()
+    assert status["attempts_used"] == 2 and status["game_completed"]
+
+
+def test_bad_frames_get_error_frames_and_keep_the_connection():
+    session_id = _start()
+    with client.websocket_connect(f"/api/roleplay/ws/{session_id}") as websocket:
+        websocket.receive_json()
+        websocket.send_text("not json")
+        assert websocket.receive_json()["data"]["status"] == 400
+        websocket.send_json({"type": "respond"})
+        assert websocket.receive_json()["data"]["status"] == 422
+        websocket.send_json({"type": "respond", "parent_response": "asdf"})
+        assert websocket.receive_json()["data"]["detail"]["reason"] == "gibberish"
+
+        websocket.send_json({"type": "respond", "parent_response": "Let's talk."})
+        assert _turn(websocket)[-1]["data"]["attempts_used"] == 1
+
+
+def test_reconnect_replays_missed_frames():
+    session_id = _start()
+    with client.websocket_connect(f"/api/roleplay/ws/{session_id}") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "respond", "parent_response": "Let's talk."})
+        last_seq = websocket.receive_json()["seq"]  # The client saw the provisional frame, then dropped
+        _turn(websocket)
+
+    with client.websocket_connect(f"/api/roleplay/ws/{session_id}?last_seq={last_seq}") as websocket:
+        replayed = [websocket.receive_json() for _ in range(3)]
+        assert [frame["type"] for frame in replayed] == ["evaluation", "teen_response", "turn_complete"]
+        ready = websocket.receive_json()
+        assert (ready["type"], ready["seq"], ready["data"]["attempts_used"]) == ("ready", 6, 1)
+
+
+def test_unknown_session_is_closed_with_its_status():
+    with client.websocket_connect("/api/roleplay/ws/session_missing") as websocket:
+        assert websocket.receive_json() == {"type": "error", "status": 404, "detail": "Game session not found"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+        assert closed.value.code == 4404
+
+
+def test_silent_clients_are_pinged_then_dropped(monkeypatch):
+    monkeypatch.setattr(GameConfig, "WS_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(GameConfig, "WS_MISSED_HEARTBEATS", 1)
+    session_id = _start()
+    with client.websocket_connect(f"/api/roleplay/ws/{session_id}") as websocket:
+        websocket.receive_json()
+        assert websocket.receive_json() == {"type": "ping"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+        assert closed.value.code == 1001
+
+
+def test_signed_in_player_authenticates_once_and_keeps_versions(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[RoleplaySession.__table__, RoleplaySessionDelta.__table__])
+    monkeypatch.setattr(roleplay_api, "persistent_sessions", DatabaseSessionStore(sessionmaker(bind=engine)))
+    lookups = []
+
+    def user_from_token(token):
+        lookups.append(token)
+        return SimpleNamespace(id=7) if token else None
+
+    monkeypatch.setattr(roleplay_api, "user_from_token", user_from_token)
+    app.dependency_overrides[roleplay_api.get_optional_user] = lambda: SimpleNamespace(id=7)
+    try:
+        session_id = _start()
+    finally:
+        app.dependency_overrides.clear()
+
+    with client.websocket_connect(f"/api/roleplay/ws/{session_id}?token=secret") as websocket:
+        assert websocket.receive_json()["data"]["version"] == 1
+        for expected in (2, 3):
+            websocket.send_json({"type": "respond", "parent_response": "Let's talk."})
+            assert _turn(websocket)[-1]["data"]["version"] == expected
+    assert lookups == ["secret"]
+
+    with client.websocket_connect(f"/api/roleplay/ws/{session_id}") as websocket:
+        assert websocket.receive_json()["status"] == 404  # Not visible without signing in
+
+
+def test_conflicting_turn_reloads_the_session_or_closes(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[RoleplaySession.__table__, RoleplaySessionDelta.__table__])
+    monkeypatch.setattr(roleplay_api, "persistent_sessions", DatabaseSessionStore(sessionmaker(bind=engine)))
+    monkeypatch.setattr(roleplay_api, "user_from_token", lambda token: SimpleNamespace(id=7))
+    app.dependency_overrides[roleplay_api.get_optional_user] = lambda: SimpleNamespace(id=7)
+    try:
+        session_id = _start()
+        with client.websocket_connect(f"/api/roleplay/ws/{session_id}?token=secret") as websocket:
+            websocket.receive_json()
+            # Another device plays a turn while this connection holds version 1
+            client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's talk."})
+            websocket.send_json({"type": "respond", "parent_response": "Let's talk."})
+            assert _turn(websocket)[-1]["data"]["status"] == 409
+            ready = websocket.receive_json()
+            assert (ready["type"], ready["data"]["version"], ready["data"]["attempts_used"]) == ("ready", 2, 1)
+            websocket.send_json({"type": "respond", "parent_response": "Let's talk."})
+            assert _turn(websocket)[-1]["data"]["version"] == 3
+
+            # Played and then ended elsewhere: nothing to reload, so the connection closes
+            client.post(f"/api/roleplay/game/respond/{session_id}", json={"parent_response": "Let's talk."})
+            client.delete(f"/api/roleplay/game/end/{session_id}")
+            websocket.send_json({"type": "respond", "parent_response": PASSING})
+            assert _turn(websocket)[-1]["data"]["status"] == 409
+            assert websocket.receive_json()["data"]["status"] == 404
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+            assert closed.value.code == 4409
+    finally:
+        app.dependency_overrides.clear()